@@ -1,10 +1,15 @@
-def insertion_sort(arr):
+def insertion_sort(arr, contadores=None):
     """
     Ordenamiento por Inserción.
     Complejidad: O(n^2) en el peor caso, O(n) si está casi ordenado.
     Estable: Si
     In-place: Si
+    contadores: Contadores opcional (ver contadores.py) para contar comparaciones
+        y movimientos.
     """
+    if contadores is not None and not contadores.midiendo:
+        return contadores.medir(insertion_sort, arr)
+    
     n = len(arr)
     
     # Comenzar desde el segundo elemento
@@ -1,10 +1,15 @@
-def selection_sort(arr):
+def selection_sort(arr, contadores=None):
     """
     Ordenamiento por Selección.
     Complejidad: O(n^2) en todos los casos.
     Estable: No
     In-place: Si
+    contadores: Contadores opcional (ver contadores.py) para contar comparaciones
+        y movimientos.
     """
+    if contadores is not None and not contadores.midiendo:
+        return contadores.medir(selection_sort, arr)
+    
     n = len(arr)
     
     # Recorrer toda la lista
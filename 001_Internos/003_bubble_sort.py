@@ -1,10 +1,15 @@
-def bubble_sort(arr):
+def bubble_sort(arr, contadores=None):
     """
     Ordenamiento por Intercambio (Bubble Sort).
     Complejidad: O(n^2) en el peor caso, O(n) si está ordenado.
     Estable: Si
     In-place: Si
+    contadores: Contadores opcional (ver contadores.py) para contar comparaciones
+        y movimientos.
     """
+    if contadores is not None and not contadores.midiendo:
+        return contadores.medir(bubble_sort, arr)
+    
     n = len(arr)
     
     # Recorrer todos los elementos
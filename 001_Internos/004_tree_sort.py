@@ -1,3 +1,7 @@
+from bisect import bisect_left, bisect_right, insort
+from heapq import merge
+
+
 class NodoArbol:
     """Nodo de árbol binario de búsqueda."""
     def __init__(self, valor):
@@ -27,13 +31,29 @@ def recorrido_inorden(raiz, resultado):
         recorrido_inorden(raiz.derecha, resultado)
 
 
-def tree_sort(arr):
+def profundidades(raiz):
+    """Genera la profundidad de cada nodo del árbol (la raíz tiene 1), sin recursión."""
+    pendientes = [(raiz, 1)] if raiz is not None else []
+    while pendientes:
+        nodo, profundidad = pendientes.pop()
+        yield profundidad
+        for hijo in (nodo.izquierda, nodo.derecha):
+            if hijo is not None:
+                pendientes.append((hijo, profundidad + 1))
+
+
+def tree_sort(arr, contadores=None):
     """
     Ordenamiento de Árbol (Tree Sort).
     Complejidad: O(n log n) en promedio, O(n^2) en el peor caso.
     Estable: No
     In-place: No
+    contadores: Contadores opcional (ver contadores.py) para contar comparaciones,
+        llamadas a insertar_nodo y profundidad (la altura del árbol).
     """
+    if contadores is not None and not contadores.midiendo:
+        return contadores.medir(tree_sort, arr, en_lugar=False)
+    
     if not arr:
         return arr
     
@@ -46,12 +66,289 @@ def tree_sort(arr):
     resultado = []
     recorrido_inorden(raiz, resultado)
     
+    if contadores is not None:
+        # Insertar un nodo a profundidad p hace p llamadas a insertar_nodo
+        for profundidad in profundidades(raiz):
+            contadores.llamadas += profundidad
+            contadores.registrar_profundidad(profundidad)
+        contadores.movimientos += len(resultado)
+    
     return resultado
 
 
+class ListaOrdenada:
+    """
+    Lista Ordenada Persistente (listas por bloques).
+    Complejidad: add/remove O(log n) + O(carga) de desplazamiento en un bloque;
+    rank/select O(log n); update de k valores O(n + k log k).
+    Uso: Cargas en línea que insertan, eliminan y consultan posiciones sin
+    reordenar todo en cada cambio.
+
+    En lugar de un nodo por valor (como el árbol de tree_sort), guarda bloques
+    ordenados de hasta 2 * carga valores contiguos, el máximo de cada bloque
+    para ubicar valores, y un árbol de Fenwick con los tamaños de los bloques
+    para pasar de posición a bloque y viceversa.
+    """
+    def __init__(self, valores=None, carga=1000):
+        if carga < 4:
+            raise ValueError("La carga por bloque debe ser al menos 4")
+        self.carga = carga
+        self._bloques = []
+        self._maximos = []
+        self._fenwick = None
+        self._longitud = 0
+        if valores is not None:
+            self.update(valores)
+
+    # Índice de posiciones (árbol de Fenwick sobre los tamaños de los bloques)
+
+    def _indice(self):
+        """Árbol de Fenwick de tamaños; se reconstruye si cambió la estructura."""
+        if self._fenwick is None:
+            arbol = [0] + [len(bloque) for bloque in self._bloques]
+            for i in range(1, len(arbol)):
+                padre = i + (i & -i)
+                if padre < len(arbol):
+                    arbol[padre] += arbol[i]
+            self._fenwick = arbol
+        return self._fenwick
+
+    def _sumar(self, bloque, delta):
+        """Actualiza el tamaño de un bloque en el índice (si está construido)."""
+        arbol = self._fenwick
+        if arbol is None:
+            return
+        i = bloque + 1
+        while i < len(arbol):
+            arbol[i] += delta
+            i += i & -i
+
+    def _antes_de(self, bloque):
+        """Cantidad de valores en los bloques anteriores a bloque."""
+        arbol = self._indice()
+        total = 0
+        i = bloque
+        while i > 0:
+            total += arbol[i]
+            i -= i & -i
+        return total
+
+    def _ubicar(self, posicion):
+        """(bloque, desplazamiento) de la posición dada (0 <= posicion < len)."""
+        arbol = self._indice()
+        bloque = 0
+        paso = 1 << (len(arbol) - 1).bit_length()
+        while paso:
+            siguiente = bloque + paso
+            if siguiente < len(arbol) and arbol[siguiente] <= posicion:
+                posicion -= arbol[siguiente]
+                bloque = siguiente
+            paso >>= 1
+        return bloque, posicion
+
+    # Modificación
+
+    def add(self, valor):
+        """Inserta un valor manteniendo el orden."""
+        if not self._bloques:
+            self._bloques.append([valor])
+            self._maximos.append(valor)
+            self._fenwick = None
+            self._longitud = 1
+            return
+
+        i = bisect_right(self._maximos, valor)
+        if i == len(self._maximos):
+            # Mayor o igual que todo: va al final del último bloque
+            i -= 1
+            self._bloques[i].append(valor)
+            self._maximos[i] = valor
+        else:
+            insort(self._bloques[i], valor)
+        self._longitud += 1
+        self._sumar(i, 1)
+
+        if len(self._bloques[i]) > 2 * self.carga:
+            self._dividir(i)
+
+    def _dividir(self, i):
+        """Parte un bloque demasiado grande en dos mitades."""
+        bloque = self._bloques[i]
+        mitad = bloque[self.carga:]
+        del bloque[self.carga:]
+        self._bloques.insert(i + 1, mitad)
+        self._maximos[i] = bloque[-1]
+        self._maximos.insert(i + 1, mitad[-1])
+        self._fenwick = None
+
+    def discard(self, valor):
+        """Elimina una aparición del valor; no hace nada si no está."""
+        i = bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            return False
+        bloque = self._bloques[i]
+        j = bisect_left(bloque, valor)
+        if j == len(bloque) or bloque[j] != valor:
+            return False
+        self._eliminar(i, j)
+        return True
+
+    def remove(self, valor):
+        """Elimina una aparición del valor; ValueError si no está."""
+        if not self.discard(valor):
+            raise ValueError(f"{valor!r} no está en la lista")
+
+    def _eliminar(self, i, j):
+        bloque = self._bloques[i]
+        del bloque[j]
+        self._longitud -= 1
+        if not bloque:
+            del self._bloques[i]
+            del self._maximos[i]
+            self._fenwick = None
+            return
+        self._maximos[i] = bloque[-1]
+        self._sumar(i, -1)
+
+    def pop(self, posicion=-1):
+        """Elimina y retorna el valor en la posición dada (por defecto el último)."""
+        if posicion < 0:
+            posicion += self._longitud
+        if not 0 <= posicion < self._longitud:
+            raise IndexError("Posición fuera de rango")
+        i, j = self._ubicar(posicion)
+        valor = self._bloques[i][j]
+        self._eliminar(i, j)
+        return valor
+
+    def update(self, valores):
+        """
+        Inserta varios valores: los ordena y los fusiona con los existentes en
+        una pasada, en lugar de insertarlos de a uno. Si son pocos frente a la
+        lista, insertar uno a uno es más barato.
+        """
+        nuevos = sorted(valores)
+        if not nuevos:
+            return
+        if len(nuevos) * 8 < self._longitud:
+            for valor in nuevos:
+                self.add(valor)
+            return
+
+        todos = list(merge(self, nuevos))
+        self._bloques = [todos[i:i + self.carga] for i in range(0, len(todos), self.carga)]
+        self._maximos = [bloque[-1] for bloque in self._bloques]
+        self._fenwick = None
+        self._longitud = len(todos)
+
+    def clear(self):
+        self._bloques = []
+        self._maximos = []
+        self._fenwick = None
+        self._longitud = 0
+
+    # Consultas
+
+    def bisect_left(self, valor):
+        """Posición del primer elemento >= valor."""
+        i = bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            return self._longitud
+        return self._antes_de(i) + bisect_left(self._bloques[i], valor)
+
+    def bisect_right(self, valor):
+        """Posición del primer elemento > valor."""
+        i = bisect_right(self._maximos, valor)
+        if i == len(self._maximos):
+            return self._longitud
+        return self._antes_de(i) + bisect_right(self._bloques[i], valor)
+
+    bisect = bisect_right
+
+    def rank(self, valor):
+        """Cantidad de elementos menores que valor."""
+        return self.bisect_left(valor)
+
+    def select(self, posicion):
+        """Elemento en la posición dada del orden (el i-ésimo menor, desde 0)."""
+        if posicion < 0:
+            posicion += self._longitud
+        if not 0 <= posicion < self._longitud:
+            raise IndexError("Posición fuera de rango")
+        i, j = self._ubicar(posicion)
+        return self._bloques[i][j]
+
+    __getitem__ = select
+
+    def count(self, valor):
+        """Cantidad de apariciones del valor."""
+        return self.bisect_right(valor) - self.bisect_left(valor)
+
+    def irange(self, minimo=None, maximo=None, inclusivo=(True, True)):
+        """
+        Genera en orden los valores entre minimo y maximo (None: sin límite).
+        inclusivo indica si cada extremo se incluye.
+        """
+        if minimo is None:
+            inicio = 0
+        elif inclusivo[0]:
+            inicio = self.bisect_left(minimo)
+        else:
+            inicio = self.bisect_right(minimo)
+
+        if maximo is None:
+            fin = self._longitud
+        elif inclusivo[1]:
+            fin = self.bisect_right(maximo)
+        else:
+            fin = self.bisect_left(maximo)
+
+        if inicio >= fin:
+            return
+        i, j = self._ubicar(inicio)
+        restantes = fin - inicio
+        while restantes > 0:
+            tramo = self._bloques[i][j:j + restantes]
+            yield from tramo
+            restantes -= len(tramo)
+            i += 1
+            j = 0
+
+    def __contains__(self, valor):
+        i = bisect_left(self._maximos, valor)
+        if i == len(self._maximos):
+            return False
+        bloque = self._bloques[i]
+        j = bisect_left(bloque, valor)
+        return j < len(bloque) and bloque[j] == valor
+
+    def __len__(self):
+        return self._longitud
+
+    def __iter__(self):
+        for bloque in self._bloques:
+            yield from bloque
+
+    def __reversed__(self):
+        for bloque in reversed(self._bloques):
+            yield from reversed(bloque)
+
+    def __repr__(self):
+        return f"ListaOrdenada({list(self)!r})"
+
+
 # Ejemplo de uso
 if __name__ == "__main__":
     lista = [64, 34, 25, 12, 22, 11, 90]
     print("Lista original:", lista)
     resultado = tree_sort(lista.copy())
-    print("Lista ordenada (Tree Sort):", resultado)
\ No newline at end of file
+    print("Lista ordenada (Tree Sort):", resultado)
+
+    # Lista ordenada persistente: inserciones, eliminaciones y rangos en línea
+    ordenada = ListaOrdenada(lista, carga=4)
+    ordenada.add(50)
+    ordenada.remove(11)
+    ordenada.update([5, 95, 40])
+    print("ListaOrdenada:", list(ordenada))
+    print("  rank(50) =", ordenada.rank(50), "| select(0) =", ordenada.select(0))
+    print("  irange(20, 60) =", list(ordenada.irange(20, 60)))
\ No newline at end of file
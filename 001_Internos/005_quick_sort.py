@@ -1,10 +1,18 @@
-def quick_sort(arr):
+import heapq
+
+
+def quick_sort(arr, contadores=None):
     """
     Ordenamiento Rápido (Quick Sort).
     Complejidad: O(n log n) en promedio, O(n^2) en el peor caso.
     Estable: No (implementación estándar)
     In-place: Si (con optimizaciones)
+    contadores: Contadores opcional (ver contadores.py) para contar comparaciones,
+        elementos copiados a las particiones y profundidad de recursión.
     """
+    if contadores is not None and not contadores.midiendo:
+        return contadores.medir(quick_sort, arr, en_lugar=False)
+    
     if len(arr) <= 1:
         return arr
     
@@ -17,12 +25,94 @@ def quick_sort(arr):
     mayores = [x for x in arr if x > pivote]
     
     # Aplicar recursión y combinar
+    if contadores is not None:
+        contadores.movimientos += len(arr)
+        with contadores.nivel():
+            return quick_sort(menores, contadores) + iguales + quick_sort(mayores, contadores)
     return quick_sort(menores) + iguales + quick_sort(mayores)
 
 
+def iter_sorted(arr):
+    """
+    Ordenamiento Rápido Incremental (Incremental Quick Sort).
+    Complejidad: O(n + k log k) en promedio para consumir los k primeros.
+    Estable: No
+    In-place: No (trabaja sobre una copia)
+    Uso: Consumidores que solo leen el comienzo del orden (top-k, paginación).
+
+    Genera los elementos en orden: solo se particiona el tramo que contiene el
+    siguiente elemento; los tramos de la derecha quedan en una pila sin ordenar
+    hasta que se consumen.
+    """
+    arr = list(arr)
+    
+    # Pila de tramos pendientes (inicio, fin, listo); el tope es el de más a la izquierda
+    pendientes = [(0, len(arr), False)]
+    while pendientes:
+        inicio, fin, listo = pendientes.pop()
+        
+        # Tramos chicos o de elementos iguales al pivote: ya se pueden entregar
+        if not listo and fin - inicio <= 16:
+            arr[inicio:fin] = sorted(arr[inicio:fin])
+            listo = True
+        if listo:
+            yield from arr[inicio:fin]
+            continue
+        
+        menores, mayores = _particionar(arr, inicio, fin)
+        pendientes.append((mayores, fin, False))
+        pendientes.append((menores, mayores, True))
+        pendientes.append((inicio, menores, False))
+
+
+def _particionar(arr, inicio, fin):
+    """
+    Partición en tres grupos del tramo arr[inicio:fin] con el elemento central
+    como pivote. Retorna (menores, mayores): arr[inicio:menores] < pivote,
+    arr[menores:mayores] == pivote y arr[mayores:fin] > pivote.
+    """
+    pivote = arr[(inicio + fin) // 2]
+    menores, i, mayores = inicio, inicio, fin
+    while i < mayores:
+        if arr[i] < pivote:
+            arr[menores], arr[i] = arr[i], arr[menores]
+            menores += 1
+            i += 1
+        elif arr[i] > pivote:
+            mayores -= 1
+            arr[mayores], arr[i] = arr[i], arr[mayores]
+        else:
+            i += 1
+    return menores, mayores
+
+
+def iter_sorted_heap(arr):
+    """
+    Ordenamiento Perezoso con Heap (heapify + extracciones).
+    Complejidad: O(n + k log n) para consumir los k primeros.
+    Estable: No
+    In-place: No (trabaja sobre una copia)
+    """
+    heap = list(arr)
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)
+
+
 # Ejemplo de uso
 if __name__ == "__main__":
     lista = [64, 34, 25, 12, 22, 11, 90]
     print("Lista original:", lista)
     resultado = quick_sort(lista.copy())
-    print("Lista ordenada (Quick Sort):", resultado)
\ No newline at end of file
+    print("Lista ordenada (Quick Sort):", resultado)
+
+    # Versiones perezosas: solo se ordena lo que se consume
+    from itertools import islice
+    print("Tres menores (Incremental):", list(islice(iter_sorted(lista), 3)))
+    print("Tres menores (Heap):", list(islice(iter_sorted_heap(lista), 3)))
+    
+    # Conteo de operaciones (opcional, sin costo si no se pide)
+    from contadores import Contadores
+    contadores = Contadores()
+    quick_sort(lista.copy(), contadores)
+    print("Operaciones (Quick Sort):", contadores)
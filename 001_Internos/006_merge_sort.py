@@ -1,17 +1,28 @@
-def merge_sort(arr):
+def merge_sort(arr, contadores=None):
     """
     Ordenamiento por Mezcla (Merge Sort).
     Complejidad: O(n log n) en todos los casos.
     Estable: Si
     In-place: No
+    contadores: Contadores opcional (ver contadores.py) para contar comparaciones,
+        elementos fusionados y profundidad de recursión.
     """
+    if contadores is not None and not contadores.midiendo:
+        return contadores.medir(merge_sort, arr, en_lugar=False)
+    
     if len(arr) <= 1:
         return arr
     
     # Dividir el arreglo en dos mitades
     medio = len(arr) // 2
-    izquierda = merge_sort(arr[:medio])
-    derecha = merge_sort(arr[medio:])
+    if contadores is not None:
+        contadores.movimientos += len(arr)
+        with contadores.nivel():
+            izquierda = merge_sort(arr[:medio], contadores)
+            derecha = merge_sort(arr[medio:], contadores)
+    else:
+        izquierda = merge_sort(arr[:medio])
+        derecha = merge_sort(arr[medio:])
     
     # Fusionar las mitades ordenadas
     return merge(izquierda, derecha)
@@ -1,7 +1,15 @@
-def counting_sort_radix(arr, posicion):
+import os
+from array import array
+from itertools import accumulate
+from multiprocessing import Pool, shared_memory
+
+
+def counting_sort_radix(arr, posicion, contadores=None):
     """
     Counting Sort para una posición de dígito específica.
     Usado como subrutina de Radix Sort.
+    contadores: Contadores opcional; cuenta las n escrituras en el arreglo
+        auxiliar (las de arr las cuenta su ListaContada).
     """
     n = len(arr)
     resultado = [0] * n
@@ -23,19 +31,27 @@ def counting_sort_radix(arr, posicion):
         resultado[conteo[indice % 10] - 1] = arr[i]
         conteo[indice % 10] -= 1
         i -= 1
+    if contadores is not None:
+        contadores.movimientos += n
     
     # Copiar resultado al arreglo original
     for i in range(n):
         arr[i] = resultado[i]
 
 
-def radix_sort(arr):
+def radix_sort(arr, contadores=None):
     """
     Ordenamiento Radix (Radix Sort).
     Complejidad: O(d * (n + k)) donde d es el número de dígitos.
     Estable: Si
     In-place: No
+    contadores: Contadores opcional (ver contadores.py) para contar movimientos
+        (en el arreglo auxiliar y de vuelta en arr) y pasadas (llamadas); no
+        compara elementos.
     """
+    if contadores is not None and not contadores.midiendo:
+        return contadores.medir(radix_sort, arr, comparar=False)
+    
     if not arr:
         return arr
     
@@ -45,15 +61,165 @@ def radix_sort(arr):
     # Aplicar counting sort para cada posición de dígito
     posicion = 1
     while maximo // posicion > 0:
-        counting_sort_radix(arr, posicion)
+        if contadores is not None:
+            contadores.llamadas += 1
+        counting_sort_radix(arr, posicion, contadores)
         posicion *= 10
     
     return arr
 
 
+# Ancho de los valores en memoria compartida (enteros sin signo de 64 bits)
+TIPO_COMPARTIDO = 'Q'
+BITS_DIGITO = 8
+NUM_CUBETAS = 1 << BITS_DIGITO
+
+
+def radix_sort_paralelo(arr, num_procesos=None, tamanio_minimo=100000):
+    """
+    Ordenamiento Radix Paralelo (MSD + LSD).
+    Complejidad: O(n * d / p) con p procesos y d bytes por valor.
+    Estable: Si
+    In-place: No (usa dos buffers de memoria compartida)
+
+    Fase 1: cada proceso cuenta el byte más significativo de su fragmento.
+    Fase 2: una suma de prefijos global da a cada fragmento su posición de
+    escritura en cada una de las 256 cubetas.
+    Fase 3: cada proceso dispersa su fragmento en el buffer compartido de salida.
+    Fase 4: cada cubeta se ordena por separado con LSD sobre los bytes restantes.
+
+    Acepta enteros negativos: se ordena valor - mínimo, que debe caber en 64 bits.
+    Con menos de tamanio_minimo elementos (o num_procesos=1) las mismas fases
+    se ejecutan en el proceso actual.
+    """
+    n = len(arr)
+    if n < 2:
+        return arr
+
+    minimo = min(arr)
+    bits = (max(arr) - minimo).bit_length()
+    if bits > 64:
+        raise ValueError("El rango de valores no cabe en 64 bits")
+    desplazamiento = max(bits - BITS_DIGITO, 0)
+
+    tamanio = n * array(TIPO_COMPARTIDO).itemsize
+    entrada = shared_memory.SharedMemory(create=True, size=tamanio)
+    salida = shared_memory.SharedMemory(create=True, size=tamanio)
+    pool = None
+    try:
+        vista = entrada.buf.cast(TIPO_COMPARTIDO)
+        vista[:] = array(TIPO_COMPARTIDO, [valor - minimo for valor in arr])
+        vista.release()
+
+        if num_procesos != 1 and n >= tamanio_minimo:
+            procesos = num_procesos or os.cpu_count() or 1
+            pool = Pool(procesos)
+            mapear = pool.map
+        else:
+            procesos = 1
+            mapear = map
+
+        # Fase 1: Histogramas del byte superior por fragmento
+        paso = -(-n // procesos)
+        fragmentos = [(entrada.name, inicio, min(inicio + paso, n), desplazamiento)
+                      for inicio in range(0, n, paso)]
+        histogramas = list(mapear(_histograma_fragmento, fragmentos))
+
+        # Fase 2: Suma de prefijos global (cubeta por cubeta, fragmento por fragmento)
+        totales = [sum(h[cubeta] for h in histogramas) for cubeta in range(NUM_CUBETAS)]
+        inicios = [0] + list(accumulate(totales))
+        desplazamientos = []
+        posiciones = inicios[:NUM_CUBETAS]
+        for histograma in histogramas:
+            desplazamientos.append(list(posiciones))
+            posiciones = [p + c for p, c in zip(posiciones, histograma)]
+
+        # Fase 3: Dispersión en el buffer de salida con offsets precalculados
+        tareas = [(entrada.name, salida.name, inicio, fin, corrimiento, offsets)
+                  for (_, inicio, fin, corrimiento), offsets in zip(fragmentos, desplazamientos)]
+        list(mapear(_dispersar_fragmento, tareas))
+
+        # Fase 4: LSD independiente de cada cubeta no trivial
+        cubetas = [(salida.name, inicios[c], inicios[c + 1], desplazamiento)
+                   for c in range(NUM_CUBETAS) if inicios[c + 1] - inicios[c] > 1]
+        list(mapear(_ordenar_cubeta, cubetas))
+
+        vista = salida.buf.cast(TIPO_COMPARTIDO)
+        arr[:] = [valor + minimo for valor in vista]
+        vista.release()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        for memoria in (entrada, salida):
+            memoria.close()
+            memoria.unlink()
+
+    return arr
+
+
+def _histograma_fragmento(tarea):
+    """Cuenta los valores de cada cubeta (byte superior) en un fragmento."""
+    nombre, inicio, fin, desplazamiento = tarea
+    memoria = shared_memory.SharedMemory(name=nombre)
+    vista = memoria.buf.cast(TIPO_COMPARTIDO)
+    try:
+        conteo = [0] * NUM_CUBETAS
+        for valor in vista[inicio:fin]:
+            conteo[valor >> desplazamiento] += 1
+        return conteo
+    finally:
+        vista.release()
+        memoria.close()
+
+
+def _dispersar_fragmento(tarea):
+    """Escribe cada valor del fragmento en la siguiente posición de su cubeta."""
+    nombre_entrada, nombre_salida, inicio, fin, desplazamiento, offsets = tarea
+    entrada = shared_memory.SharedMemory(name=nombre_entrada)
+    salida = shared_memory.SharedMemory(name=nombre_salida)
+    origen = entrada.buf.cast(TIPO_COMPARTIDO)
+    destino = salida.buf.cast(TIPO_COMPARTIDO)
+    try:
+        for valor in origen[inicio:fin]:
+            cubeta = valor >> desplazamiento
+            destino[offsets[cubeta]] = valor
+            offsets[cubeta] += 1
+    finally:
+        origen.release()
+        destino.release()
+        entrada.close()
+        salida.close()
+
+
+def _ordenar_cubeta(tarea):
+    """LSD por bytes de los bits inferiores de una cubeta, en su lugar."""
+    nombre, inicio, fin, desplazamiento = tarea
+    memoria = shared_memory.SharedMemory(name=nombre)
+    vista = memoria.buf.cast(TIPO_COMPARTIDO)
+    try:
+        valores = vista[inicio:fin].tolist()
+        mascara = NUM_CUBETAS - 1
+        for corrimiento in range(0, desplazamiento, BITS_DIGITO):
+            digitos = [[] for _ in range(NUM_CUBETAS)]
+            for valor in valores:
+                digitos[(valor >> corrimiento) & mascara].append(valor)
+            valores = [valor for digito in digitos for valor in digito]
+        vista[inicio:fin] = array(TIPO_COMPARTIDO, valores)
+    finally:
+        vista.release()
+        memoria.close()
+
+
 # Ejemplo de uso
 if __name__ == "__main__":
     lista = [170, 45, 75, 90, 802, 24, 2, 66]
     print("Lista original:", lista)
     resultado = radix_sort(lista.copy())
-    print("Lista ordenada (Radix Sort):", resultado)
\ No newline at end of file
+    print("Lista ordenada (Radix Sort):", resultado)
+
+    import random
+    datos = [random.randint(-10**9, 10**9) for _ in range(200000)]
+    resultado = radix_sort_paralelo(datos.copy(), num_procesos=4)
+    print(f"Radix Sort paralelo de {len(datos)} enteros:",
+          "[OK]" if resultado == sorted(datos) else "[ERROR]")
\ No newline at end of file
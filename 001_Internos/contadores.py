@@ -0,0 +1,130 @@
+"""
+Contadores de Operaciones (Instrumentación Opcional)
+Cuenta comparaciones, movimientos de elementos, llamadas recursivas (o
+pasadas) y profundidad de recursión de los ordenamientos internos.
+
+Cada ordenamiento acepta contadores=None; sin contadores ejecuta el código de
+siempre. Con contadores, los elementos se envuelven en ElementoContado (cada
+comparación suma uno) y la lista en ListaContada (cada escritura suma un
+movimiento), y el mismo algoritmo corre sobre esas envolturas.
+"""
+
+from contextlib import contextmanager
+
+
+class Contadores:
+    """
+    Resultado de la instrumentación de un ordenamiento.
+        comparaciones: comparaciones entre elementos.
+        movimientos: escrituras de elementos en la lista o copias a listas nuevas.
+        llamadas: llamadas recursivas (o pasadas, en Radix Sort).
+        profundidad_maxima: mayor profundidad de recursión alcanzada.
+    Los valores se acumulan si se reutiliza la misma instancia.
+    """
+    def __init__(self):
+        self.comparaciones = 0
+        self.movimientos = 0
+        self.llamadas = 0
+        self.profundidad_maxima = 0
+        self.midiendo = False
+        self._profundidad = 0
+
+    def medir(self, funcion, arr, en_lugar=True, comparar=True):
+        """
+        Ejecuta funcion(lista, self) sobre las envolturas de arr y retorna el
+        resultado sin envolver. Con en_lugar=True el resultado también se copia
+        en arr (como hacen los ordenamientos in-place). comparar=False deja los
+        elementos sin envolver (Radix Sort hace aritmética con ellos).
+        """
+        if comparar:
+            lista = ListaContada(self, (ElementoContado(valor, self) for valor in arr))
+        else:
+            lista = ListaContada(self, arr)
+
+        self.midiendo = True
+        try:
+            resultado = funcion(lista, self)
+        finally:
+            self.midiendo = False
+
+        valores = [elemento.valor for elemento in resultado] if comparar else list(resultado)
+        if en_lugar:
+            arr[:] = valores
+            return arr
+        return valores
+
+    @contextmanager
+    def nivel(self):
+        """Cuenta una llamada recursiva y la profundidad mientras dura."""
+        self.llamadas += 1
+        self._profundidad += 1
+        self.registrar_profundidad(self._profundidad)
+        try:
+            yield
+        finally:
+            self._profundidad -= 1
+
+    def registrar_profundidad(self, profundidad):
+        self.profundidad_maxima = max(self.profundidad_maxima, profundidad)
+
+    def a_dict(self):
+        """Contadores como diccionario (para JSON)."""
+        return {
+            'comparaciones': self.comparaciones,
+            'movimientos': self.movimientos,
+            'llamadas': self.llamadas,
+            'profundidad_maxima': self.profundidad_maxima,
+        }
+
+    def __repr__(self):
+        campos = ", ".join(f"{nombre}={valor}" for nombre, valor in self.a_dict().items())
+        return f"Contadores({campos})"
+
+
+class ElementoContado:
+    """Envoltura de un valor que cuenta cada comparación en sus contadores."""
+    __slots__ = ('valor', 'contadores')
+
+    def __init__(self, valor, contadores):
+        self.valor = valor
+        self.contadores = contadores
+
+    def __lt__(self, otro):
+        self.contadores.comparaciones += 1
+        return self.valor < otro.valor
+
+    def __le__(self, otro):
+        self.contadores.comparaciones += 1
+        return self.valor <= otro.valor
+
+    def __gt__(self, otro):
+        self.contadores.comparaciones += 1
+        return self.valor > otro.valor
+
+    def __ge__(self, otro):
+        self.contadores.comparaciones += 1
+        return self.valor >= otro.valor
+
+    def __eq__(self, otro):
+        self.contadores.comparaciones += 1
+        return self.valor == otro.valor
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.valor)
+
+
+class ListaContada(list):
+    """Lista que cuenta cada elemento escrito con lista[i] = valor como un movimiento."""
+    def __init__(self, contadores, valores=()):
+        super().__init__(valores)
+        self.contadores = contadores
+
+    def __setitem__(self, indice, valor):
+        if isinstance(indice, slice):
+            valor = list(valor)
+            self.contadores.movimientos += len(valor)
+        else:
+            self.contadores.movimientos += 1
+        super().__setitem__(indice, valor)
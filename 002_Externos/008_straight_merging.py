@@ -1,101 +1,172 @@
 import os
-import tempfile
+from itertools import islice
 
+from codificacion_runs import (
+    EscritorRun, leer_entrada, decodificar_a_texto, compresion_para,
+    validar_agregado
+)
+from claves_registros import normalizar_clave
+from directorios_temporales import abrir_directorios, ruta_salida, mover_a_salida
+from indice_disperso import EscritorIndice, construir_indice
+import backend_numpy
+from fusion_runs import fusionar_dos_archivos
+from deteccion_orden import (
+    medir_orden, copiar_ordenado, escribir_runs_naturales,
+    ORDENADO, INVERTIDO, CASI_ORDENADO, DESORDENADO
+)
+from telemetria import Telemetria
 
-def straight_merging(archivo_entrada, tamanio_bloque=1000):
+
+def straight_merging(archivo_entrada, tamanio_bloque=1000, compresion=None,
+                     directorios_temp=None, directorio_salida=None, clave=None,
+                     unico=False, agregado=None, expandir=False, indice=None,
+                     detectar_orden=True, backend='python', lineas_invalidas=None,
+                     telemetria=None):
     """
     Straight Merging - Mezcla Directa.
     Complejidad: O(n log n) con acceso a disco.
     Uso: Archivos grandes que no caben en memoria.
+    compresion: None (texto), 'delta', 'zlib' o 'lzma' para los runs temporales,
+        o 'binario' (enteros de ancho fijo, fusionados con mmap; ver fusion_mmap).
+    directorios_temp: Directorios (discos) donde repartir los runs temporales.
+    directorio_salida: Directorio del archivo ordenado (por defecto, el de entrada).
+    clave: Especificación de clave (EspecClave, texto como "2:int:desc,0" o lista
+        de columnas) para ordenar registros delimitados en lugar de enteros.
+
+    unico: Si es True, elimina duplicados (una línea por clave distinta).
+    agregado: 'conteo' o 'suma' (líneas "valor peso") para colapsar claves iguales
+        en pares (valor, cantidad) al generar cada run y en cada fusión.
+    expandir: Con agregado 'conteo', repite cada valor cantidad veces en la salida
+        en lugar de escribir "valor<TAB>cantidad".
+    indice: Intervalo N del índice disperso (una clave cada N) que la fusión
+        final escribe junto a la salida como "<salida>.idx"; ver indice_disperso.
+    detectar_orden: Si es True, una lectura previa detecta entradas ya ordenadas
+        (se copian), invertidas (se copian al revés) o con pocos runs naturales
+        (se fusionan esos runs en lugar de bloques fijos).
+    backend: 'python', 'numpy' o 'auto'. Con NumPy (solo enteros sin clave,
+        agregado ni unico) los bloques se convierten y ordenan vectorizados y
+        los runs se fusionan por fragmentos; sin NumPy se usa Python.
+    lineas_invalidas: 'fallar' (por defecto), 'omitir' o 'contar' (o un
+        LineasInvalidas) para las líneas de la entrada que no se pueden convertir.
+    telemetria: Función, logging.Logger o ruta de un archivo de líneas JSON que
+        recibe los eventos de runs, pasadas y fin (ver telemetria).
     """
+    telemetria = Telemetria(telemetria, 'straight')
+    clave = normalizar_clave(clave)
+    validar_agregado(agregado, clave, expandir)
+    if indice is not None and (clave is not None or (agregado is not None and not expandir)):
+        raise ValueError("El índice disperso solo se genera para salidas de enteros")
+    compresion = compresion_para(compresion, clave, agregado)
+    colapsar = unico or agregado is not None
+
+    # Fase 0: Medir el orden previo; si ya está ordenada basta una copia
+    orden = DESORDENADO
+    if detectar_orden:
+        orden = medir_orden(archivo_entrada, tamanio_bloque, clave, agregado)
+        telemetria.emitir('orden_previo', orden=orden)
+    if orden in (ORDENADO, INVERTIDO) and not colapsar:
+        archivo_salida = ruta_salida(archivo_entrada, '_ordenado.txt', directorio_salida)
+        copiar_ordenado(archivo_entrada, archivo_salida, orden, clave, lineas_invalidas)
+        if indice is not None:
+            construir_indice(archivo_salida, indice)
+        telemetria.fin(archivo_salida)
+        return archivo_salida
+
+    if backend_numpy.usar_numpy(backend, clave, agregado, unico):
+        # Fases 1 y 2 vectorizadas: fusiones de a dos runs, como la mezcla directa
+        archivo_salida = ruta_salida(archivo_entrada, '_ordenado.txt', directorio_salida)
+        with abrir_directorios(directorios_temp) as espacio:
+            backend_numpy.ordenar(archivo_entrada, archivo_salida, tamanio_bloque, 2, espacio,
+                                  lineas_invalidas=lineas_invalidas, telemetria=telemetria)
+        if indice is not None:
+            construir_indice(archivo_salida, indice)
+        telemetria.fin(archivo_salida)
+        return archivo_salida
+
     archivos_temp = []
+    escritor_indice = EscritorIndice(indice) if indice is not None else None
     
-    # Fase 1: Dividir y ordenar bloques
-    with open(archivo_entrada, 'r') as f:
-        bloque_numero = 0
-        while True:
-            # Leer bloque de datos
-            lineas = []
-            for _ in range(tamanio_bloque):
-                linea = f.readline()
-                if not linea:
-                    break
-                lineas.append(int(linea.strip()))
+    with abrir_directorios(directorios_temp) as espacio:
+        inicio = telemetria.marca()
+        if orden in (ORDENADO, CASI_ORDENADO):
+            # Fase 1: Pocos runs naturales, se fusionan tal como vienen
+            archivos_temp = escribir_runs_naturales(archivo_entrada, espacio, compresion,
+                                                    clave, agregado, colapsar, lineas_invalidas)
+        else:
+            # Fase 1: Dividir y ordenar bloques
+            entrada = leer_entrada(archivo_entrada, clave, agregado, lineas_invalidas)
+            bloque_numero = 0
+            while True:
+                # Leer bloque de datos (enteros o registros con su clave ya extraída)
+                lineas = list(islice(entrada, tamanio_bloque))
             
-            if not lineas:
-                break
+                if not lineas:
+                    break
             
-            # Ordenar bloque en memoria
-            lineas.sort()
+                # Ordenar bloque en memoria
+                lineas.sort()
             
-            # Escribir bloque ordenado a archivo temporal
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-            for numero in lineas:
-                temp_file.write(f"{numero}\n")
-            temp_file.close()
-            archivos_temp.append(temp_file.name)
-            bloque_numero += 1
-    
-    # Fase 2: Fusionar archivos temporales
-    while len(archivos_temp) > 1:
-        nuevos_archivos = []
+                # Escribir bloque ordenado a archivo temporal (discos alternados),
+                # colapsando claves repetidas si se pidió unico o agregado
+                with EscritorRun(compresion=compresion, directorio=espacio.siguiente(),
+                                 colapsar=colapsar) as run:
+                    run.extender(lineas)
+                archivos_temp.append(run.nombre)
+                bloque_numero += 1
+        telemetria.runs(inicio, archivos_temp)
         
-        # Fusionar pares de archivos
-        for i in range(0, len(archivos_temp), 2):
-            if i + 1 < len(archivos_temp):
-                archivo_fusionado = fusionar_dos_archivos(
-                    archivos_temp[i], 
-                    archivos_temp[i + 1]
-                )
-                nuevos_archivos.append(archivo_fusionado)
-                
-                # Eliminar archivos temporales usados
-                os.remove(archivos_temp[i])
-                os.remove(archivos_temp[i + 1])
-            else:
-                nuevos_archivos.append(archivos_temp[i])
+        # Fase 2: Fusionar archivos temporales
+        while len(archivos_temp) > 1:
+            inicio = telemetria.marca()
+            nuevos_archivos = []
+            
+            # Fusionar pares de archivos, cada par leído de discos distintos
+            # La fusión final de texto registra el índice mientras escribe
+            final = len(archivos_temp) == 2 and compresion is None
+            for par in espacio.agrupar(archivos_temp, 2):
+                if len(par) == 2:
+                    archivo_fusionado = fusionar_dos_archivos(
+                        par[0], 
+                        par[1],
+                        compresion,
+                        espacio.siguiente(evitar=par),
+                        colapsar,
+                        escritor_indice if final else None
+                    )
+                    nuevos_archivos.append(archivo_fusionado)
+                    
+                    # Eliminar archivos temporales usados
+                    os.remove(par[0])
+                    os.remove(par[1])
+                else:
+                    nuevos_archivos.append(par[0])
+            
+            telemetria.pasada(inicio, 2, len(archivos_temp), len(nuevos_archivos))
+            archivos_temp = nuevos_archivos
         
-        archivos_temp = nuevos_archivos
+        # Mover archivo final (o decodificarlo si está comprimido)
+        archivo_salida = ruta_salida(archivo_entrada, '_ordenado.txt', directorio_salida)
+        if not archivos_temp:
+            # Entrada vacía (o sin líneas válidas): salida vacía
+            open(archivo_salida, 'wb').close()
+        elif compresion is None:
+            mover_a_salida(archivos_temp[0], archivo_salida)
+        else:
+            decodificar_a_texto(archivos_temp[0], archivo_salida, compresion, expandir,
+                                escritor_indice)
     
-    # Renombrar archivo final
-    archivo_salida = archivo_entrada.replace('.txt', '_ordenado.txt')
-    os.rename(archivos_temp[0], archivo_salida)
+    # Índice disperso: ya registrado en la fusión final, o construido con una
+    # lectura si hubo un solo run
+    if escritor_indice is not None:
+        if escritor_indice.cantidad or not os.path.getsize(archivo_salida):
+            escritor_indice.guardar(archivo_salida)
+        else:
+            construir_indice(archivo_salida, indice)
     
+    telemetria.fin(archivo_salida)
     return archivo_salida
 
 
-def fusionar_dos_archivos(archivo1, archivo2):
-    """Fusiona dos archivos ordenados en uno solo."""
-    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-    
-    with open(archivo1, 'r') as f1, open(archivo2, 'r') as f2:
-        linea1 = f1.readline()
-        linea2 = f2.readline()
-        
-        while linea1 and linea2:
-            num1 = int(linea1.strip())
-            num2 = int(linea2.strip())
-            
-            if num1 <= num2:
-                temp_file.write(f"{num1}\n")
-                linea1 = f1.readline()
-            else:
-                temp_file.write(f"{num2}\n")
-                linea2 = f2.readline()
-        
-        # Escribir elementos restantes
-        while linea1:
-            temp_file.write(linea1)
-            linea1 = f1.readline()
-        
-        while linea2:
-            temp_file.write(linea2)
-            linea2 = f2.readline()
-    
-    temp_file.close()
-    return temp_file.name
-
-
 # Ejemplo de uso
 if __name__ == "__main__":
     # Crear archivo de prueba
@@ -106,4 +177,13 @@ if __name__ == "__main__":
     
     print("Ordenando archivo con Straight Merging...")
     resultado = straight_merging('datos_grandes.txt', tamanio_bloque=500)
-    print(f"Archivo ordenado guardado como: {resultado}")
\ No newline at end of file
+    print(f"Archivo ordenado guardado como: {resultado}")
+
+    # Consultas sobre la salida con el índice disperso
+    from indice_disperso import SortedFileReader, ruta_indice
+    resultado = straight_merging('datos_grandes.txt', tamanio_bloque=500, indice=64)
+    with SortedFileReader(resultado) as lector:
+        print(f"Índice: {ruta_indice(resultado)} ({len(lector)} elementos)")
+        print(f"  ¿Contiene 5000? {5000 in lector}")
+        print(f"  Elementos en [1000, 2000): {lector.count(1000, 2000)}")
+        print(f"  Primeros de [5000, 5100): {list(lector.range(5000, 5100))[:5]}")
\ No newline at end of file
@@ -4,122 +4,130 @@ Algoritmo de ordenamiento externo que aprovecha secuencias ordenadas naturales.
 """
 
 import os
-import tempfile
 
+from codificacion_runs import (
+    EscritorRun, leer_entrada, decodificar_a_texto, compresion_para,
+    validar_agregado
+)
+from claves_registros import normalizar_clave
+from directorios_temporales import abrir_directorios, ruta_salida, mover_a_salida
+from fusion_runs import fusionar_dos_archivos
+from telemetria import Telemetria
 
-def natural_merging(archivo_entrada):
+
+def natural_merging(archivo_entrada, directorios_temp=None, directorio_salida=None,
+                    clave=None, unico=False, agregado=None, expandir=False,
+                    lineas_invalidas=None, telemetria=None):
     """
     Natural Merging - Mezcla Natural.
     Complejidad: O(n log m) donde m es el número de runs naturales.
     Uso: Archivos parcialmente ordenados.
+    directorios_temp: Directorios (discos) donde repartir los runs temporales.
+    directorio_salida: Directorio del archivo ordenado (por defecto, el de entrada).
+    clave: Especificación de clave (EspecClave, texto como "2:int:desc,0" o lista
+        de columnas) para ordenar registros delimitados en lugar de enteros.
+
+    unico: Si es True, elimina duplicados (una línea por clave distinta).
+    agregado: 'conteo' o 'suma' (líneas "valor peso") para colapsar claves iguales
+        en pares (valor, cantidad) al generar cada run y en cada fusión.
+    expandir: Con agregado 'conteo', repite cada valor cantidad veces en la salida
+        en lugar de escribir "valor<TAB>cantidad".
+    lineas_invalidas: 'fallar' (por defecto), 'omitir' o 'contar' (o un
+        LineasInvalidas) para las líneas de la entrada que no se pueden convertir.
+    telemetria: Función, logging.Logger o ruta de un archivo de líneas JSON que
+        recibe los eventos de runs, pasadas y fin (ver telemetria).
     """
-    # Fase 1: Identificar y distribuir runs naturales
-    archivos_temp = distribuir_runs_naturales(archivo_entrada)
-    
-    # Fase 2: Fusionar archivos hasta quedar uno solo
-    while len(archivos_temp) > 1:
-        nuevos_archivos = []
+    telemetria = Telemetria(telemetria, 'natural')
+    clave = normalizar_clave(clave)
+    validar_agregado(agregado, clave, expandir)
+    compresion = compresion_para(None, clave, agregado)
+    colapsar = unico or agregado is not None
+    
+    with abrir_directorios(directorios_temp) as espacio:
+        # Fase 1: Identificar y distribuir runs naturales
+        inicio = telemetria.marca()
+        archivos_temp = distribuir_runs_naturales(archivo_entrada, espacio, clave,
+                                                  agregado, colapsar, lineas_invalidas)
+        telemetria.runs(inicio, archivos_temp)
         
-        for i in range(0, len(archivos_temp), 2):
-            if i + 1 < len(archivos_temp):
-                archivo_fusionado = fusionar_dos_archivos(
-                    archivos_temp[i],
-                    archivos_temp[i + 1]
-                )
-                nuevos_archivos.append(archivo_fusionado)
-                os.remove(archivos_temp[i])
-                os.remove(archivos_temp[i + 1])
-            else:
-                nuevos_archivos.append(archivos_temp[i])
+        # Fase 2: Fusionar archivos hasta quedar uno solo
+        while len(archivos_temp) > 1:
+            inicio = telemetria.marca()
+            nuevos_archivos = []
+            
+            for par in espacio.agrupar(archivos_temp, 2):
+                if len(par) == 2:
+                    archivo_fusionado = fusionar_dos_archivos(
+                        par[0],
+                        par[1],
+                        compresion,
+                        espacio.siguiente(evitar=par),
+                        colapsar
+                    )
+                    nuevos_archivos.append(archivo_fusionado)
+                    os.remove(par[0])
+                    os.remove(par[1])
+                else:
+                    nuevos_archivos.append(par[0])
+            
+            telemetria.pasada(inicio, 2, len(archivos_temp), len(nuevos_archivos))
+            archivos_temp = nuevos_archivos
         
-        archivos_temp = nuevos_archivos
-    
-    archivo_salida = archivo_entrada.replace('.txt', '_ordenado_natural.txt')
-    os.rename(archivos_temp[0], archivo_salida)
-    
+        archivo_salida = ruta_salida(archivo_entrada, '_ordenado_natural.txt', directorio_salida)
+        if not archivos_temp:
+            # Entrada vacía (o sin líneas válidas): salida vacía
+            open(archivo_salida, 'wb').close()
+        elif compresion is None:
+            mover_a_salida(archivos_temp[0], archivo_salida)
+        else:
+            decodificar_a_texto(archivos_temp[0], archivo_salida, compresion, expandir)
+    
+    telemetria.fin(archivo_salida)
     return archivo_salida
 
 
-def distribuir_runs_naturales(archivo):
-    """Identifica y distribuye secuencias ordenadas naturales."""
+def distribuir_runs_naturales(archivo, espacio=None, clave=None, agregado=None,
+                              colapsar=False, lineas_invalidas=None):
+    """
+    Identifica y distribuye secuencias ordenadas naturales.
+    Si se indica espacio (DirectoriosTemporales), alterna los runs entre sus discos.
+    Si se indica clave (EspecClave), los elementos son registros (clave, registro).
+    Con agregado, los elementos son pares (elemento, cantidad).
+    """
     archivos_temp = []
-    
-    with open(archivo, 'r') as f:
-        run_actual = []
-        valor_anterior = None
-        
-        for linea in f:
-            valor = int(linea.strip())
+    compresion = compresion_para(None, clave, agregado)
+    
+    run_actual = []
+    valor_anterior = None
+    
+    for valor in leer_entrada(archivo, clave, agregado, lineas_invalidas):
+        # Si el valor mantiene orden ascendente, agregarlo al run
+        if valor_anterior is None or valor >= valor_anterior:
+            run_actual.append(valor)
+        else:
+            # Fin del run, guardar en archivo temporal
+            if run_actual:
+                archivos_temp.append(escribir_run(run_actual, espacio, compresion, colapsar))
             
-            # Si el valor mantiene orden ascendente, agregarlo al run
-            if valor_anterior is None or valor >= valor_anterior:
-                run_actual.append(valor)
-            else:
-                # Fin del run, guardar en archivo temporal
-                if run_actual:
-                    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-                    for num in run_actual:
-                        temp_file.write(f"{num}\n")
-                    temp_file.close()
-                    archivos_temp.append(temp_file.name)
-                
-                # Iniciar nuevo run
-                run_actual = [valor]
-            
-            valor_anterior = valor
+            # Iniciar nuevo run
+            run_actual = [valor]
         
-        # Guardar último run
-        if run_actual:
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-            for num in run_actual:
-                temp_file.write(f"{num}\n")
-            temp_file.close()
-            archivos_temp.append(temp_file.name)
+        valor_anterior = valor
+    
+    # Guardar último run
+    if run_actual:
+        archivos_temp.append(escribir_run(run_actual, espacio, compresion, colapsar))
     
     return archivos_temp
 
 
-def fusionar_dos_archivos(archivo1, archivo2):
-    """
-    Fusiona dos archivos ordenados en uno solo.
-    
-    Args:
-        archivo1: Ruta del primer archivo ordenado
-        archivo2: Ruta del segundo archivo ordenado
-    
-    Returns:
-        Ruta del archivo fusionado
-    """
-    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-    
-    with open(archivo1, 'r') as f1, open(archivo2, 'r') as f2:
-        linea1 = f1.readline()
-        linea2 = f2.readline()
-        
-        # Comparar y escribir el menor elemento
-        while linea1 and linea2:
-            num1 = int(linea1.strip())
-            num2 = int(linea2.strip())
-            
-            if num1 <= num2:
-                temp_file.write(f"{num1}\n")
-                linea1 = f1.readline()
-            else:
-                temp_file.write(f"{num2}\n")
-                linea2 = f2.readline()
-        
-        # Escribir elementos restantes del archivo 1
-        while linea1:
-            temp_file.write(linea1)
-            linea1 = f1.readline()
-        
-        # Escribir elementos restantes del archivo 2
-        while linea2:
-            temp_file.write(linea2)
-            linea2 = f2.readline()
-    
-    temp_file.close()
-    return temp_file.name
+def escribir_run(run, espacio=None, compresion=None, colapsar=False):
+    """Escribe un run natural a un archivo temporal y retorna su ruta."""
+    directorio = espacio.siguiente() if espacio else None
+    with EscritorRun(compresion=compresion, directorio=directorio,
+                     colapsar=colapsar) as temp_file:
+        temp_file.extender(run)
+    return temp_file.nombre
 
 
 # Ejemplo de uso
@@ -150,29 +158,15 @@ if __name__ == "__main__":
     
     print(f"Archivo ordenado guardado como: {resultado}")
     
-    # Verificar que está ordenado
-    print("\nVerificando orden...")
-    anterior = None
-    ordenado = True
-    contador = 0
-    
-    with open(resultado, 'r') as f:
-        for linea in f:
-            valor = int(linea.strip())
-            contador += 1
-            
-            if anterior is not None and valor < anterior:
-                ordenado = False
-                print(f"ERROR: Desorden encontrado en línea {contador}")
-                print(f"  Valor anterior: {anterior}, Valor actual: {valor}")
-                break
-            
-            anterior = valor
+    # Verificar orden y elementos contra la entrada
+    print("\nVerificando orden y elementos...")
+    from verificacion import verificar
+    verificacion = verificar(archivo_test, resultado)
     
-    if ordenado:
-        print(f"[OK] Archivo correctamente ordenado ({contador} elementos)")
+    if verificacion.correcto:
+        print(f"[OK] Archivo correctamente ordenado ({verificacion.elementos_salida} elementos)")
     else:
-        print("[ERROR] Archivo NO está ordenado correctamente")
+        print(f"[ERROR] Archivo NO está ordenado correctamente: {verificacion}")
     
     # Mostrar primeros 20 elementos
     print("\nPrimeros 20 elementos ordenados:")
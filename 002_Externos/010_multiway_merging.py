@@ -1,91 +1,260 @@
 import os
-import tempfile
 import heapq
+from contextlib import closing
+from itertools import islice
 
+import codificacion_runs
+from codificacion_runs import (
+    EscritorRun, leer_run, leer_entrada, decodificar_a_texto, compresion_para,
+    validar_agregado, valores_de_salida
+)
+from claves_registros import normalizar_clave
+from directorios_temporales import abrir_directorios, ruta_salida, mover_a_salida
+import backend_numpy
+from fusion_mmap import fusionar_runs_binarios
+from deteccion_orden import (
+    medir_orden, copiar_ordenado, escribir_runs_naturales,
+    ORDENADO, INVERTIDO, CASI_ORDENADO, DESORDENADO
+)
+from telemetria import Telemetria
 
-def balanced_multiway_merging(archivo_entrada, num_vias=4, tamanio_bloque=1000):
+
+def balanced_multiway_merging(archivo_entrada, num_vias=4, tamanio_bloque=1000,
+                              compresion=None, directorios_temp=None,
+                              directorio_salida=None, clave=None, unico=False,
+                              agregado=None, expandir=False, detectar_orden=True,
+                              backend='python', lineas_invalidas=None, telemetria=None):
     """
     Balanced Multiway Merging - Mezcla Balanceada Multivía.
     Complejidad: O(n log k) donde k es el número de vías.
     Uso: Reduce pasadas sobre disco usando fusión k-vías.
+    compresion: None (texto), 'delta', 'zlib' o 'lzma' para los runs temporales,
+        o 'binario' (enteros de ancho fijo, fusionados con mmap; ver fusion_mmap).
+    directorios_temp: Directorios (discos) donde repartir los runs temporales.
+    directorio_salida: Directorio del archivo ordenado (por defecto, el de entrada).
+    clave: Especificación de clave (EspecClave, texto como "2:int:desc,0" o lista
+        de columnas) para ordenar registros delimitados en lugar de enteros.
+
+    unico: Si es True, elimina duplicados (una línea por clave distinta).
+    agregado: 'conteo' o 'suma' (líneas "valor peso") para colapsar claves iguales
+        en pares (valor, cantidad) al generar cada run y en cada fusión.
+    expandir: Con agregado 'conteo', repite cada valor cantidad veces en la salida
+        en lugar de escribir "valor<TAB>cantidad".
+    detectar_orden: Si es True, una lectura previa detecta entradas ya ordenadas
+        (se copian), invertidas (se copian al revés) o con pocos runs naturales
+        (se fusionan esos runs en lugar de bloques fijos).
+    backend: 'python', 'numpy' o 'auto'. Con NumPy (solo enteros sin clave,
+        agregado ni unico) los bloques se convierten y ordenan vectorizados y
+        los runs se fusionan por fragmentos; sin NumPy se usa Python.
+    lineas_invalidas: 'fallar' (por defecto), 'omitir' o 'contar' (o un
+        LineasInvalidas) para las líneas de la entrada que no se pueden convertir.
+    telemetria: Función, logging.Logger o ruta de un archivo de líneas JSON que
+        recibe los eventos de runs, pasadas y fin (ver telemetria).
     """
-    # Fase 1: Dividir y ordenar bloques
-    archivos_temp = []
+    telemetria = Telemetria(telemetria, 'multiway')
+    clave = normalizar_clave(clave)
+    validar_agregado(agregado, clave, expandir)
+    compresion = compresion_para(compresion, clave, agregado)
+    colapsar = unico or agregado is not None
     
-    with open(archivo_entrada, 'r') as f:
-        while True:
-            lineas = []
-            for _ in range(tamanio_bloque):
-                linea = f.readline()
-                if not linea:
-                    break
-                lineas.append(int(linea.strip()))
-            
-            if not lineas:
-                break
-            
-            lineas.sort()
+    # Fase 0: Medir el orden previo; si ya está ordenada basta una copia
+    orden = DESORDENADO
+    if detectar_orden:
+        orden = medir_orden(archivo_entrada, tamanio_bloque, clave, agregado)
+        telemetria.emitir('orden_previo', orden=orden)
+    if orden in (ORDENADO, INVERTIDO) and not colapsar:
+        archivo_salida = ruta_salida(archivo_entrada, '_ordenado_multiway.txt', directorio_salida)
+        copiar_ordenado(archivo_entrada, archivo_salida, orden, clave, lineas_invalidas)
+        telemetria.fin(archivo_salida)
+        return archivo_salida
+    
+    if backend_numpy.usar_numpy(backend, clave, agregado, unico):
+        # Fases 1 y 2 vectorizadas con fusiones de num_vias runs
+        archivo_salida = ruta_salida(archivo_entrada, '_ordenado_multiway.txt', directorio_salida)
+        with abrir_directorios(directorios_temp) as espacio:
+            backend_numpy.ordenar(archivo_entrada, archivo_salida, tamanio_bloque, num_vias,
+                                  espacio, lineas_invalidas=lineas_invalidas,
+                                  telemetria=telemetria)
+        telemetria.fin(archivo_salida)
+        return archivo_salida
+    
+    with abrir_directorios(directorios_temp) as espacio:
+        # Fase 1: Dividir y ordenar bloques (o los runs naturales, si son pocos)
+        inicio = telemetria.marca()
+        archivos_temp = generar_runs(archivo_entrada, tamanio_bloque, orden, espacio,
+                                     compresion, clave, agregado, colapsar, lineas_invalidas)
+        telemetria.runs(inicio, archivos_temp)
+        
+        # Fase 2: Fusión multivía
+        archivos_temp = reducir_runs(archivos_temp, num_vias, espacio, compresion, colapsar,
+                                     telemetria=telemetria)
+        
+        archivo_salida = ruta_salida(archivo_entrada, '_ordenado_multiway.txt', directorio_salida)
+        if not archivos_temp:
+            # Entrada vacía (o sin líneas válidas): salida vacía
+            open(archivo_salida, 'wb').close()
+        elif compresion is None:
+            mover_a_salida(archivos_temp[0], archivo_salida)
+        else:
+            decodificar_a_texto(archivos_temp[0], archivo_salida, compresion, expandir)
+    
+    telemetria.fin(archivo_salida)
+    return archivo_salida
+
+
+def iter_sorted(archivo_entrada, num_vias=4, tamanio_bloque=1000, compresion=None,
+                directorios_temp=None, clave=None, unico=False, agregado=None,
+                expandir=False, detectar_orden=True, lineas_invalidas=None, telemetria=None):
+    """
+    Versión perezosa de balanced_multiway_merging: genera los valores ordenados
+    sin escribir el archivo de salida.
+    Complejidad: O(n log n) para crear los runs; la fusión final cuesta
+    O(log k) por valor consumido.
+    Uso: Consumidores que solo leen el comienzo del orden (top-k, paginación).
+
+    Las fusiones intermedias se hacen hasta que quedan num_vias runs o menos; la
+    última fusión es un heap sobre esos runs que avanza a medida que se consume.
+    Genera enteros, la línea (bytes, sin salto) de cada registro si hay clave, y
+    pares (valor, cantidad) con agregado (o el valor repetido si expandir=True).
+    Los runs temporales se eliminan al agotar o cerrar el generador.
+    Mismos parámetros que balanced_multiway_merging; la fusión final perezosa
+    cuenta como una pasada más en la telemetría.
+    """
+    telemetria = Telemetria(telemetria, 'multiway')
+    clave = normalizar_clave(clave)
+    validar_agregado(agregado, clave, expandir)
+    compresion = compresion_para(compresion, clave, agregado)
+    colapsar = unico or agregado is not None
+    
+    # Fase 0: Medir el orden previo; una entrada ya ordenada se lee tal cual
+    orden = DESORDENADO
+    if detectar_orden:
+        orden = medir_orden(archivo_entrada, tamanio_bloque, clave, agregado)
+        telemetria.emitir('orden_previo', orden=orden)
+    if orden == ORDENADO and not colapsar:
+        with closing(leer_entrada(archivo_entrada, clave, agregado, lineas_invalidas)) as entrada:
+            yield from valores_de_salida(entrada, expandir)
+        telemetria.fin()
+        return
+    
+    with abrir_directorios(directorios_temp) as espacio:
+        # Fase 1: Dividir y ordenar bloques (o los runs naturales, si son pocos)
+        inicio = telemetria.marca()
+        archivos_temp = generar_runs(archivo_entrada, tamanio_bloque, orden, espacio,
+                                     compresion, clave, agregado, colapsar, lineas_invalidas)
+        telemetria.runs(inicio, archivos_temp)
+        try:
+            # Fase 2: Fusiones intermedias hasta que quede una sola fusión
+            archivos_temp = reducir_runs(archivos_temp, num_vias, espacio, compresion,
+                                         colapsar, limite=num_vias, telemetria=telemetria)
             
-            temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-            for numero in lineas:
-                temp_file.write(f"{numero}\n")
-            temp_file.close()
-            archivos_temp.append(temp_file.name)
+            # Fase 3: Fusión final perezosa
+            inicio = telemetria.marca()
+            fusion = heapq.merge(*[leer_run(archivo, compresion) for archivo in archivos_temp])
+            if colapsar:
+                fusion = codificacion_runs.colapsar(fusion)
+            yield from valores_de_salida(fusion, expandir)
+            telemetria.pasada(inicio, len(archivos_temp), len(archivos_temp), 0)
+            telemetria.fin()
+        finally:
+            for archivo in archivos_temp:
+                if os.path.exists(archivo):
+                    os.remove(archivo)
+
+
+def generar_runs(archivo_entrada, tamanio_bloque, orden, espacio, compresion=None,
+                 clave=None, agregado=None, colapsar=False, lineas_invalidas=None):
+    """
+    Escribe los runs iniciales repartidos entre los discos de espacio: los runs
+    naturales si la entrada está (casi) ordenada, o bloques ordenados en memoria.
+    Retorna las rutas de los runs.
+    """
+    if orden in (ORDENADO, CASI_ORDENADO):
+        # Pocos runs naturales, se fusionan tal como vienen
+        return escribir_runs_naturales(archivo_entrada, espacio, compresion,
+                                       clave, agregado, colapsar, lineas_invalidas)
     
-    # Fase 2: Fusión multivía
-    while len(archivos_temp) > 1:
+    archivos_temp = []
+    entrada = leer_entrada(archivo_entrada, clave, agregado, lineas_invalidas)
+    while True:
+        lineas = list(islice(entrada, tamanio_bloque))
+        
+        if not lineas:
+            break
+        
+        lineas.sort()
+        
+        with EscritorRun(compresion=compresion, directorio=espacio.siguiente(),
+                         colapsar=colapsar) as run:
+            run.extender(lineas)
+        archivos_temp.append(run.nombre)
+    return archivos_temp
+
+
+def reducir_runs(archivos_temp, num_vias, espacio, compresion=None, colapsar=False, limite=1,
+                 telemetria=None):
+    """
+    Fusiona grupos de num_vias runs por pasada hasta que quedan limite runs o
+    menos. Retorna las rutas de los runs resultantes.
+    telemetria: Telemetria del ordenamiento, que recibe un evento por pasada.
+    """
+    if telemetria is None:
+        telemetria = Telemetria()
+    while len(archivos_temp) > limite:
+        inicio = telemetria.marca()
         nuevos_archivos = []
         
-        # Fusionar en grupos de num_vias archivos
-        for i in range(0, len(archivos_temp), num_vias):
-            grupo = archivos_temp[i:i + num_vias]
-            archivo_fusionado = fusionar_multiples_archivos(grupo)
+        # Fusionar en grupos de num_vias archivos, leyendo de discos distintos
+        for grupo in espacio.agrupar(archivos_temp, num_vias):
+            archivo_fusionado = fusionar_multiples_archivos(
+                grupo, compresion, espacio.siguiente(evitar=grupo), colapsar
+            )
             nuevos_archivos.append(archivo_fusionado)
             
             # Eliminar archivos temporales
             for archivo in grupo:
                 os.remove(archivo)
         
+        telemetria.pasada(inicio, num_vias, len(archivos_temp), len(nuevos_archivos))
         archivos_temp = nuevos_archivos
-    
-    archivo_salida = archivo_entrada.replace('.txt', '_ordenado_multiway.txt')
-    os.rename(archivos_temp[0], archivo_salida)
-    
-    return archivo_salida
+    return archivos_temp
 
 
-def fusionar_multiples_archivos(archivos):
-    """Fusiona múltiples archivos usando un heap."""
-    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
+def fusionar_multiples_archivos(archivos, compresion=None, directorio=None, colapsar=False):
+    """
+    Fusiona múltiples archivos usando un heap.
+    Con colapsar=True, las claves iguales de todos los archivos se reducen a una.
+    Los runs 'binario' se fusionan con mmap, por tramos contiguos.
+    """
+    if compresion == 'binario' and not colapsar:
+        return fusionar_runs_binarios(archivos, directorio)
     
-    # Abrir todos los archivos
-    files = [open(archivo, 'r') for archivo in archivos]
+    salida = EscritorRun(compresion=compresion, directorio=directorio, colapsar=colapsar)
+    
+    # Abrir todos los archivos (lectura perezosa, bloque a bloque)
+    lectores = [leer_run(archivo, compresion) for archivo in archivos]
     
     # Heap: (valor, índice_archivo)
     heap = []
     
     # Inicializar heap con primer elemento de cada archivo
-    for i, f in enumerate(files):
-        linea = f.readline()
-        if linea:
-            heapq.heappush(heap, (int(linea.strip()), i))
+    for i, lector in enumerate(lectores):
+        valor = next(lector, None)
+        if valor is not None:
+            heapq.heappush(heap, (valor, i))
     
     # Extraer mínimo y agregar siguiente elemento del mismo archivo
     while heap:
         valor, indice = heapq.heappop(heap)
-        temp_file.write(f"{valor}\n")
+        salida.escribir(valor)
         
-        # Leer siguiente línea del archivo correspondiente
-        linea = files[indice].readline()
-        if linea:
-            heapq.heappush(heap, (int(linea.strip()), indice))
-    
-    # Cerrar todos los archivos
-    for f in files:
-        f.close()
+        # Leer siguiente valor del archivo correspondiente
+        siguiente = next(lectores[indice], None)
+        if siguiente is not None:
+            heapq.heappush(heap, (siguiente, indice))
     
-    temp_file.close()
-    return temp_file.name
+    salida.close()
+    return salida.nombre
 
 
 # Ejemplo de uso
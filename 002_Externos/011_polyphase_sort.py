@@ -4,96 +4,269 @@ Algoritmo de ordenamiento externo optimizado.
 """
 
 import os
-import tempfile
+import heapq
+from contextlib import closing
+from itertools import islice
 
+import codificacion_runs
+from codificacion_runs import (
+    EscritorRun, leer_run, leer_primer_run, leer_entrada, decodificar_a_texto,
+    compresion_para, validar_agregado, valores_de_salida
+)
+from claves_registros import normalizar_clave
+from directorios_temporales import abrir_directorios, ruta_salida
+import backend_numpy
+from deteccion_orden import (
+    medir_orden, copiar_ordenado, runs_naturales,
+    ORDENADO, INVERTIDO, CASI_ORDENADO, DESORDENADO
+)
+from telemetria import Telemetria
 
-def polyphase_sort(archivo_entrada, num_archivos=3, tamanio_bloque=500):
+
+def polyphase_sort(archivo_entrada, num_archivos=3, tamanio_bloque=500, compresion=None,
+                   directorios_temp=None, directorio_salida=None, clave=None,
+                   unico=False, agregado=None, expandir=False, detectar_orden=True,
+                   backend='python', lineas_invalidas=None, telemetria=None):
     """
     Polyphase Sort - Ordenamiento Polifásico.
     Complejidad: O(n log n) con menos operaciones de fusión.
     Uso: Optimización cuando el número de archivos temporales es limitado.
+    compresion: None (texto), 'delta', 'zlib' o 'lzma' para los archivos de runs
+        ('binario' no sirve aquí: cada archivo guarda varios runs con marcadores).
+    directorios_temp: Directorios (discos) donde repartir los archivos de runs.
+    directorio_salida: Directorio del archivo ordenado (por defecto, el de entrada).
+    clave: Especificación de clave (EspecClave, texto como "2:int:desc,0" o lista
+        de columnas) para ordenar registros delimitados en lugar de enteros.
+
+    unico: Si es True, elimina duplicados (una línea por clave distinta).
+    agregado: 'conteo' o 'suma' (líneas "valor peso") para colapsar claves iguales
+        en pares (valor, cantidad) al generar cada run y en cada fusión.
+    expandir: Con agregado 'conteo', repite cada valor cantidad veces en la salida
+        en lugar de escribir "valor<TAB>cantidad".
+    detectar_orden: Si es True, una lectura previa detecta entradas ya ordenadas
+        (se copian), invertidas (se copian al revés) o con pocos runs naturales
+        (se fusionan esos runs en lugar de bloques fijos).
+    backend: 'python', 'numpy' o 'auto'. Con NumPy (solo enteros sin clave,
+        agregado ni unico) los runs iniciales se convierten y ordenan vectorizados.
+    lineas_invalidas: 'fallar' (por defecto), 'omitir' o 'contar' (o un
+        LineasInvalidas) para las líneas de la entrada que no se pueden convertir.
+    telemetria: Función, logging.Logger o ruta de un archivo de líneas JSON que
+        recibe los eventos de runs, pasadas, fin y error (ver telemetria).
     """
-    # Fase 1: Crear runs ordenados
-    runs = crear_runs_ordenados(archivo_entrada, tamanio_bloque)
+    telemetria = Telemetria(telemetria, 'polyphase')
+    clave = normalizar_clave(clave)
+    validar_agregado(agregado, clave, expandir)
+    compresion = compresion_para(compresion, clave, agregado)
+    if compresion == 'binario':
+        raise ValueError("Polyphase Sort necesita marcadores de run: use otra compresión")
+    colapsar = unico or agregado is not None
+    
+    # Fase 0: Medir el orden previo; si ya está ordenada basta una copia
+    orden = DESORDENADO
+    if detectar_orden:
+        orden = medir_orden(archivo_entrada, tamanio_bloque, clave, agregado)
+        telemetria.emitir('orden_previo', orden=orden)
+    if orden in (ORDENADO, INVERTIDO) and not colapsar:
+        archivo_salida = ruta_salida(archivo_entrada, '_ordenado_polyphase.txt', directorio_salida)
+        copiar_ordenado(archivo_entrada, archivo_salida, orden, clave, lineas_invalidas)
+        telemetria.fin(archivo_salida)
+        return archivo_salida
+    
+    # Fase 1: Crear runs ordenados (los runs naturales, si son pocos)
+    inicio = telemetria.marca()
+    if orden in (ORDENADO, CASI_ORDENADO):
+        runs = crear_runs_naturales(archivo_entrada, clave, agregado, colapsar, lineas_invalidas)
+    elif backend_numpy.usar_numpy(backend, clave, agregado, unico):
+        runs = crear_runs_numpy(archivo_entrada, tamanio_bloque, lineas_invalidas)
+    else:
+        runs = crear_runs_ordenados(archivo_entrada, tamanio_bloque, clave, agregado, colapsar,
+                                    lineas_invalidas)
     
-    if not runs:
-        print("ERROR: No se pudieron crear runs")
-        return None
+    telemetria.runs(inicio, longitudes=[len(run) for run in runs])
     
-    print(f"  Se crearon {len(runs)} runs iniciales")
+    # Entrada vacía (o sin líneas válidas): salida vacía
+    if not runs:
+        archivo_salida = ruta_salida(archivo_entrada, '_ordenado_polyphase.txt', directorio_salida)
+        open(archivo_salida, 'wb').close()
+        telemetria.fin(archivo_salida)
+        return archivo_salida
+    
+    with abrir_directorios(directorios_temp) as espacio:
+        # Fase 2: Distribuir runs según secuencia de Fibonacci (un archivo por disco)
+        max_iteraciones = 2 * len(runs)
+        archivos_temp = distribuir_polifasico(runs, num_archivos, compresion, espacio)
+        del runs
+        telemetria.emitir('distribucion', archivos=len(archivos_temp))
+        
+        # Fase 3: Fusión polifásica iterativa (un run de cada entrada por fase)
+        iteracion = 0
+        while not todos_runs_fusionados(archivos_temp, compresion):
+            iteracion += 1
+            # Cada fase con dos entradas con datos reduce los runs en uno, y una
+            # fase con una sola entrada deja datos en dos: a lo sumo 2 fases por run
+            if iteracion > max_iteraciones:
+                mensaje = f"Polyphase Sort no terminó en {max_iteraciones} fases"
+                telemetria.emitir('error', mensaje=mensaje)
+                raise RuntimeError(mensaje)
+            inicio = telemetria.marca()
+            archivos_temp = fase_fusion_polifasica(archivos_temp, compresion, colapsar)
+            telemetria.pasada(inicio, len(archivos_temp) - 1, len(archivos_temp) - 1, 1)
+        
+        # Encontrar archivo con todos los datos y retornarlo
+        archivo_salida = finalizar_ordenamiento(archivos_temp, archivo_entrada, compresion,
+                                                directorio_salida, expandir)
     
-    # Fase 2: Distribuir runs según secuencia de Fibonacci
-    archivos_temp = distribuir_polifasico(runs, num_archivos)
+    telemetria.fin(archivo_salida)
+    return archivo_salida
+
+
+def iter_sorted(archivo_entrada, num_archivos=3, tamanio_bloque=500, compresion=None,
+                directorios_temp=None, clave=None, unico=False, agregado=None,
+                expandir=False, detectar_orden=True, backend='python', lineas_invalidas=None,
+                telemetria=None):
+    """
+    Versión perezosa de polyphase_sort: genera los valores ordenados sin
+    escribir el archivo de salida.
+    Complejidad: O(n log n) hasta la última fase; la fusión final cuesta
+    O(log k) por valor consumido.
+    Uso: Consumidores que solo leen el comienzo del orden (top-k, paginación).
+
+    Las fases polifásicas se aplican hasta que cada archivo guarda a lo sumo un
+    run; esa última fase es un heap sobre los runs que avanza a medida que se
+    consume. Genera los mismos valores que iter_sorted de 010_multiway_merging.
+    Los archivos de runs se eliminan al agotar o cerrar el generador.
+    Mismos parámetros que polyphase_sort.
+    """
+    telemetria = Telemetria(telemetria, 'polyphase')
+    clave = normalizar_clave(clave)
+    validar_agregado(agregado, clave, expandir)
+    compresion = compresion_para(compresion, clave, agregado)
+    if compresion == 'binario':
+        raise ValueError("Polyphase Sort necesita marcadores de run: use otra compresión")
+    colapsar = unico or agregado is not None
+    
+    # Fase 0: Medir el orden previo; una entrada ya ordenada se lee tal cual
+    orden = DESORDENADO
+    if detectar_orden:
+        orden = medir_orden(archivo_entrada, tamanio_bloque, clave, agregado)
+        telemetria.emitir('orden_previo', orden=orden)
+    if orden == ORDENADO and not colapsar:
+        with closing(leer_entrada(archivo_entrada, clave, agregado, lineas_invalidas)) as entrada:
+            yield from valores_de_salida(entrada, expandir)
+        telemetria.fin()
+        return
     
-    print(f"  Runs distribuidos en {len(archivos_temp)} archivos")
+    # Fase 1: Crear runs ordenados (los runs naturales, si son pocos)
+    inicio = telemetria.marca()
+    if orden in (ORDENADO, CASI_ORDENADO):
+        runs = crear_runs_naturales(archivo_entrada, clave, agregado, colapsar, lineas_invalidas)
+    elif backend_numpy.usar_numpy(backend, clave, agregado, unico):
+        runs = crear_runs_numpy(archivo_entrada, tamanio_bloque, lineas_invalidas)
+    else:
+        runs = crear_runs_ordenados(archivo_entrada, tamanio_bloque, clave, agregado, colapsar,
+                                    lineas_invalidas)
+    if not runs:
+        telemetria.fin()
+        return
+    telemetria.runs(inicio, longitudes=[len(run) for run in runs])
+    
+    with abrir_directorios(directorios_temp) as espacio:
+        # Fase 2: Distribuir runs según secuencia de Fibonacci (un archivo por disco)
+        archivos_temp = distribuir_polifasico(runs, num_archivos, compresion, espacio)
+        del runs
+        try:
+            # Fase 3: Fusión polifásica hasta la última fase
+            while max(contar_runs(archivo, compresion) for archivo in archivos_temp) > 1:
+                inicio = telemetria.marca()
+                archivos_temp = fase_fusion_polifasica(archivos_temp, compresion, colapsar)
+                telemetria.pasada(inicio, len(archivos_temp) - 1, len(archivos_temp) - 1, 1)
+            
+            # Fase 4: Última fase perezosa, un run de cada archivo
+            inicio = telemetria.marca()
+            fusion = heapq.merge(*[leer_run(archivo, compresion) for archivo in archivos_temp])
+            if colapsar:
+                fusion = codificacion_runs.colapsar(fusion)
+            yield from valores_de_salida(fusion, expandir)
+            telemetria.pasada(inicio, len(archivos_temp), len(archivos_temp), 0)
+            telemetria.fin()
+        finally:
+            for archivo in archivos_temp:
+                if os.path.exists(archivo):
+                    os.remove(archivo)
+
+
+def crear_runs_ordenados(archivo, tamanio_bloque, clave=None, agregado=None, colapsar=False,
+                         lineas_invalidas=None):
+    """
+    Crea runs ordenados del archivo original.
+    Si se indica clave (EspecClave), los elementos son registros (clave, registro).
+    Con agregado, los elementos son pares (elemento, cantidad); con colapsar=True
+    cada run conserva una sola entrada por clave.
+    Las líneas inválidas se tratan según lineas_invalidas (ver texto_enteros).
+    """
+    runs = []
     
-    # Fase 3: Fusión polifásica iterativa
-    iteracion = 0
-    while not todos_runs_fusionados(archivos_temp):
-        iteracion += 1
-        print(f"  Iteración de fusión {iteracion}...")
-        archivos_temp = fase_fusion_polifasica(archivos_temp)
+    entrada = leer_entrada(archivo, clave, agregado, lineas_invalidas)
+    while True:
+        bloque = list(islice(entrada, tamanio_bloque))
         
-        # Prevenir bucle infinito
-        if iteracion > 100:
-            print("ERROR: Demasiadas iteraciones, posible bucle infinito")
+        if not bloque:
             break
+        
+        bloque.sort()
+        runs.append(list(codificacion_runs.colapsar(bloque)) if colapsar else bloque)
     
-    # Encontrar archivo con todos los datos y retornarlo
-    return finalizar_ordenamiento(archivos_temp, archivo_entrada)
+    return runs
 
 
-def crear_runs_ordenados(archivo, tamanio_bloque):
-    """Crea runs ordenados del archivo original."""
+def crear_runs_naturales(archivo, clave=None, agregado=None, colapsar=False,
+                         lineas_invalidas=None):
+    """
+    Crea los runs a partir de los runs ascendentes que ya trae el archivo,
+    sin ordenar bloques. Mismos elementos que crear_runs_ordenados.
+    """
     runs = []
-    
-    try:
-        with open(archivo, 'r') as f:
-            while True:
-                bloque = []
-                for _ in range(tamanio_bloque):
-                    linea = f.readline()
-                    if not linea:
-                        break
-                    bloque.append(int(linea.strip()))
-                
-                if not bloque:
-                    break
-                
-                runs.append(sorted(bloque))
-    except Exception as e:
-        print(f"ERROR al crear runs: {e}")
-        return []
-    
+    for run in runs_naturales(leer_entrada(archivo, clave, agregado, lineas_invalidas)):
+        runs.append(list(codificacion_runs.colapsar(run)) if colapsar else run)
     return runs
 
 
-def distribuir_polifasico(runs, num_archivos):
+def crear_runs_numpy(archivo, tamanio_bloque, lineas_invalidas=None):
+    """
+    Crea los runs iniciales con NumPy: cada bloque se convierte de una vez y
+    se ordena con np.sort. Mismo resultado que crear_runs_ordenados.
+    """
+    bloques = backend_numpy.bloques_ordenados(archivo, tamanio_bloque, lineas_invalidas)
+    return [bloque.tolist() for bloque in bloques]
+
+
+def distribuir_polifasico(runs, num_archivos, compresion=None, espacio=None):
     """
     Distribuye runs según patrón polifásico.
+    Si se indica espacio (DirectoriosTemporales), reparte los archivos entre sus discos.
     Retorna lista de nombres de archivos temporales.
     """
     archivos = []
     
     # Crear archivos temporales
     for _ in range(num_archivos):
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
+        directorio = espacio.siguiente() if espacio else None
+        temp_file = EscritorRun(compresion=compresion, directorio=directorio)
         temp_file.close()
-        archivos.append(temp_file.name)
+        archivos.append(temp_file.nombre)
     
     # Distribución simple: alternar entre archivos (dejar uno vacío para fusión)
     for i, run in enumerate(runs):
         indice_archivo = i % (num_archivos - 1)
         
-        with open(archivos[indice_archivo], 'a') as f:
-            for num in run:
-                f.write(f"{num}\n")
-            f.write("RUN_END\n")
+        with EscritorRun(archivos[indice_archivo], compresion, modo='a') as f:
+            f.extender(run)
+            f.terminar_run()
     
     return archivos
 
 
-def fase_fusion_polifasica(archivos):
+def fase_fusion_polifasica(archivos, compresion=None, colapsar=False):
     """
     Realiza una fase de fusión polifásica.
     Retorna lista actualizada de archivos.
@@ -101,73 +274,51 @@ def fase_fusion_polifasica(archivos):
     # Encontrar archivo de salida (el que tiene menos runs)
     conteo_runs = []
     for archivo in archivos:
-        conteo_runs.append(contar_runs(archivo))
+        conteo_runs.append(contar_runs(archivo, compresion))
     
     indice_salida = conteo_runs.index(min(conteo_runs))
     archivo_salida = archivos[indice_salida]
     archivos_entrada = [f for i, f in enumerate(archivos) if i != indice_salida]
     
     # Fusionar un run de cada archivo de entrada
-    fusionar_un_run_cada_archivo(archivos_entrada, archivo_salida)
+    fusionar_un_run_cada_archivo(archivos_entrada, archivo_salida, compresion, colapsar)
     
     return archivos
 
 
-def contar_runs(archivo):
+def contar_runs(archivo, compresion=None):
     """Cuenta el número de runs en un archivo."""
     if not os.path.exists(archivo) or os.path.getsize(archivo) == 0:
         return 0
     
-    conteo = 0
-    try:
-        with open(archivo, 'r') as f:
-            for linea in f:
-                if linea.strip() == "RUN_END":
-                    conteo += 1
-    except:
-        return 0
-    
-    return conteo
+    return codificacion_runs.contar_runs(archivo, compresion)
 
 
-def fusionar_un_run_cada_archivo(archivos_entrada, archivo_salida):
-    """Fusiona un run de cada archivo de entrada al archivo de salida."""
-    try:
-        files = [open(archivo, 'r') for archivo in archivos_entrada]
-    except:
-        return
-    
+def fusionar_un_run_cada_archivo(archivos_entrada, archivo_salida, compresion=None,
+                                 colapsar=False):
+    """
+    Fusiona un run de cada archivo de entrada al archivo de salida.
+    Con colapsar=True, las claves iguales de los runs fusionados se reducen a una.
+    """
     # Leer primer run de cada archivo
     runs = []
-    for f in files:
-        run = []
-        for linea in f:
-            if linea.strip() == "RUN_END":
-                break
-            try:
-                run.append(int(linea.strip()))
-            except:
-                continue
+    for archivo in archivos_entrada:
+        run = leer_primer_run(archivo, compresion)
         if run:
             runs.append(run)
     
-    # Cerrar archivos
-    for f in files:
-        f.close()
-    
     # Fusionar runs
     if runs:
         run_fusionado = fusionar_runs(runs)
         
         # Escribir run fusionado
-        with open(archivo_salida, 'a') as f:
-            for num in run_fusionado:
-                f.write(f"{num}\n")
-            f.write("RUN_END\n")
+        with EscritorRun(archivo_salida, compresion, modo='a', colapsar=colapsar) as f:
+            f.extender(run_fusionado)
+            f.terminar_run()
     
     # Reescribir archivos de entrada sin el run procesado
     for archivo in archivos_entrada:
-        reescribir_sin_primer_run(archivo)
+        reescribir_sin_primer_run(archivo, compresion)
 
 
 def fusionar_runs(runs):
@@ -195,35 +346,19 @@ def fusionar_runs(runs):
     return resultado
 
 
-def reescribir_sin_primer_run(archivo):
+def reescribir_sin_primer_run(archivo, compresion=None):
     """Reescribe el archivo eliminando el primer run."""
-    try:
-        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-        
-        primer_run_eliminado = False
-        with open(archivo, 'r') as f:
-            for linea in f:
-                if not primer_run_eliminado:
-                    if linea.strip() == "RUN_END":
-                        primer_run_eliminado = True
-                    continue
-                temp_file.write(linea)
-        
-        temp_file.close()
-        os.remove(archivo)
-        os.rename(temp_file.name, archivo)
-    except Exception as e:
-        print(f"ERROR al reescribir archivo: {e}")
+    codificacion_runs.eliminar_primer_run(archivo, compresion)
 
 
-def todos_runs_fusionados(archivos):
+def todos_runs_fusionados(archivos, compresion=None):
     """Verifica si todos los runs están en un solo archivo."""
     archivos_con_datos = 0
     total_runs = 0
     
     for archivo in archivos:
         if os.path.exists(archivo):
-            runs = contar_runs(archivo)
+            runs = contar_runs(archivo, compresion)
             if runs > 0:
                 archivos_con_datos += 1
                 total_runs += runs
@@ -232,7 +367,8 @@ def todos_runs_fusionados(archivos):
     return archivos_con_datos == 1 and total_runs == 1
 
 
-def finalizar_ordenamiento(archivos_temp, archivo_entrada):
+def finalizar_ordenamiento(archivos_temp, archivo_entrada, compresion=None,
+                           directorio_salida=None, expandir=False):
     """
     Encuentra el archivo con los datos ordenados y lo renombra.
     Retorna el nombre del archivo de salida.
@@ -245,24 +381,17 @@ def finalizar_ordenamiento(archivos_temp, archivo_entrada):
             break
     
     if archivo_con_datos is None:
-        print("ERROR: No se encontró archivo con datos ordenados")
-        return None
+        raise RuntimeError("No se encontró archivo con datos ordenados")
     
     # Crear archivo de salida sin marcadores RUN_END
-    archivo_salida = archivo_entrada.replace('.txt', '_ordenado_polyphase.txt')
+    archivo_salida = ruta_salida(archivo_entrada, '_ordenado_polyphase.txt', directorio_salida)
     
-    with open(archivo_con_datos, 'r') as entrada, open(archivo_salida, 'w') as salida:
-        for linea in entrada:
-            if linea.strip() != "RUN_END":
-                salida.write(linea)
+    decodificar_a_texto(archivo_con_datos, archivo_salida, compresion, expandir)
     
     # Eliminar archivos temporales
     for archivo in archivos_temp:
         if os.path.exists(archivo):
-            try:
-                os.remove(archivo)
-            except:
-                pass
+            os.remove(archivo)
     
     return archivo_salida
 
@@ -284,39 +413,33 @@ if __name__ == "__main__":
     
     print(f"Archivo creado con 3000 números aleatorios")
     
-    # Aplicar Polyphase Sort
+    # Aplicar Polyphase Sort, mostrando los eventos de telemetría
+    def mostrar_evento(evento):
+        if evento['evento'] == 'runs':
+            print(f"  Se crearon {evento['cantidad']} runs iniciales")
+        elif evento['evento'] == 'pasada':
+            print(f"  Iteración de fusión {evento['numero']} ({evento['duracion']:.4f} s)")
+        elif evento['evento'] == 'fin':
+            print(f"  {evento['pasadas']} fases en {evento['duracion']:.4f} s")
+        elif evento['evento'] == 'error':
+            print(f"ERROR: {evento['mensaje']}")
+    
     print("\nOrdenando con Polyphase Sort...")
-    resultado = polyphase_sort(archivo_test, num_archivos=3, tamanio_bloque=400)
+    resultado = polyphase_sort(archivo_test, num_archivos=3, tamanio_bloque=400,
+                               telemetria=mostrar_evento)
     
     if resultado:
         print(f"\nArchivo ordenado guardado como: {resultado}")
         
-        # Verificar que está ordenado
-        print("\nVerificando orden...")
-        anterior = None
-        ordenado = True
-        contador = 0
-        
-        with open(resultado, 'r') as f:
-            for linea in f:
-                try:
-                    valor = int(linea.strip())
-                    contador += 1
-                    
-                    if anterior is not None and valor < anterior:
-                        ordenado = False
-                        print(f"ERROR: Desorden encontrado en línea {contador}")
-                        print(f"  Valor anterior: {anterior}, Valor actual: {valor}")
-                        break
-                    
-                    anterior = valor
-                except:
-                    continue
+        # Verificar orden y elementos contra la entrada
+        print("\nVerificando orden y elementos...")
+        from verificacion import verificar
+        verificacion = verificar(archivo_test, resultado)
         
-        if ordenado:
-            print(f"[OK] Archivo correctamente ordenado ({contador} elementos)")
+        if verificacion.correcto:
+            print(f"[OK] Archivo correctamente ordenado ({verificacion.elementos_salida} elementos)")
         else:
-            print("[ERROR] Archivo NO está ordenado correctamente")
+            print(f"[ERROR] Archivo NO está ordenado correctamente: {verificacion}")
         
         # Mostrar primeros 20 elementos
         print("\nPrimeros 20 elementos ordenados:")
@@ -4,195 +4,191 @@ Algoritmo que optimiza la creación de runs iniciales usando selección por reem
 """
 
 import os
-import tempfile
 import heapq
+from contextlib import closing
+from itertools import islice
 
+from codificacion_runs import (
+    EscritorRun, leer_entrada, decodificar_a_texto, compresion_para,
+    validar_agregado
+)
+from claves_registros import normalizar_clave
+from directorios_temporales import abrir_directorios, ruta_salida, mover_a_salida
+from fusion_runs import fusionar_dos_archivos
+from telemetria import Telemetria
 
-def distribution_initial_runs(archivo_entrada, tamanio_memoria=1000):
+
+def distribution_initial_runs(archivo_entrada, tamanio_memoria=1000, compresion=None,
+                              directorios_temp=None, directorio_salida=None, clave=None,
+                              unico=False, agregado=None, expandir=False,
+                              lineas_invalidas=None, telemetria=None):
     """
     Distribution of Initial Runs - Distribución de Runs Iniciales.
     Complejidad: O(n log m) donde m es tamaño de memoria.
     Uso: Genera runs iniciales más largos mediante selección por reemplazo.
+    compresion: None (texto), 'delta', 'zlib' o 'lzma' para los runs temporales,
+        o 'binario' (enteros de ancho fijo, fusionados con mmap; ver fusion_mmap).
+    directorios_temp: Directorios (discos) donde repartir los runs temporales.
+    directorio_salida: Directorio del archivo ordenado (por defecto, el de entrada).
+    clave: Especificación de clave (EspecClave, texto como "2:int:desc,0" o lista
+        de columnas) para ordenar registros delimitados en lugar de enteros.
+
+    unico: Si es True, elimina duplicados (una línea por clave distinta).
+    agregado: 'conteo' o 'suma' (líneas "valor peso") para colapsar claves iguales
+        en pares (valor, cantidad) al generar cada run y en cada fusión.
+    expandir: Con agregado 'conteo', repite cada valor cantidad veces en la salida
+        en lugar de escribir "valor<TAB>cantidad".
+    lineas_invalidas: 'fallar' (por defecto), 'omitir' o 'contar' (o un
+        LineasInvalidas) para las líneas de la entrada que no se pueden convertir.
+    telemetria: Función, logging.Logger o ruta de un archivo de líneas JSON que
+        recibe los eventos de runs, pasadas, fin y error (ver telemetria).
     """
-    # Fase 1: Generar runs optimizados con selección por reemplazo
-    archivos_runs = generar_runs_optimizados(archivo_entrada, tamanio_memoria)
-    
-    if not archivos_runs:
-        print("ERROR: No se pudieron crear runs")
-        return None
+    telemetria = Telemetria(telemetria, 'replacement-selection')
+    clave = normalizar_clave(clave)
+    validar_agregado(agregado, clave, expandir)
+    compresion = compresion_para(compresion, clave, agregado)
+    colapsar = unico or agregado is not None
     
-    print(f"  Se crearon {len(archivos_runs)} runs optimizados")
-    
-    # Fase 2: Fusionar runs usando merge externo
-    iteracion = 0
-    while len(archivos_runs) > 1:
-        iteracion += 1
-        print(f"  Fase de fusión {iteracion}: {len(archivos_runs)} archivos...")
-        nuevos_archivos = []
+    with abrir_directorios(directorios_temp) as espacio:
+        # Fase 1: Generar runs optimizados con selección por reemplazo
+        inicio = telemetria.marca()
+        archivos_runs = generar_runs_optimizados(archivo_entrada, tamanio_memoria,
+                                                 compresion, espacio, clave,
+                                                 agregado, colapsar, lineas_invalidas)
         
-        for i in range(0, len(archivos_runs), 2):
-            if i + 1 < len(archivos_runs):
-                archivo_fusionado = fusionar_dos_archivos(
-                    archivos_runs[i],
-                    archivos_runs[i + 1]
-                )
-                nuevos_archivos.append(archivo_fusionado)
-                os.remove(archivos_runs[i])
-                os.remove(archivos_runs[i + 1])
-            else:
-                nuevos_archivos.append(archivos_runs[i])
+        telemetria.runs(inicio, archivos_runs)
+        archivo_salida = ruta_salida(archivo_entrada, '_ordenado_distribution.txt',
+                                     directorio_salida)
         
-        archivos_runs = nuevos_archivos
-    
-    archivo_salida = archivo_entrada.replace('.txt', '_ordenado_distribution.txt')
-    os.rename(archivos_runs[0], archivo_salida)
+        # Entrada vacía (o sin líneas válidas): salida vacía
+        if not archivos_runs:
+            open(archivo_salida, 'wb').close()
+            telemetria.fin(archivo_salida)
+            return archivo_salida
+        
+        # Fase 2: Fusionar runs usando merge externo
+        while len(archivos_runs) > 1:
+            inicio = telemetria.marca()
+            nuevos_archivos = []
+            
+            for par in espacio.agrupar(archivos_runs, 2):
+                if len(par) == 2:
+                    archivo_fusionado = fusionar_dos_archivos(
+                        par[0],
+                        par[1],
+                        compresion,
+                        espacio.siguiente(evitar=par),
+                        colapsar
+                    )
+                    nuevos_archivos.append(archivo_fusionado)
+                    os.remove(par[0])
+                    os.remove(par[1])
+                else:
+                    nuevos_archivos.append(par[0])
+            
+            telemetria.pasada(inicio, 2, len(archivos_runs), len(nuevos_archivos))
+            archivos_runs = nuevos_archivos
+        
+        if compresion is None:
+            mover_a_salida(archivos_runs[0], archivo_salida)
+        else:
+            decodificar_a_texto(archivos_runs[0], archivo_salida, compresion, expandir)
     
+    telemetria.fin(archivo_salida)
     return archivo_salida
 
 
-def generar_runs_optimizados(archivo, tamanio_memoria):
+def generar_runs_optimizados(archivo, tamanio_memoria, compresion=None, espacio=None,
+                             clave=None, agregado=None, colapsar=False,
+                             lineas_invalidas=None):
     """
     Genera runs usando selección por reemplazo.
     Permite crear runs más largos que la memoria disponible.
+    Si se indica espacio (DirectoriosTemporales), alterna los runs entre sus discos.
+    Si se indica clave (EspecClave), los elementos son registros (clave, registro).
+    Con agregado, los elementos son pares (elemento, cantidad); con colapsar=True
+    cada run conserva una sola entrada por clave.
+    Las líneas inválidas se tratan según lineas_invalidas (ver texto_enteros).
     """
     archivos_runs = []
     
-    try:
-        with open(archivo, 'r') as f:
-            buffer = []
-            
-            # Llenar buffer inicial
-            for _ in range(tamanio_memoria):
-                linea = f.readline()
-                if not linea:
-                    break
-                buffer.append(int(linea.strip()))
-            
+    with closing(leer_entrada(archivo, clave, agregado, lineas_invalidas)) as entrada:
+        # Llenar buffer inicial
+        buffer = list(islice(entrada, tamanio_memoria))
+        
+        if not buffer:
+            return archivos_runs
+        
+        # Convertir buffer en heap
+        heapq.heapify(buffer)
+        
+        # Variables para control de runs
+        run_actual = []
+        ultimo_valor_escrito = None
+        elementos_congelados = []
+        
+        while buffer or elementos_congelados:
+            # Si el heap está vacío, comenzar nuevo run
             if not buffer:
-                return archivos_runs
-            
-            # Convertir buffer en heap
-            heapq.heapify(buffer)
+                # Escribir run actual
+                if run_actual:
+                    archivo_run = escribir_run_a_archivo(
+                        run_actual, compresion,
+                        espacio.siguiente() if espacio else None,
+                        colapsar
+                    )
+                    archivos_runs.append(archivo_run)
+                    run_actual = []
+                
+                # Descongelar elementos para nuevo run
+                buffer = elementos_congelados
+                heapq.heapify(buffer)
+                elementos_congelados = []
+                ultimo_valor_escrito = None
+                continue
             
-            # Variables para control de runs
-            run_actual = []
-            ultimo_valor_escrito = float('-inf')
-            elementos_congelados = []
+            # Extraer mínimo del heap
+            valor = heapq.heappop(buffer)
             
-            while buffer or elementos_congelados:
-                # Si el heap está vacío, comenzar nuevo run
-                if not buffer:
-                    # Escribir run actual
-                    if run_actual:
-                        archivo_run = escribir_run_a_archivo(run_actual)
-                        archivos_runs.append(archivo_run)
-                        run_actual = []
-                    
-                    # Descongelar elementos para nuevo run
-                    buffer = elementos_congelados
-                    heapq.heapify(buffer)
-                    elementos_congelados = []
-                    ultimo_valor_escrito = float('-inf')
-                    continue
+            # Si el valor puede agregarse al run actual
+            if ultimo_valor_escrito is None or valor >= ultimo_valor_escrito:
+                run_actual.append(valor)
+                ultimo_valor_escrito = valor
                 
-                # Extraer mínimo del heap
-                valor = heapq.heappop(buffer)
-                
-                # Si el valor puede agregarse al run actual
-                if valor >= ultimo_valor_escrito:
-                    run_actual.append(valor)
-                    ultimo_valor_escrito = valor
-                    
-                    # Leer siguiente elemento del archivo
-                    linea = f.readline()
-                    if linea:
-                        try:
-                            nuevo_valor = int(linea.strip())
-                            
-                            # Si puede agregarse al run actual, al heap
-                            # Si no, congelarlo para el siguiente run
-                            if nuevo_valor >= ultimo_valor_escrito:
-                                heapq.heappush(buffer, nuevo_valor)
-                            else:
-                                elementos_congelados.append(nuevo_valor)
-                        except:
-                            continue
-                else:
-                    # Congelar este valor para el siguiente run
-                    elementos_congelados.append(valor)
-            
-            # Escribir último run si existe
-            if run_actual:
-                archivo_run = escribir_run_a_archivo(run_actual)
-                archivos_runs.append(archivo_run)
-    
-    except Exception as e:
-        print(f"ERROR al generar runs: {e}")
-        return []
+                # Leer siguiente elemento del archivo
+                nuevo_valor = next(entrada, None)
+                if nuevo_valor is not None:
+                    # Si puede agregarse al run actual, al heap
+                    # Si no, congelarlo para el siguiente run
+                    if nuevo_valor >= ultimo_valor_escrito:
+                        heapq.heappush(buffer, nuevo_valor)
+                    else:
+                        elementos_congelados.append(nuevo_valor)
+            else:
+                # Congelar este valor para el siguiente run
+                elementos_congelados.append(valor)
+        
+        # Escribir último run si existe
+        if run_actual:
+            archivo_run = escribir_run_a_archivo(
+                run_actual, compresion,
+                espacio.siguiente() if espacio else None,
+                colapsar
+            )
+            archivos_runs.append(archivo_run)
     
     return archivos_runs
 
 
-def escribir_run_a_archivo(run):
-    """Escribe un run a un archivo temporal."""
-    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-    for valor in run:
-        temp_file.write(f"{valor}\n")
-    temp_file.close()
-    return temp_file.name
-
-
-def fusionar_dos_archivos(archivo1, archivo2):
+def escribir_run_a_archivo(run, compresion=None, directorio=None, colapsar=False):
     """
-    Fusiona dos archivos ordenados en uno solo.
-    
-    Args:
-        archivo1: Ruta del primer archivo ordenado
-        archivo2: Ruta del segundo archivo ordenado
-    
-    Returns:
-        Ruta del archivo fusionado
+    Escribe un run a un archivo temporal (comprimido si se indica).
+    Con colapsar=True, escribe una sola entrada por clave.
     """
-    temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False)
-    
-    try:
-        with open(archivo1, 'r') as f1, open(archivo2, 'r') as f2:
-            linea1 = f1.readline()
-            linea2 = f2.readline()
-            
-            # Comparar y escribir el menor elemento
-            while linea1 and linea2:
-                try:
-                    num1 = int(linea1.strip())
-                    num2 = int(linea2.strip())
-                    
-                    if num1 <= num2:
-                        temp_file.write(f"{num1}\n")
-                        linea1 = f1.readline()
-                    else:
-                        temp_file.write(f"{num2}\n")
-                        linea2 = f2.readline()
-                except:
-                    if linea1:
-                        linea1 = f1.readline()
-                    if linea2:
-                        linea2 = f2.readline()
-            
-            # Escribir elementos restantes del archivo 1
-            while linea1:
-                temp_file.write(linea1)
-                linea1 = f1.readline()
-            
-            # Escribir elementos restantes del archivo 2
-            while linea2:
-                temp_file.write(linea2)
-                linea2 = f2.readline()
-    
-    except Exception as e:
-        print(f"ERROR al fusionar archivos: {e}")
-    
-    temp_file.close()
-    return temp_file.name
+    with EscritorRun(compresion=compresion, directorio=directorio,
+                     colapsar=colapsar) as temp_file:
+        temp_file.extender(run)
+    return temp_file.nombre
 
 
 # Ejemplo de uso
@@ -212,43 +208,29 @@ if __name__ == "__main__":
     
     print(f"Archivo creado con 5000 números aleatorios")
     
-    # Aplicar Distribution of Initial Runs
+    # Aplicar Distribution of Initial Runs (telemetría como JSON en un logger)
+    import logging
+    logging.basicConfig(level=logging.INFO, format="  %(message)s")
     print("\nOrdenando con Distribution of Initial Runs...")
-    resultado = distribution_initial_runs(archivo_test, tamanio_memoria=500)
+    resultado = distribution_initial_runs(archivo_test, tamanio_memoria=500,
+                                          telemetria=logging.getLogger('distribution'))
     
     if resultado:
         print(f"\nArchivo ordenado guardado como: {resultado}")
         
-        # Verificar que está ordenado
-        print("\nVerificando orden...")
-        anterior = None
-        ordenado = True
-        contador = 0
-        
-        with open(resultado, 'r') as f:
-            for linea in f:
-                try:
-                    valor = int(linea.strip())
-                    contador += 1
-                    
-                    if anterior is not None and valor < anterior:
-                        ordenado = False
-                        print(f"ERROR: Desorden encontrado en línea {contador}")
-                        print(f"  Valor anterior: {anterior}, Valor actual: {valor}")
-                        break
-                    
-                    anterior = valor
-                except:
-                    continue
+        # Verificar orden y elementos contra la entrada
+        print("\nVerificando orden y elementos...")
+        from verificacion import verificar
+        verificacion = verificar(archivo_test, resultado)
         
-        if ordenado:
-            print(f"[OK] Archivo correctamente ordenado ({contador} elementos)")
+        if verificacion.correcto:
+            print(f"[OK] Archivo correctamente ordenado ({verificacion.elementos_salida} elementos)")
         else:
-            print("[ERROR] Archivo NO está ordenado correctamente")
+            print(f"[ERROR] Archivo NO está ordenado correctamente: {verificacion}")
         
         # Mostrar estadísticas
         print("\nEstadísticas:")
-        print(f"  Total de elementos: {contador}")
+        print(f"  Total de elementos: {verificacion.elementos_salida}")
         
         # Mostrar primeros y últimos 10 elementos
         print("\nPrimeros 10 elementos:")
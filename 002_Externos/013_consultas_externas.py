@@ -0,0 +1,263 @@
+"""
+Consultas Externas (Top-K, Cuantiles y Selección)
+Responde consultas de orden sobre archivos grandes sin ordenarlos por completo:
+una o dos lecturas secuenciales en lugar de todas las pasadas de una fusión.
+"""
+
+import heapq
+import math
+import os
+import random
+from bisect import bisect_left
+
+from codificacion_runs import EscritorRun, leer_entrada
+from claves_registros import normalizar_clave
+from directorios_temporales import abrir_directorios
+
+
+def top_k(archivo, k, mayores=True, clave=None):
+    """
+    Top-K - Los k elementos mayores (o menores) de un archivo.
+    Complejidad: O(n log k) en una sola lectura, O(k) de memoria.
+    Uso: Rankings y valores extremos sin ordenar el archivo.
+    clave: Especificación de clave para archivos de registros; en ese caso
+        retorna las líneas (bytes) de los registros elegidos.
+    Retorna la lista ordenada de mayor a menor (o de menor a mayor).
+    """
+    if k <= 0:
+        return []
+
+    clave = normalizar_clave(clave)
+
+    # Heap acotado a k elementos: para los mayores, un heap de mínimos cuya raíz
+    # es el menor de los k mejores vistos hasta ahora
+    heap = []
+    for valor in leer_entrada(archivo, clave):
+        elemento = valor if mayores else _Invertido(valor)
+        if len(heap) < k:
+            heapq.heappush(heap, elemento)
+        elif heap[0] < elemento:
+            heapq.heapreplace(heap, elemento)
+
+    resultado = sorted(heap, reverse=True)
+    if not mayores:
+        resultado = [elemento.valor for elemento in resultado]
+    if clave is not None:
+        resultado = [registro for _, registro in resultado]
+    return resultado
+
+
+class _Invertido:
+    """Invierte la comparación de un valor para usar el heap de mínimos como de máximos."""
+    __slots__ = ('valor',)
+
+    def __init__(self, valor):
+        self.valor = valor
+
+    def __lt__(self, otro):
+        return otro.valor < self.valor
+
+
+def muestrear(archivo, tamanio_muestra=10000, semilla=None):
+    """
+    Muestreo de reservorio en una sola lectura.
+    Retorna (muestra, total_de_elementos).
+    """
+    generador = random.Random(semilla)
+    muestra = []
+    total = 0
+
+    for valor in leer_entrada(archivo):
+        total += 1
+        if len(muestra) < tamanio_muestra:
+            muestra.append(valor)
+        else:
+            j = generador.randrange(total)
+            if j < tamanio_muestra:
+                muestra[j] = valor
+
+    return muestra, total
+
+
+def rango_de_cuantil(q, total):
+    """Posición (desde 0) del cuantil q en el archivo ordenado: floor(q * (n - 1))."""
+    if not 0 <= q <= 1:
+        raise ValueError(f"Cuantil fuera de [0, 1]: {q}")
+    return int(q * (total - 1))
+
+
+def quantiles(archivo, qs, exacto=True, tamanio_muestra=10000, memoria=100000, semilla=None):
+    """
+    Cuantiles de un archivo de enteros.
+    Complejidad: O(n) por lectura; una lectura (aproximado) o dos (exacto).
+    Uso: Percentiles de archivos que no caben en memoria.
+
+    Aproximado: cuantiles de una muestra de reservorio.
+    Exacto: la muestra acota cada cuantil entre dos valores; la segunda lectura
+    cuenta los menores y guarda solo los valores dentro de cada intervalo
+    (hasta memoria por cuantil). Si el intervalo falla, recurre a nth().
+
+    Retorna la lista de valores en el orden de qs.
+    """
+    muestra, total = muestrear(archivo, tamanio_muestra, semilla)
+    if total == 0:
+        raise ValueError("El archivo está vacío")
+
+    muestra.sort()
+    rangos = [rango_de_cuantil(q, total) for q in qs]
+
+    if not exacto or len(muestra) == total:
+        # Con todo el archivo en la muestra, la respuesta ya es exacta
+        return [muestra[rango_de_cuantil(q, len(muestra))] for q in qs]
+
+    # Fase 1: Acotar cada cuantil con la muestra. El rango en la muestra tiene
+    # desviación sqrt(q(1-q)s); se deja un margen de 4 desviaciones
+    intervalos = []
+    for q in qs:
+        posicion = q * (len(muestra) - 1)
+        margen = 4 * math.isqrt(int(q * (1 - q) * len(muestra))) + 2
+        izquierda = int(posicion) - margen
+        derecha = int(posicion) + margen
+        bajo = muestra[izquierda] if izquierda >= 0 else None
+        alto = muestra[derecha] if derecha < len(muestra) else None
+        intervalos.append((bajo, alto))
+
+    # Fase 2: Contar menores y recolectar los valores de cada intervalo
+    menores = [0] * len(qs)
+    dentro = [[] for _ in qs]
+    desbordado = [False] * len(qs)
+
+    for valor in leer_entrada(archivo):
+        for i, (bajo, alto) in enumerate(intervalos):
+            if bajo is not None and valor < bajo:
+                menores[i] += 1
+            elif alto is None or valor <= alto:
+                if not desbordado[i]:
+                    dentro[i].append(valor)
+                    if len(dentro[i]) > memoria:
+                        desbordado[i] = True
+                        dentro[i] = []
+
+    resultado = []
+    for i, rango in enumerate(rangos):
+        posicion = rango - menores[i]
+        if not desbordado[i] and 0 <= posicion < len(dentro[i]):
+            dentro[i].sort()
+            resultado.append(dentro[i][posicion])
+        else:
+            # La muestra no acotó bien este cuantil: selección externa
+            resultado.append(nth(archivo, rango, memoria=memoria))
+
+    return resultado
+
+
+def percentiles(archivo, ps, **opciones):
+    """Percentiles (0 a 100) de un archivo; mismas opciones que quantiles()."""
+    return quantiles(archivo, [p / 100 for p in ps], **opciones)
+
+
+def nth(archivo, n, memoria=100000, num_cubetas=16, directorios_temp=None, semilla=None):
+    """
+    Selección externa (Quickselect por cubetas).
+    Complejidad: O(n) esperado; cada nivel lee y reparte solo la cubeta elegida.
+    Uso: El n-ésimo menor elemento (desde 0) sin ordenar el archivo.
+
+    En cada nivel una muestra define hasta num_cubetas - 1 separadores; los
+    valores se reparten en cubetas por rango y los iguales a un separador solo
+    se cuentan. Se continúa en la cubeta que contiene la posición buscada hasta
+    que cabe en memoria.
+    """
+    with abrir_directorios(directorios_temp) as espacio:
+        actual = archivo
+        objetivo = n
+
+        while True:
+            # Fase 1: Muestra y conteo del archivo actual
+            muestra, total = muestrear(actual, min(memoria, 10 * num_cubetas), semilla)
+            if not 0 <= objetivo < total:
+                raise IndexError(f"Posición {n} fuera de rango")
+
+            if total <= memoria:
+                valores = sorted(leer_entrada(actual))
+                return valores[objetivo]
+
+            # Separadores equiespaciados entre los valores distintos de la muestra
+            distintos = sorted(set(muestra))
+            paso = max(1, len(distintos) // num_cubetas)
+            separadores = distintos[paso::paso][:num_cubetas - 1] or distintos[:1]
+
+            # Fase 2: Repartir en cubetas (entre separadores) y contar iguales
+            cubetas = [EscritorRun(directorio=espacio.siguiente())
+                       for _ in range(len(separadores) + 1)]
+            conteo_cubetas = [0] * len(cubetas)
+            conteo_iguales = [0] * len(separadores)
+
+            for valor in leer_entrada(actual):
+                i = bisect_left(separadores, valor)
+                if i < len(separadores) and separadores[i] == valor:
+                    conteo_iguales[i] += 1
+                else:
+                    cubetas[i].escribir(valor)
+                    conteo_cubetas[i] += 1
+
+            for cubeta in cubetas:
+                cubeta.close()
+
+            if actual != archivo:
+                os.remove(actual)
+
+            # Fase 3: Elegir la cubeta (o separador) que contiene el objetivo.
+            # Las cubetas descartadas se eliminan al salir del bloque with
+            for i in range(len(cubetas)):
+                if objetivo < conteo_cubetas[i]:
+                    actual = cubetas[i].nombre
+                    break
+                objetivo -= conteo_cubetas[i]
+                if objetivo < conteo_iguales[i]:
+                    return separadores[i]
+                objetivo -= conteo_iguales[i]
+
+            for cubeta in cubetas:
+                if cubeta.nombre != actual:
+                    os.remove(cubeta.nombre)
+
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    print("=" * 70)
+    print("CONSULTAS EXTERNAS - Top-K, Cuantiles y Selección")
+    print("=" * 70)
+
+    # Crear archivo de prueba
+    archivo_test = 'datos_consultas.txt'
+    print(f"\nCreando archivo de prueba: {archivo_test}")
+
+    datos = [random.randint(1, 10000) for _ in range(20000)]
+    with open(archivo_test, 'w') as f:
+        for num in datos:
+            f.write(f"{num}\n")
+
+    print(f"Archivo creado con {len(datos)} números aleatorios")
+    ordenados = sorted(datos)
+
+    print("\nTop 5 mayores:", top_k(archivo_test, 5))
+    print("Top 5 menores:", top_k(archivo_test, 5, mayores=False))
+
+    ps = [50, 90, 99]
+    exactos = percentiles(archivo_test, ps, tamanio_muestra=1000, memoria=2000)
+    print(f"\nPercentiles {ps}: {exactos}")
+    esperados = [ordenados[rango_de_cuantil(p / 100, len(datos))] for p in ps]
+    print(f"  Verificación: {'[OK]' if exactos == esperados else '[ERROR]'}")
+
+    posicion = len(datos) // 3
+    valor = nth(archivo_test, posicion, memoria=1000)
+    print(f"\nElemento en la posición {posicion}: {valor}")
+    print(f"  Verificación: {'[OK]' if valor == ordenados[posicion] else '[ERROR]'}")
+
+    # Limpiar archivos
+    print("\nLimpiando archivos...")
+    if os.path.exists(archivo_test):
+        os.remove(archivo_test)
+        print(f"  Eliminado: {archivo_test}")
+
+    print("\n[OK] Demostración completada")
@@ -0,0 +1,245 @@
+"""
+Ordenamiento Incremental (Estilo LSM)
+Mantiene ordenado un archivo que recibe datos nuevos cada día: solo se ordena
+el delta, los deltas ordenados se guardan por niveles y se compactan con la
+base cuando crecen lo suficiente. Una lectura fusionada ve siempre los datos
+ordenados, sin esperar la compactación.
+"""
+
+import heapq
+import json
+import os
+import shutil
+
+from codificacion_runs import leer_run
+from registro_algoritmos import importar_modulo
+
+_multivia = importar_modulo('010_multiway_merging')
+balanced_multiway_merging = _multivia.balanced_multiway_merging
+fusionar_multiples_archivos = _multivia.fusionar_multiples_archivos
+
+
+EXTENSION_NIVELES = '.niveles'
+MANIFIESTO = 'manifiesto.json'
+
+
+def ruta_niveles(archivo_base):
+    """Directorio donde se guardan los deltas ordenados de un archivo base."""
+    return archivo_base + EXTENSION_NIVELES
+
+
+class ArchivoIncremental:
+    """
+    Archivo ordenado de enteros con actualizaciones incrementales.
+    Complejidad: O(d log d) por delta de tamaño d; cada elemento se reescribe
+    O(log_proporcion(n)) veces en las compactaciones (amortizado).
+    Uso: Archivos ya ordenados que reciben datos nuevos periódicamente.
+
+    Compactación por tamaños (size-tiered):
+        - Cada delta ordenado entra al nivel 0.
+        - Cuando un nivel junta proporcion runs, se fusionan en un solo run
+          del nivel siguiente.
+        - Cuando los deltas suman al menos 1/proporcion del tamaño de la base,
+          se fusionan todos con la base.
+
+    El estado (runs de cada nivel y base vigente) se guarda en
+    "<base>.niveles/manifiesto.json". Cada compactación con la base escribe
+    una base nueva numerada en ese directorio; reemplazar el manifiesto es el
+    punto de confirmación, y recién después se eliminan la base anterior y los
+    deltas, así que una interrupción nunca cuenta un delta dos veces. La base
+    confirmada se publica además en archivo_base.
+    """
+    def __init__(self, archivo_base, proporcion=4, num_vias=4, tamanio_bloque=1000,
+                 directorios_temp=None):
+        if proporcion < 2:
+            raise ValueError("La proporción de compactación debe ser al menos 2")
+        self.archivo_base = archivo_base
+        self.directorio = ruta_niveles(archivo_base)
+        self.proporcion = proporcion
+        self.num_vias = num_vias
+        self.tamanio_bloque = tamanio_bloque
+        self.directorios_temp = directorios_temp
+
+        if not os.path.exists(archivo_base):
+            open(archivo_base, 'w').close()
+        os.makedirs(self.directorio, exist_ok=True)
+
+        manifiesto = os.path.join(self.directorio, MANIFIESTO)
+        if os.path.exists(manifiesto):
+            with open(manifiesto, 'r') as f:
+                datos = json.load(f)
+            self.niveles = datos['niveles']
+            self.contador = datos['contador']
+            self.base = datos.get('base')
+        else:
+            self.niveles = []
+            self.contador = 0
+            self.base = None
+        self._limpiar_huerfanos()
+
+    def _ruta(self, nombre):
+        return os.path.join(self.directorio, nombre)
+
+    def ruta_base(self):
+        """Base vigente: la última compactada, o archivo_base si aún no hubo ninguna."""
+        return self._ruta(self.base) if self.base else self.archivo_base
+
+    def _guardar_manifiesto(self):
+        manifiesto = self._ruta(MANIFIESTO)
+        temporal = manifiesto + '.tmp'
+        with open(temporal, 'w') as f:
+            json.dump({'niveles': self.niveles, 'contador': self.contador,
+                       'base': self.base}, f)
+        os.replace(temporal, manifiesto)
+
+    def _limpiar_huerfanos(self):
+        """Elimina los archivos que una interrupción dejó sin registrar en el manifiesto."""
+        registrados = {MANIFIESTO, self.base}
+        registrados.update(nombre for nivel in self.niveles for nombre in nivel)
+        for nombre in os.listdir(self.directorio):
+            if nombre not in registrados:
+                os.remove(self._ruta(nombre))
+
+    def _publicar_base(self):
+        """Reemplaza archivo_base por la base vigente (enlace duro si se puede)."""
+        temporal = self.archivo_base + '.tmp'
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        try:
+            os.link(self.ruta_base(), temporal)
+        except OSError:
+            shutil.copyfile(self.ruta_base(), temporal)
+        os.replace(temporal, self.archivo_base)
+
+    def _nuevo_run(self, archivo, nivel):
+        """Mueve un run ordenado al directorio de niveles y lo registra en el nivel."""
+        nombre = f"run_{self.contador:06d}.txt"
+        self.contador += 1
+        os.replace(archivo, self._ruta(nombre))
+        while len(self.niveles) <= nivel:
+            self.niveles.append([])
+        self.niveles[nivel].append(nombre)
+
+    def runs(self):
+        """Rutas de todos los deltas ordenados, del nivel 0 al último."""
+        return [self._ruta(nombre) for nivel in self.niveles for nombre in nivel]
+
+    def agregar(self, archivo_delta):
+        """
+        Ordena solo el archivo delta y lo agrega al nivel 0.
+        Luego compacta los niveles que lo necesiten.
+        """
+        if os.path.getsize(archivo_delta) == 0:
+            return
+
+        ordenado = balanced_multiway_merging(
+            archivo_delta, self.num_vias, self.tamanio_bloque,
+            directorios_temp=self.directorios_temp, directorio_salida=self.directorio
+        )
+        self._nuevo_run(ordenado, 0)
+        self._guardar_manifiesto()
+        self.compactar()
+
+    def compactar(self, forzar=False):
+        """
+        Aplica la compactación por tamaños.
+        Con forzar=True fusiona todos los deltas con la base.
+        """
+        # Fase 1: Fusionar los niveles que juntaron proporcion runs
+        nivel = 0
+        while nivel < len(self.niveles):
+            if len(self.niveles[nivel]) >= self.proporcion:
+                anteriores = [self._ruta(nombre) for nombre in self.niveles[nivel]]
+                fusionado = fusionar_multiples_archivos(anteriores, directorio=self.directorio)
+                self.niveles[nivel] = []
+                self._nuevo_run(fusionado, nivel + 1)
+                self._guardar_manifiesto()
+                for archivo in anteriores:
+                    os.remove(archivo)
+            nivel += 1
+
+        # Fase 2: Fusionar con la base si los deltas ya pesan lo suficiente
+        runs = self.runs()
+        if not runs:
+            return
+        base_anterior = self.ruta_base()
+        tamanio_deltas = sum(os.path.getsize(archivo) for archivo in runs)
+        if forzar or tamanio_deltas * self.proporcion >= os.path.getsize(base_anterior):
+            fusionado = fusionar_multiples_archivos([base_anterior] + runs,
+                                                    directorio=self.directorio)
+            nombre = f"base_{self.contador:06d}.txt"
+            self.contador += 1
+            os.replace(fusionado, self._ruta(nombre))
+
+            # Confirmación: el manifiesto pasa a la base nueva sin deltas. Antes
+            # de este punto una interrupción deja la base nueva como huérfana
+            self.base = nombre
+            self.niveles = []
+            self._guardar_manifiesto()
+
+            self._publicar_base()
+            for archivo in runs:
+                os.remove(archivo)
+            if base_anterior != self.archivo_base:
+                os.remove(base_anterior)
+
+    def __iter__(self):
+        """Lectura fusionada y ordenada de la base más todos los deltas."""
+        lectores = [leer_run(archivo) for archivo in [self.ruta_base()] + self.runs()]
+        return heapq.merge(*lectores)
+
+    def __repr__(self):
+        tamanios = [len(nivel) for nivel in self.niveles]
+        return f"ArchivoIncremental({self.archivo_base!r}, runs_por_nivel={tamanios})"
+
+
+# Ejemplo de uso
+if __name__ == "__main__":
+    import random
+
+    print("=" * 70)
+    print("ORDENAMIENTO INCREMENTAL - Deltas por niveles y compactación")
+    print("=" * 70)
+
+    # Crear y ordenar el archivo base
+    archivo_test = 'datos_incremental.txt'
+    datos = [random.randint(1, 100000) for _ in range(20000)]
+    with open(archivo_test, 'w') as f:
+        for num in datos:
+            f.write(f"{num}\n")
+
+    archivo_base = balanced_multiway_merging(archivo_test, num_vias=4, tamanio_bloque=2000)
+    print(f"\nBase ordenada: {archivo_base} ({len(datos)} números)")
+
+    # Agregar un delta por "día": solo se ordena el delta
+    incremental = ArchivoIncremental(archivo_base, proporcion=4, tamanio_bloque=500)
+    archivo_delta = 'datos_incremental_delta.txt'
+    for dia in range(1, 11):
+        nuevos = [random.randint(1, 100000) for _ in range(500)]
+        datos.extend(nuevos)
+        with open(archivo_delta, 'w') as f:
+            for num in nuevos:
+                f.write(f"{num}\n")
+        incremental.agregar(archivo_delta)
+        print(f"  Día {dia:2d}: {incremental}")
+
+    # La lectura fusionada ya ve todo ordenado, antes de compactar
+    lectura = list(incremental)
+    print(f"\nLectura fusionada: {len(lectura)} números")
+    print(f"  Verificación: {'[OK]' if lectura == sorted(datos) else '[ERROR]'}")
+
+    incremental.compactar(forzar=True)
+    with open(archivo_base, 'r') as f:
+        base = [int(linea) for linea in f]
+    print(f"Tras compactar: {incremental}")
+    print(f"  Verificación: {'[OK]' if base == sorted(datos) else '[ERROR]'}")
+
+    # Limpiar archivos
+    print("\nLimpiando archivos...")
+    for archivo in [archivo_test, archivo_delta, archivo_base]:
+        if os.path.exists(archivo):
+            os.remove(archivo)
+            print(f"  Eliminado: {archivo}")
+    shutil.rmtree(ruta_niveles(archivo_base), ignore_errors=True)
+
+    print("\n[OK] Demostración completada")
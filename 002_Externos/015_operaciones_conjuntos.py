@@ -0,0 +1,254 @@
+"""
+Operaciones de Conjuntos y Merge-Join (Sobre Archivos Ordenados)
+Unión, intersección, diferencia y diferencia simétrica de k archivos, y
+merge-join (inner, left, right o full) de dos archivos, en una sola lectura
+secuencial de cada entrada: la misma fusión con heap de
+fusionar_multiples_archivos, agrupando los elementos de igual clave.
+
+Las entradas deben estar ordenadas (con la misma clave); con
+ordenar_entradas=True se ordenan antes con Balanced Multiway Merging. Una
+entrada desordenada se detecta al leerla y lanza ValueError.
+"""
+
+import heapq
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+
+from codificacion_runs import (
+    clave_agrupamiento, escribir_valores, leer_entrada, linea_de_elemento
+)
+from claves_registros import normalizar_clave
+from directorios_temporales import abrir_directorios
+from registro_algoritmos import importar_modulo
+
+balanced_multiway_merging = importar_modulo('010_multiway_merging').balanced_multiway_merging
+
+
+TIPOS_JOIN = ('inner', 'left', 'right', 'full')
+
+
+def union(*archivos, clave=None, ordenar_entradas=False, directorios_temp=None,
+          lineas_invalidas=None, num_vias=4, tamanio_bloque=1000):
+    """
+    Unión - Claves presentes en al menos un archivo.
+    Complejidad: O(N log k) para N elementos en k archivos; O(k) de memoria.
+    Uso: Combinar snapshots o listas ordenadas sin duplicados.
+    Genera un valor por clave distinta (el entero, o la línea del registro del
+    primer archivo que la contiene).
+    clave: Especificación de clave de los registros (ver claves_registros).
+    ordenar_entradas: Ordena antes las entradas (en directorios_temp) con
+        num_vias vías y bloques de tamanio_bloque elementos.
+    """
+    return _operacion(archivos, any, clave, ordenar_entradas, directorios_temp,
+                      lineas_invalidas, num_vias, tamanio_bloque)
+
+
+def interseccion(*archivos, clave=None, ordenar_entradas=False, directorios_temp=None,
+                 lineas_invalidas=None, num_vias=4, tamanio_bloque=1000):
+    """
+    Intersección - Claves presentes en todos los archivos.
+    Complejidad: O(N log k); O(k) de memoria.
+    Uso: Elementos comunes a varios archivos grandes.
+    Mismos parámetros que union.
+    """
+    return _operacion(archivos, all, clave, ordenar_entradas, directorios_temp,
+                      lineas_invalidas, num_vias, tamanio_bloque)
+
+
+def diferencia(*archivos, clave=None, ordenar_entradas=False, directorios_temp=None,
+               lineas_invalidas=None, num_vias=4, tamanio_bloque=1000):
+    """
+    Diferencia - Claves del primer archivo que no están en ninguno de los demás.
+    Complejidad: O(N log k); O(k) de memoria.
+    Uso: Altas o bajas entre dos versiones de un archivo.
+    Mismos parámetros que union.
+    """
+    def incluir(presentes):
+        return presentes[0] and not any(presentes[1:])
+    return _operacion(archivos, incluir, clave, ordenar_entradas, directorios_temp,
+                      lineas_invalidas, num_vias, tamanio_bloque)
+
+
+def diferencia_simetrica(*archivos, clave=None, ordenar_entradas=False, directorios_temp=None,
+                         lineas_invalidas=None, num_vias=4, tamanio_bloque=1000):
+    """
+    Diferencia simétrica - Claves presentes en una cantidad impar de archivos
+    (con dos archivos, las que están en uno solo).
+    Complejidad: O(N log k); O(k) de memoria.
+    Uso: Comparar dos archivos (lo que cambió entre ellos).
+    Mismos parámetros que union.
+    """
+    def incluir(presentes):
+        return sum(presentes) % 2 == 1
+    return _operacion(archivos, incluir, clave, ordenar_entradas, directorios_temp,
+                      lineas_invalidas, num_vias, tamanio_bloque)
+
+
+def merge_join(izquierdo, derecho, clave=None, clave_derecha=None, tipo='inner',
+               ordenar_entradas=False, directorios_temp=None, lineas_invalidas=None,
+               num_vias=4, tamanio_bloque=1000):
+    """
+    Merge-Join - Combina los registros de igual clave de dos archivos.
+    Complejidad: O(N + R) para N registros leídos y R combinaciones generadas;
+    memoria proporcional a los registros de una sola clave.
+    Uso: Joins sobre archivos que no caben en un diccionario en memoria.
+    clave: Especificación de clave del archivo izquierdo; clave_derecha la del
+        derecho (por defecto, la misma). Los tipos de las columnas deben coincidir.
+    tipo: 'inner', 'left', 'right' o 'full'.
+    ordenar_entradas, num_vias, tamanio_bloque: Como en union.
+    Genera líneas (bytes) "izquierdo<DELIM>derecho"; en los joins externos el
+    lado faltante queda vacío.
+    """
+    if tipo not in TIPOS_JOIN:
+        raise ValueError(f"Tipo de join no soportado: {tipo!r} (use uno de {TIPOS_JOIN})")
+    clave = normalizar_clave(clave)
+    clave_derecha = normalizar_clave(clave_derecha) or clave
+    separador = clave.separador if clave is not None else b'\t'
+    izquierda_externa = tipo in ('left', 'full')
+    derecha_externa = tipo in ('right', 'full')
+
+    with _entradas_ordenadas([izquierdo, derecho], [clave, clave_derecha], ordenar_entradas,
+                             directorios_temp, num_vias, tamanio_bloque) as entradas:
+        for _, (izquierdos, derechos) in _grupos(entradas, [clave, clave_derecha],
+                                                 lineas_invalidas, todos=True):
+            if izquierdos and derechos:
+                for registro_izquierdo in izquierdos:
+                    linea = linea_de_elemento(registro_izquierdo) + separador
+                    for registro_derecho in derechos:
+                        yield linea + linea_de_elemento(registro_derecho)
+            elif izquierdos and izquierda_externa:
+                for registro_izquierdo in izquierdos:
+                    yield linea_de_elemento(registro_izquierdo) + separador
+            elif derechos and derecha_externa:
+                for registro_derecho in derechos:
+                    yield separador + linea_de_elemento(registro_derecho)
+
+
+def escribir(valores, archivo_salida):
+    """Escribe los valores de una operación (enteros o líneas) en archivo_salida."""
+    with open(archivo_salida, 'wb') as salida:
+        escribir_valores(salida, valores)
+    return archivo_salida
+
+
+def _operacion(archivos, incluir, clave, ordenar_entradas, directorios_temp, lineas_invalidas,
+               num_vias, tamanio_bloque):
+    """Genera el primer elemento de cada clave cuya presencia por archivo cumple incluir."""
+    if not archivos:
+        raise ValueError("Se necesita al menos un archivo")
+    clave = normalizar_clave(clave)
+    claves = [clave] * len(archivos)
+    with _entradas_ordenadas(archivos, claves, ordenar_entradas, directorios_temp,
+                             num_vias, tamanio_bloque) as entradas:
+        for _, elementos in _grupos(entradas, claves, lineas_invalidas):
+            if incluir([bool(lista) for lista in elementos]):
+                primero = next(lista[0] for lista in elementos if lista)
+                yield primero[1] if isinstance(primero, tuple) else primero
+
+
+def _grupos(archivos, claves, lineas_invalidas=None, todos=False):
+    """
+    Fusión con heap de los archivos ordenados, agrupada por clave.
+    Genera (clave, elementos) con elementos[i] la lista de los elementos del
+    archivo i con esa clave: todos si todos=True, o solo el primero.
+    """
+    lectores = [_leer_ordenado(archivo, indice, clave, lineas_invalidas)
+                for indice, (archivo, clave) in enumerate(zip(archivos, claves))]
+    fusion = heapq.merge(*lectores, key=itemgetter(0))
+    for clave, grupo in groupby(fusion, key=itemgetter(0)):
+        elementos = [[] for _ in archivos]
+        for _, indice, elemento in grupo:
+            if todos or not elementos[indice]:
+                elementos[indice].append(elemento)
+        yield clave, elementos
+
+
+def _leer_ordenado(archivo, indice, clave, lineas_invalidas):
+    """Genera (clave, indice, elemento) comprobando que archivo esté ordenado."""
+    anterior = None
+    for elemento in leer_entrada(archivo, clave, lineas_invalidas=lineas_invalidas):
+        actual = clave_agrupamiento(elemento)
+        if anterior is not None and actual < anterior:
+            raise ValueError(f"{archivo} no está ordenado por la clave "
+                             f"(use ordenar_entradas=True)")
+        anterior = actual
+        yield actual, indice, elemento
+
+
+@contextmanager
+def _entradas_ordenadas(archivos, claves, ordenar_entradas, directorios_temp, num_vias,
+                        tamanio_bloque):
+    """Los archivos tal cual, o sus versiones ordenadas (se eliminan al salir)."""
+    if not ordenar_entradas:
+        yield list(archivos)
+        return
+    with abrir_directorios(directorios_temp) as espacio:
+        directorio = tempfile.mkdtemp(prefix='operaciones_conjuntos_', dir=espacio.siguiente())
+        try:
+            ordenados = []
+            for i, (archivo, clave) in enumerate(zip(archivos, claves)):
+                # Un subdirectorio por entrada: dos entradas pueden llamarse igual
+                destino = os.path.join(directorio, str(i))
+                os.mkdir(destino)
+                ordenados.append(balanced_multiway_merging(archivo, num_vias, tamanio_bloque,
+                                                           clave=clave, directorios_temp=espacio,
+                                                           directorio_salida=destino))
+            yield ordenados
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import random
+
+    print("=" * 70)
+    print("OPERACIONES DE CONJUNTOS Y MERGE-JOIN - Sobre archivos ordenados")
+    print("=" * 70)
+
+    directorio = tempfile.mkdtemp(prefix='operaciones_demo_')
+    conjunto_a = set(random.sample(range(100000), 20000))
+    conjunto_b = set(random.sample(range(100000), 20000))
+    archivo_a = os.path.join(directorio, 'datos_a.txt')
+    archivo_b = os.path.join(directorio, 'datos_b.txt')
+    for archivo, conjunto in ((archivo_a, conjunto_a), (archivo_b, conjunto_b)):
+        with open(archivo, 'w') as f:
+            for valor in random.sample(sorted(conjunto), len(conjunto)):
+                f.write(f"{valor}\n")
+    print(f"\nDos archivos desordenados de 20000 números: {directorio}")
+
+    print("\nOperaciones (ordenando antes las entradas):")
+    operaciones = [
+        ("Unión", union, conjunto_a | conjunto_b),
+        ("Intersección", interseccion, conjunto_a & conjunto_b),
+        ("Diferencia", diferencia, conjunto_a - conjunto_b),
+        ("Diferencia simétrica", diferencia_simetrica, conjunto_a ^ conjunto_b),
+    ]
+    for nombre, operacion, esperado in operaciones:
+        resultado = list(operacion(archivo_a, archivo_b, ordenar_entradas=True))
+        correcto = resultado == sorted(esperado)
+        print(f"  {nombre:22} {len(resultado):6} elementos "
+              f"{'[OK]' if correcto else '[ERROR]'}")
+
+    # Merge-join de registros "id<TAB>dato" por la columna 0 (entera)
+    clientes = os.path.join(directorio, 'datos_clientes.txt')
+    pedidos = os.path.join(directorio, 'datos_pedidos.txt')
+    with open(clientes, 'w') as f:
+        for id_cliente in range(1, 6):
+            f.write(f"{id_cliente}\tcliente_{id_cliente}\n")
+    with open(pedidos, 'w') as f:
+        for id_pedido, id_cliente in enumerate([2, 4, 4, 7, 1]):
+            f.write(f"{id_cliente}\tpedido_{id_pedido}\n")
+
+    print("\nMerge-join left de clientes y pedidos (clave 0:int):")
+    for linea in merge_join(clientes, pedidos, clave="0:int", tipo='left',
+                            ordenar_entradas=True):
+        print(f"  {linea.decode()}")
+
+    print("\nLimpiando archivos...")
+    shutil.rmtree(directorio)
+
+    print("\n[OK] Demostración completada")
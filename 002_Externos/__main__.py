@@ -0,0 +1,21 @@
+"""
+Ejecuta la línea de comandos de ordenamiento:
+
+    python 002_Externos [opciones]        (desde la raíz del repositorio)
+    python -m 002_Externos [opciones]
+
+Ver linea_comandos.
+"""
+
+import os
+import sys
+
+# Los módulos de 002_Externos se importan entre sí por nombre simple
+_DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+if _DIRECTORIO not in sys.path:
+    sys.path.insert(0, _DIRECTORIO)
+
+from linea_comandos import main
+
+
+sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Backend NumPy (Runs Vectorizados)
+Genera y fusiona runs de enteros con NumPy: la entrada se convierte de texto a
+int64 por fragmentos, cada bloque se ordena con np.sort y se guarda en binario
+con tofile; las fusiones trabajan por fragmentos en lugar de elemento por
+elemento, y la salida de texto se formatea por lotes (texto_enteros).
+Si NumPy no está instalado, los ordenamientos usan el backend de Python.
+NumPy se importa recién cuando se pide el backend (resolver_backend): importar
+este módulo no lo carga.
+"""
+
+import os
+import tempfile
+
+from telemetria import Telemetria
+from texto_enteros import formatear_enteros, leer_lotes_enteros
+
+BACKENDS = ('python', 'numpy', 'auto')
+
+# Se asignan en cargar_numpy
+np = None
+_TIPO = None
+_numpy_buscado = False
+
+
+def cargar_numpy():
+    """Importa NumPy la primera vez; retorna el módulo, o None si no está instalado."""
+    global np, _TIPO, _numpy_buscado
+    if not _numpy_buscado:
+        _numpy_buscado = True
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np, _TIPO = numpy, numpy.int64
+    return np
+
+
+def resolver_backend(backend):
+    """
+    Retorna el backend efectivo: 'numpy' si se pidió (o 'auto') y NumPy está
+    disponible; 'python' en cualquier otro caso.
+    """
+    if backend is None:
+        backend = 'python'
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend no soportado: {backend!r} (use uno de {BACKENDS})")
+    if backend == 'python' or cargar_numpy() is None:
+        return 'python'
+    return 'numpy'
+
+
+def usar_numpy(backend, clave=None, agregado=None, unico=False):
+    """
+    Indica si el ordenamiento puede usar NumPy: solo para enteros simples
+    (sin clave de registros, sin agregado y sin eliminar duplicados).
+    """
+    simple = clave is None and agregado is None and not unico
+    return simple and resolver_backend(backend) == 'numpy'
+
+
+def leer_bloques(archivo, tamanio_bloque, lineas_invalidas=None):
+    """
+    Genera arreglos int64 de hasta tamanio_bloque enteros (uno por línea).
+    La entrada se lee y convierte por fragmentos con texto_enteros (un solo
+    map(int, ...) por fragmento, o línea a línea aplicando la política
+    lineas_invalidas si alguna falla); los bloques se cortan de esos arreglos.
+    """
+    cargar_numpy()
+    pendientes = []
+    cantidad = 0
+    for lote in leer_lotes_enteros(archivo, lineas_invalidas):
+        pendientes.append(np.array(lote, dtype=_TIPO))
+        cantidad += len(lote)
+        if cantidad < tamanio_bloque:
+            continue
+
+        # Un solo concatenate por fragmento; los bloques son vistas del resultado
+        datos = np.concatenate(pendientes)
+        completos = len(datos) - len(datos) % tamanio_bloque
+        for inicio in range(0, completos, tamanio_bloque):
+            yield datos[inicio:inicio + tamanio_bloque]
+        pendientes = [datos[completos:]]
+        cantidad = len(datos) - completos
+
+    if cantidad:
+        yield np.concatenate(pendientes)
+
+
+def bloques_ordenados(archivo, tamanio_bloque, lineas_invalidas=None):
+    """Genera los bloques de la entrada ya ordenados con np.sort (estable)."""
+    for bloque in leer_bloques(archivo, tamanio_bloque, lineas_invalidas):
+        yield np.sort(bloque, kind='stable')
+
+
+def escribir_run(bloque, directorio=None):
+    """Guarda un bloque ordenado como run binario int64; retorna su ruta."""
+    with tempfile.NamedTemporaryFile(mode='wb', delete=False, dir=directorio) as f:
+        bloque.tofile(f)
+    return f.name
+
+
+def generar_runs(archivo, tamanio_bloque, espacio, lineas_invalidas=None):
+    """Fase 1: Divide la entrada en bloques ordenados y los guarda como runs binarios."""
+    return [escribir_run(bloque, espacio.siguiente())
+            for bloque in bloques_ordenados(archivo, tamanio_bloque, lineas_invalidas)]
+
+
+def fusionar_runs(archivos, directorio=None, archivo_texto=None, tamanio_fragmento=65536):
+    """
+    Fusiona runs binarios por fragmentos.
+    Cada run mantiene en memoria un fragmento; todos los valores menores o
+    iguales al menor de los últimos valores de los fragmentos (de runs que aún
+    tienen datos en disco) ya pueden escribirse: se ubican con searchsorted, se
+    concatenan y se ordenan juntos.
+
+    Escribe un run binario en directorio, o texto (un entero por línea) en
+    archivo_texto si se indica. Retorna la ruta escrita.
+    """
+    cargar_numpy()
+    lectores = [open(archivo, 'rb') for archivo in archivos]
+    try:
+        fragmentos = [np.fromfile(f, dtype=_TIPO, count=tamanio_fragmento) for f in lectores]
+        pendientes = [len(fragmento) == tamanio_fragmento for fragmento in fragmentos]
+
+        if archivo_texto is not None:
+            salida = open(archivo_texto, 'wb')
+        else:
+            salida = tempfile.NamedTemporaryFile(mode='wb', delete=False, dir=directorio)
+
+        with salida:
+            while any(len(fragmento) for fragmento in fragmentos):
+                # Límite seguro: el menor último valor entre los runs con datos en disco
+                limites = [fragmento[-1] for fragmento, pendiente in zip(fragmentos, pendientes)
+                           if pendiente]
+                limite = min(limites) if limites else None
+
+                partes = []
+                for i, fragmento in enumerate(fragmentos):
+                    corte = len(fragmento)
+                    if limite is not None:
+                        corte = np.searchsorted(fragmento, limite, side='right')
+                    partes.append(fragmento[:corte])
+                    fragmentos[i] = fragmento[corte:]
+
+                    # Recargar el run que se vació y todavía tiene datos
+                    if pendientes[i] and not len(fragmentos[i]):
+                        fragmentos[i] = np.fromfile(lectores[i], dtype=_TIPO,
+                                                    count=tamanio_fragmento)
+                        pendientes[i] = len(fragmentos[i]) == tamanio_fragmento
+
+                fusionado = np.sort(np.concatenate(partes), kind='stable')
+                if archivo_texto is not None:
+                    salida.write(formatear_enteros(fusionado.tolist()))
+                else:
+                    fusionado.tofile(salida)
+    finally:
+        for f in lectores:
+            f.close()
+
+    return salida.name
+
+
+def ordenar(archivo_entrada, archivo_salida, tamanio_bloque, num_vias, espacio,
+            tamanio_fragmento=65536, lineas_invalidas=None, telemetria=None):
+    """
+    Ordenamiento externo completo con el backend NumPy: bloques ordenados y
+    fusiones de num_vias runs por pasada; la última fusión escribe el texto.
+    telemetria: Telemetria del ordenamiento que lo llama (o un sumidero), que
+        recibe los eventos de runs y de cada pasada.
+    """
+    if not isinstance(telemetria, Telemetria):
+        telemetria = Telemetria(telemetria, 'numpy')
+    inicio = telemetria.marca()
+    archivos_temp = generar_runs(archivo_entrada, tamanio_bloque, espacio, lineas_invalidas)
+    telemetria.runs(inicio, archivos_temp)
+
+    while len(archivos_temp) > num_vias:
+        inicio = telemetria.marca()
+        nuevos_archivos = []
+        for grupo in espacio.agrupar(archivos_temp, num_vias):
+            if len(grupo) == 1:
+                nuevos_archivos.append(grupo[0])
+                continue
+            nuevos_archivos.append(fusionar_runs(grupo, espacio.siguiente(evitar=grupo),
+                                                 tamanio_fragmento=tamanio_fragmento))
+            for archivo in grupo:
+                os.remove(archivo)
+        telemetria.pasada(inicio, num_vias, len(archivos_temp), len(nuevos_archivos))
+        archivos_temp = nuevos_archivos
+
+    inicio = telemetria.marca()
+    fusionar_runs(archivos_temp, archivo_texto=archivo_salida,
+                  tamanio_fragmento=tamanio_fragmento)
+    telemetria.pasada(inicio, num_vias, len(archivos_temp), 1)
+    for archivo in archivos_temp:
+        os.remove(archivo)
+    return archivo_salida
@@ -0,0 +1,228 @@
+"""
+Cache de Resultados (Salidas Ordenadas Direccionadas por Contenido)
+Cache opcional en disco de archivos ordenados. La llave es un hash del
+contenido de la entrada más los parámetros que cambian la salida (clave,
+unico, agregado, expandir, líneas inválidas); el algoritmo, el tamaño de
+bloque, la compresión de los runs o los directorios temporales no cuentan,
+porque todos los ordenamientos producen la misma salida.
+
+Uso:
+    cache = CacheResultados('cache_ordenados', capacidad=1 << 30)
+    salida = cache.ordenar(straight_merging, 'datos.txt', 1000, clave="1:int")
+
+Un acierto cuesta una lectura de la entrada (el hash) y retorna el archivo del
+cache sin ordenar de nuevo. Las salidas se publican con os.replace desde un
+directorio temporal dentro del cache (nunca se ve un archivo a medias) y,
+cuando el cache supera su capacidad en bytes, se eliminan las entradas usadas
+hace más tiempo (LRU, según la fecha de modificación, que se renueva en cada
+acierto).
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+from claves_registros import normalizar_clave
+from indice_disperso import construir_indice, ruta_indice
+from texto_enteros import LineasInvalidas, politica_lineas
+
+
+TAMANIO_LECTURA = 1 << 20
+
+EXTENSION = '.txt'
+
+
+def huella_contenido(archivo, tamanio_lectura=TAMANIO_LECTURA):
+    """Hash BLAKE2b (hexadecimal) del contenido de archivo, en una lectura."""
+    huella = hashlib.blake2b(digest_size=16)
+    with open(archivo, 'rb') as f:
+        for bloque in iter(lambda: f.read(tamanio_lectura), b''):
+            huella.update(bloque)
+    return huella.hexdigest()
+
+
+def parametros_de_salida(clave=None, unico=False, agregado=None, expandir=False,
+                         lineas_invalidas=None):
+    """
+    Representación canónica de los parámetros que cambian la salida.
+    'omitir' y 'contar' descartan las mismas líneas, así que comparten llave.
+    """
+    clave = normalizar_clave(clave)
+    if clave is not None:
+        clave = (tuple(clave.columnas), clave.delimitador)
+    politica = politica_lineas(lineas_invalidas).politica
+    if politica == 'contar':
+        politica = 'omitir'
+    return repr((clave, bool(unico), agregado, bool(expandir), politica))
+
+
+class CacheResultados:
+    """
+    Directorio de salidas ordenadas con un tope de capacidad bytes.
+    Cada entrada es <llave>.txt, con su índice lateral <llave>.txt.idx si se pidió.
+    """
+    def __init__(self, directorio, capacidad=1 << 30):
+        if capacidad <= 0:
+            raise ValueError("La capacidad del cache debe ser positiva")
+        self.directorio = directorio
+        self.capacidad = capacidad
+        os.makedirs(directorio, exist_ok=True)
+
+    def llave(self, archivo_entrada, **parametros):
+        """Llave de la salida de ordenar archivo_entrada con parametros."""
+        huella = hashlib.blake2b(digest_size=16)
+        huella.update(huella_contenido(archivo_entrada).encode())
+        huella.update(parametros_de_salida(**parametros).encode())
+        return huella.hexdigest()
+
+    def ruta(self, llave):
+        return os.path.join(self.directorio, llave + EXTENSION)
+
+    def buscar(self, llave):
+        """Ruta de la entrada de llave (y la marca como usada), o None."""
+        ruta = self.ruta(llave)
+        try:
+            os.utime(ruta)
+        except FileNotFoundError:
+            return None
+        if os.path.exists(ruta_indice(ruta)):
+            os.utime(ruta_indice(ruta))
+        return ruta
+
+    def ordenar(self, funcion, archivo_entrada, *args, **kwargs):
+        """
+        Retorna la salida de funcion(archivo_entrada, *args, **kwargs), un
+        ordenamiento externo, desde el cache si ya estaba. En un fallo, ordena
+        con directorio_salida dentro del cache y publica el resultado.
+        Con indice (Straight Merging), el índice lateral de la salida queda en
+        ruta_indice(salida); si falta en una entrada existente, se construye.
+        Un LineasInvalidas pasado como instancia pide contar las líneas de esta
+        llamada: en ese caso se ordena sin usar el cache.
+        """
+        if isinstance(kwargs.get('lineas_invalidas'), LineasInvalidas):
+            return funcion(archivo_entrada, *args, **kwargs)
+
+        parametros = {nombre: kwargs[nombre]
+                      for nombre in ('clave', 'unico', 'agregado', 'expandir', 'lineas_invalidas')
+                      if nombre in kwargs}
+        llave = self.llave(archivo_entrada, **parametros)
+        intervalo = kwargs.get('indice')
+
+        ruta = self.buscar(llave)
+        if ruta is not None:
+            if intervalo is not None and not os.path.exists(ruta_indice(ruta)):
+                # construir_indice también publica con os.replace
+                construir_indice(ruta, intervalo)
+            return ruta
+
+        # Fallo: ordenar en un directorio temporal del cache y publicar
+        temporal = tempfile.mkdtemp(prefix='.ordenando_', dir=self.directorio)
+        try:
+            kwargs['directorio_salida'] = temporal
+            resultado = funcion(archivo_entrada, *args, **kwargs)
+            if resultado is None:
+                return None
+            ruta = self.ruta(llave)
+            # El índice se publica antes que la salida que lo usa
+            if os.path.exists(ruta_indice(resultado)):
+                os.replace(ruta_indice(resultado), ruta_indice(ruta))
+            os.replace(resultado, ruta)
+        finally:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+        self.desalojar(conservar=llave)
+        return ruta
+
+    def entradas(self):
+        """Lista de (fecha de uso, bytes, llave) de las entradas del cache."""
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.startswith('.') or not nombre.endswith(EXTENSION):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                estado = os.stat(ruta)
+                tamanio = estado.st_size
+                if os.path.exists(ruta_indice(ruta)):
+                    tamanio += os.path.getsize(ruta_indice(ruta))
+            except FileNotFoundError:
+                # Desalojada por otro proceso mientras se listaba
+                continue
+            entradas.append((estado.st_mtime, tamanio, nombre[:-len(EXTENSION)]))
+        return entradas
+
+    def tamanio(self):
+        """Bytes ocupados por las entradas del cache."""
+        return sum(tamanio for _, tamanio, _ in self.entradas())
+
+    def desalojar(self, conservar=None):
+        """Elimina las entradas menos usadas hasta no superar la capacidad."""
+        entradas = sorted(self.entradas())
+        total = sum(tamanio for _, tamanio, _ in entradas)
+        for _, tamanio, llave in entradas:
+            if total <= self.capacidad:
+                break
+            if llave == conservar:
+                continue
+            self._eliminar(llave)
+            total -= tamanio
+
+    def _eliminar(self, llave):
+        ruta = self.ruta(llave)
+        # La salida primero: sin ella la entrada ya no se encuentra
+        for archivo in (ruta, ruta_indice(ruta)):
+            try:
+                os.remove(archivo)
+            except FileNotFoundError:
+                pass
+
+    def vaciar(self):
+        """Elimina todas las entradas del cache."""
+        for _, _, llave in self.entradas():
+            self._eliminar(llave)
+
+
+if __name__ == "__main__":
+    import importlib
+    import random
+    import time
+
+    print("=" * 70)
+    print("CACHE DE RESULTADOS - Salidas ordenadas direccionadas por contenido")
+    print("=" * 70)
+
+    directorio = tempfile.mkdtemp(prefix='cache_resultados_')
+    archivo_test = os.path.join(directorio, 'datos_cache.txt')
+    with open(archivo_test, 'w') as f:
+        for _ in range(100000):
+            f.write(f"{random.randint(1, 1000000)}\n")
+    print(f"\nArchivo de prueba con 100000 números: {archivo_test}")
+
+    multiway = importlib.import_module('010_multiway_merging').balanced_multiway_merging
+    cache = CacheResultados(os.path.join(directorio, 'cache'), capacidad=2 << 20)
+
+    for intento in ("Primera vez (fallo)", "Segunda vez (acierto)"):
+        inicio = time.perf_counter()
+        salida = cache.ordenar(multiway, archivo_test, tamanio_bloque=5000)
+        print(f"  {intento}: {time.perf_counter() - inicio:.4f} s -> {os.path.basename(salida)}")
+
+    # Con unico=True la salida es otra, así que es otra entrada
+    salida_unica = cache.ordenar(multiway, archivo_test, tamanio_bloque=5000, unico=True)
+    print(f"  Con unico=True: {os.path.basename(salida_unica)}")
+    print(f"  Entradas: {len(cache.entradas())}, ocupado: {cache.tamanio()} bytes "
+          f"(capacidad {cache.capacidad})")
+
+    # Una entrada nueva que no cabe desaloja la menos usada
+    otro = os.path.join(directorio, 'datos_cache_2.txt')
+    with open(otro, 'w') as f:
+        for _ in range(100000):
+            f.write(f"{random.randint(1, 1000000)}\n")
+    cache.ordenar(multiway, otro, tamanio_bloque=5000)
+    print(f"  Tras ordenar otro archivo: {len(cache.entradas())} entradas, "
+          f"{cache.tamanio()} bytes")
+
+    print("\nLimpiando archivos...")
+    shutil.rmtree(directorio)
+
+    print("\n[OK] Demostración completada")
@@ -0,0 +1,137 @@
+"""
+Claves de Registros (Ordenamiento por Columnas)
+Extrae claves de registros de texto delimitado (TSV/CSV) y las normaliza a bytes
+comparables directamente (memcmp), para que las fusiones no vuelvan a dividir
+las líneas ni a convertir tipos.
+"""
+
+import struct
+
+
+TIPOS = ('str', 'int', 'float')
+
+_DESPLAZAMIENTO_INT = 1 << 63
+
+
+def codificar_int(valor):
+    """Entero de 64 bits con signo -> 8 bytes big-endian con el bit de signo invertido."""
+    valor = int(valor)
+    if not -_DESPLAZAMIENTO_INT <= valor < _DESPLAZAMIENTO_INT:
+        raise ValueError(f"Entero fuera del rango de 64 bits: {valor}")
+    return (valor + _DESPLAZAMIENTO_INT).to_bytes(8, 'big')
+
+
+def codificar_float(valor):
+    """
+    Float IEEE 754 -> 8 bytes que se ordenan como el número.
+    Positivos: se invierte el bit de signo. Negativos: se invierten todos los bits.
+    """
+    bits = struct.unpack('>Q', struct.pack('>d', float(valor)))[0]
+    if bits & (1 << 63):
+        bits ^= 0xFFFFFFFFFFFFFFFF
+    else:
+        bits |= 1 << 63
+    return bits.to_bytes(8, 'big')
+
+
+def codificar_str(valor):
+    """
+    Bytes UTF-8 -> secuencia libre de prefijos: cada 0x00 se escapa como 0x00 0xFF
+    y el campo termina en 0x00 0x00, así "ab" < "abc" también al concatenar campos.
+    """
+    return valor.replace(b'\x00', b'\x00\xff') + b'\x00\x00'
+
+
+_CODIFICADORES = {'str': codificar_str, 'int': codificar_int, 'float': codificar_float}
+
+
+_TABLA_INVERSA = bytes(range(255, -1, -1))
+
+
+def invertir(datos):
+    """Invierte todos los bits, para ordenar una columna en forma descendente."""
+    return datos.translate(_TABLA_INVERSA)
+
+
+class EspecClave:
+    """
+    Especificación de clave para ordenar registros de texto delimitado.
+
+    columnas: lista de (indice_columna, tipo, descendente) con tipo en TIPOS.
+    delimitador: separador de columnas (por defecto tabulador).
+
+    Cada registro se convierte una sola vez en (clave, registro): la clave es la
+    concatenación de las columnas normalizadas y el registro la línea original.
+    """
+    def __init__(self, columnas, delimitador='\t'):
+        if not columnas:
+            raise ValueError("La especificación de clave necesita al menos una columna")
+
+        self.columnas = []
+        for columna in columnas:
+            columna = (columna,) if isinstance(columna, int) else tuple(columna)
+            indice = columna[0]
+            tipo = columna[1] if len(columna) > 1 else 'str'
+            descendente = columna[2] if len(columna) > 2 else False
+            if tipo not in TIPOS:
+                raise ValueError(f"Tipo de columna no soportado: {tipo!r} (use uno de {TIPOS})")
+            self.columnas.append((int(indice), tipo, bool(descendente)))
+
+        self.delimitador = delimitador
+        self.separador = delimitador.encode('utf-8')
+        self.codificadores = [
+            (indice, _CODIFICADORES[tipo], descendente)
+            for indice, tipo, descendente in self.columnas
+        ]
+
+    @classmethod
+    def desde_texto(cls, texto, delimitador='\t'):
+        """
+        Crea la especificación a partir de un texto como "2:int:desc,0:str".
+        Cada columna es indice[:tipo][:asc|desc]; por defecto str ascendente.
+        """
+        columnas = []
+        for parte in texto.split(','):
+            campos = parte.strip().split(':')
+            if not campos[0] or len(campos) > 3:
+                raise ValueError(f"Columna de clave inválida: {parte!r}")
+            tipo = campos[1] if len(campos) > 1 and campos[1] else 'str'
+            orden = campos[2] if len(campos) > 2 else 'asc'
+            if orden not in ('asc', 'desc'):
+                raise ValueError(f"Orden inválido en columna de clave: {orden!r}")
+            columnas.append((int(campos[0]), tipo, orden == 'desc'))
+        return cls(columnas, delimitador)
+
+    def extraer(self, linea):
+        """
+        Convierte una línea (bytes) en (clave, registro).
+        La clave se compara byte a byte; el registro es la línea sin salto final.
+        """
+        registro = linea.rstrip(b'\r\n')
+        campos = registro.split(self.separador)
+
+        partes = []
+        for indice, codificar, descendente in self.codificadores:
+            try:
+                campo = campos[indice]
+            except IndexError:
+                raise ValueError(f"Registro sin columna {indice}: {registro!r}") from None
+            codificado = codificar(campo)
+            partes.append(invertir(codificado) if descendente else codificado)
+
+        return b''.join(partes), registro
+
+    def __repr__(self):
+        return f"EspecClave({self.columnas!r}, delimitador={self.delimitador!r})"
+
+
+def normalizar_clave(clave, delimitador='\t'):
+    """
+    Acepta None, un EspecClave, un texto "2:int:desc,0" o una lista de
+    (indice, tipo, descendente) y retorna un EspecClave (o None).
+    """
+    if clave is None or isinstance(clave, EspecClave):
+        return clave
+    if isinstance(clave, str):
+        return EspecClave.desde_texto(clave, delimitador)
+    return EspecClave(clave, delimitador)
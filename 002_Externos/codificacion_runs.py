@@ -0,0 +1,683 @@
+"""
+Codificación de Runs (Runs Comprimidos)
+Lectura y escritura de runs de enteros, en texto o comprimidos por bloques.
+
+Formato comprimido: una secuencia de tramas independientes.
+    tipo (1 byte) | cantidad (varint) | longitud (varint) | datos
+Cada trama guarda un bloque de valores codificados en delta + zigzag + varint,
+opcionalmente envuelto en zlib o lzma. Una trama de tipo FIN marca el final
+de un run (equivalente a la línea "RUN_END" del formato de texto).
+
+Los runs de registros (tuplas (clave, registro) de bytes, ver claves_registros)
+usan siempre el formato por tramas: cada elemento se guarda como
+    longitud_clave (varint) | clave | longitud_registro (varint) | registro
+y el tipo de trama lleva la bandera de registros, por lo que los lectores no
+necesitan saber de antemano qué contiene el archivo.
+
+Los runs agregados guardan pares (elemento, cantidad), donde elemento es un
+entero o un registro. Sus tramas llevan la bandera de pares y contienen
+    longitud_elementos (varint) | elementos | cantidades (delta + zigzag + varint)
+
+Formato binario ('binario'): enteros de 64 bits con signo de ancho fijo (tipo
+'q' de array, orden nativo), sin tramas ni marcadores; un solo run por archivo.
+Permite fusionar con mmap copiando tramos contiguos (ver fusion_mmap).
+"""
+
+import os
+import shutil
+import tempfile
+import zlib
+import lzma
+from array import array
+from itertools import islice
+
+from texto_enteros import (
+    fragmentos_de_lineas, formatear_enteros, leer_enteros, politica_lineas, TAMANIO_LOTE
+)
+
+
+COMPRESIONES = (None, 'delta', 'zlib', 'lzma', 'binario')
+
+# Formato de ancho fijo de los runs 'binario'
+TIPO_BINARIO = 'q'
+
+
+AGREGADOS = (None, 'conteo', 'suma')
+
+MARCA_FIN_RUN = "RUN_END"
+
+# Marcador devuelto por leer_elementos() al terminar cada run
+FIN_RUN = object()
+
+# Ningún elemento retenido en EscritorRun (None no sirve: no es comparable)
+_VACIO = object()
+
+# Tipos de trama del formato comprimido
+_TRAMA_FIN = 0
+_TRAMA_DELTA = 1
+_TRAMA_ZLIB = 2
+_TRAMA_LZMA = 3
+_BANDERA_REGISTROS = 0x10
+_BANDERA_PARES = 0x20
+
+_TIPO_POR_COMPRESION = {'delta': _TRAMA_DELTA, 'zlib': _TRAMA_ZLIB, 'lzma': _TRAMA_LZMA}
+
+
+def validar_compresion(compresion):
+    """Lanza ValueError si la compresión no es una de las soportadas."""
+    if compresion not in COMPRESIONES:
+        raise ValueError(
+            f"Compresión no soportada: {compresion!r} (use una de {COMPRESIONES})"
+        )
+
+
+def validar_agregado(agregado, clave=None, expandir=False):
+    """
+    Lanza ValueError si la combinación de agregación no está soportada.
+    'suma' lee líneas "valor peso" de enteros, por lo que no admite clave, y
+    sus pares no pueden expandirse de vuelta a valores repetidos.
+    """
+    if agregado not in AGREGADOS:
+        raise ValueError(f"Agregado no soportado: {agregado!r} (use uno de {AGREGADOS})")
+    if agregado == 'suma' and clave is not None:
+        raise ValueError("El agregado 'suma' solo está soportado para enteros")
+    if expandir and agregado != 'conteo':
+        raise ValueError("Solo el agregado 'conteo' puede expandirse")
+
+
+def compresion_para(compresion, clave, agregado=None):
+    """
+    Compresión efectiva de los runs: los registros (clave no None) y los pares
+    agregados siempre se guardan en tramas, 'delta' si no se pidió otra
+    compresión (el formato 'binario' solo admite enteros).
+    """
+    validar_compresion(compresion)
+    if (clave is not None or agregado is not None) and compresion in (None, 'binario'):
+        return 'delta'
+    return compresion
+
+
+def clave_agrupamiento(elemento):
+    """
+    Clave por la que se agrupan elementos iguales: el entero, los bytes de la
+    clave de un registro, o la clave del elemento de un par agregado.
+    """
+    if isinstance(elemento, tuple):
+        if isinstance(elemento[1], int):
+            return clave_agrupamiento(elemento[0])
+        return elemento[0]
+    return elemento
+
+
+def _combinar(anterior, elemento):
+    """
+    Si ambos elementos tienen la misma clave, retorna su combinación (los pares
+    suman cantidades; los demás conservan el anterior). Si no, retorna _VACIO.
+    """
+    if clave_agrupamiento(anterior) != clave_agrupamiento(elemento):
+        return _VACIO
+    if isinstance(elemento, tuple) and isinstance(elemento[1], int):
+        return (anterior[0], anterior[1] + elemento[1])
+    return anterior
+
+
+def colapsar(elementos):
+    """Genera los elementos ordenados reduciendo a uno los de igual clave."""
+    pendiente = _VACIO
+    for elemento in elementos:
+        if pendiente is not _VACIO:
+            combinado = _combinar(pendiente, elemento)
+            if combinado is not _VACIO:
+                pendiente = combinado
+                continue
+            yield pendiente
+        pendiente = elemento
+    if pendiente is not _VACIO:
+        yield pendiente
+
+
+def _escribir_varint(salida, numero):
+    """Agrega un entero no negativo a salida (bytearray) en formato varint."""
+    while numero >= 0x80:
+        salida.append((numero & 0x7F) | 0x80)
+        numero >>= 7
+    salida.append(numero)
+
+
+def _leer_varint_archivo(f):
+    """Lee un varint de un archivo binario. Retorna None al final del archivo."""
+    numero = 0
+    desplazamiento = 0
+    while True:
+        byte = f.read(1)
+        if not byte:
+            if desplazamiento == 0:
+                return None
+            raise ValueError("Trama truncada en archivo de run comprimido")
+        numero |= (byte[0] & 0x7F) << desplazamiento
+        if byte[0] < 0x80:
+            return numero
+        desplazamiento += 7
+
+
+def codificar_bloque(valores):
+    """
+    Codifica una lista de enteros como deltas zigzag empaquetadas en varint.
+    El primer valor se codifica como delta respecto de 0.
+    """
+    salida = bytearray()
+    anterior = 0
+    for valor in valores:
+        delta = valor - anterior
+        # Zigzag: intercala positivos y negativos (0, -1, 1, -2, 2, ...)
+        _escribir_varint(salida, delta * 2 if delta >= 0 else -delta * 2 - 1)
+        anterior = valor
+    return bytes(salida)
+
+
+def codificar_registros(registros):
+    """Codifica una lista de (clave, registro) como pares de bytes con longitud."""
+    salida = bytearray()
+    for clave, registro in registros:
+        _escribir_varint(salida, len(clave))
+        salida += clave
+        _escribir_varint(salida, len(registro))
+        salida += registro
+    return bytes(salida)
+
+
+def decodificar_registros(datos, cantidad):
+    """Decodifica un bloque producido por codificar_registros()."""
+    registros = []
+    posicion = 0
+    for _ in range(cantidad):
+        partes = []
+        for _ in range(2):
+            longitud = 0
+            desplazamiento = 0
+            while True:
+                byte = datos[posicion]
+                posicion += 1
+                longitud |= (byte & 0x7F) << desplazamiento
+                if byte < 0x80:
+                    break
+                desplazamiento += 7
+            partes.append(datos[posicion:posicion + longitud])
+            posicion += longitud
+        registros.append((partes[0], partes[1]))
+    return registros
+
+
+def codificar_pares(pares):
+    """Codifica una lista de (elemento, cantidad): elementos y luego cantidades."""
+    elementos = [elemento for elemento, _ in pares]
+    if isinstance(elementos[0], tuple):
+        datos = codificar_registros(elementos)
+    else:
+        datos = codificar_bloque(elementos)
+
+    salida = bytearray()
+    _escribir_varint(salida, len(datos))
+    salida += datos
+    salida += codificar_bloque([cantidad for _, cantidad in pares])
+    return bytes(salida)
+
+
+def decodificar_pares(datos, cantidad, registros):
+    """Decodifica un bloque producido por codificar_pares()."""
+    longitud = 0
+    desplazamiento = 0
+    posicion = 0
+    while True:
+        byte = datos[posicion]
+        posicion += 1
+        longitud |= (byte & 0x7F) << desplazamiento
+        if byte < 0x80:
+            break
+        desplazamiento += 7
+
+    datos_elementos = datos[posicion:posicion + longitud]
+    if registros:
+        elementos = decodificar_registros(datos_elementos, cantidad)
+    else:
+        elementos = decodificar_bloque(datos_elementos, cantidad)
+    cantidades = decodificar_bloque(datos[posicion + longitud:], cantidad)
+    return list(zip(elementos, cantidades))
+
+
+def decodificar_bloque(datos, cantidad):
+    """Decodifica un bloque producido por codificar_bloque()."""
+    valores = []
+    anterior = 0
+    posicion = 0
+    for _ in range(cantidad):
+        numero = 0
+        desplazamiento = 0
+        while True:
+            byte = datos[posicion]
+            posicion += 1
+            numero |= (byte & 0x7F) << desplazamiento
+            if byte < 0x80:
+                break
+            desplazamiento += 7
+        delta = numero >> 1 if not numero & 1 else -((numero + 1) >> 1)
+        anterior += delta
+        valores.append(anterior)
+    return valores
+
+
+class EscritorRun:
+    """
+    Escribe enteros en un archivo de run, en texto o comprimido por bloques.
+    Con compresión también acepta registros (tuplas (clave, registro) de bytes)
+    y pares agregados (elemento, cantidad).
+    Si no se indica ruta, crea un archivo temporal (ver atributo nombre).
+
+    Con colapsar=True, los elementos consecutivos con la misma clave se reducen
+    a uno solo al escribirlos: los pares suman sus cantidades y el resto conserva
+    el primero. Así cada run y cada fusión escriben una sola vez cada clave.
+
+    Con indice (un EscritorIndice, ver indice_disperso) se registra la posición
+    en bytes de cada entero escrito; solo para runs de texto.
+    """
+    def __init__(self, ruta=None, compresion=None, modo='w', directorio=None,
+                 valores_por_bloque=4096, colapsar=False, indice=None):
+        validar_compresion(compresion)
+        if indice is not None and compresion is not None:
+            raise ValueError("El índice disperso solo se puede generar para runs de texto")
+        self.indice = indice
+        self.posicion = 0
+        self.compresion = compresion
+        self.valores_por_bloque = valores_por_bloque
+        self.bloque = []
+        self.colapsar = colapsar
+        self.pendiente = _VACIO
+
+        # Los runs de texto también se escriben en binario, por lotes de líneas
+        modo_archivo = modo + 'b'
+        if ruta is None:
+            self.archivo = tempfile.NamedTemporaryFile(
+                mode=modo_archivo, delete=False, dir=directorio
+            )
+        else:
+            self.archivo = open(ruta, modo_archivo)
+        self.nombre = self.archivo.name
+
+    def escribir(self, valor):
+        """Escribe un valor al final del run."""
+        if self.colapsar:
+            pendiente = self.pendiente
+            if pendiente is not _VACIO:
+                combinado = _combinar(pendiente, valor)
+                if combinado is not _VACIO:
+                    self.pendiente = combinado
+                    return
+                self._escribir(pendiente)
+            self.pendiente = valor
+            return
+        self._escribir(valor)
+
+    def _vaciar_pendiente(self):
+        """Escribe el elemento retenido por el colapso de claves iguales."""
+        if self.pendiente is not _VACIO:
+            self._escribir(self.pendiente)
+            self.pendiente = _VACIO
+
+    def _escribir(self, valor):
+        self.bloque.append(valor)
+        if len(self.bloque) >= self.valores_por_bloque:
+            self._vaciar_bloque()
+
+    def extender(self, valores):
+        """Escribe varios valores al final del run."""
+        for valor in valores:
+            self.escribir(valor)
+
+    def terminar_run(self):
+        """Escribe el marcador de fin de run."""
+        _validar_marcas(self.compresion)
+        self._vaciar_pendiente()
+        self._vaciar_bloque()
+        if self.compresion is None:
+            self.archivo.write(b"%s\n" % MARCA_FIN_RUN.encode())
+            return
+        self.archivo.write(bytes((_TRAMA_FIN, 0, 0)))
+
+    def _vaciar_bloque(self):
+        """Escribe el bloque pendiente como líneas de texto o como una trama comprimida."""
+        if not self.bloque:
+            return
+
+        if self.compresion is None:
+            if self.indice is not None:
+                # Posición de cada línea para el índice disperso
+                for valor in self.bloque:
+                    self.indice.registrar(valor, self.posicion)
+                    self.posicion += len(b"%d" % valor) + 1
+            self.archivo.write(formatear_enteros(self.bloque))
+            self.bloque = []
+            return
+
+        if self.compresion == 'binario':
+            array(TIPO_BINARIO, self.bloque).tofile(self.archivo)
+            self.bloque = []
+            return
+
+        tipo = _TIPO_POR_COMPRESION[self.compresion]
+        primero = self.bloque[0]
+        if isinstance(primero, tuple) and isinstance(primero[1], int):
+            datos = codificar_pares(self.bloque)
+            tipo |= _BANDERA_PARES
+            if isinstance(primero[0], tuple):
+                tipo |= _BANDERA_REGISTROS
+        elif isinstance(primero, tuple):
+            datos = codificar_registros(self.bloque)
+            tipo |= _BANDERA_REGISTROS
+        else:
+            datos = codificar_bloque(self.bloque)
+
+        if self.compresion == 'zlib':
+            datos = zlib.compress(datos)
+        elif self.compresion == 'lzma':
+            datos = lzma.compress(datos)
+
+        cabecera = bytearray((tipo,))
+        _escribir_varint(cabecera, len(self.bloque))
+        _escribir_varint(cabecera, len(datos))
+        self.archivo.write(cabecera)
+        self.archivo.write(datos)
+        self.bloque = []
+
+    def close(self):
+        """Vacía el bloque pendiente y cierra el archivo."""
+        self._vaciar_pendiente()
+        self._vaciar_bloque()
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _iterar_tramas(f):
+    """Genera (tipo, cantidad, datos) por cada trama de un archivo comprimido."""
+    while True:
+        tipo = f.read(1)
+        if not tipo:
+            return
+        cantidad = _leer_varint_archivo(f)
+        longitud = _leer_varint_archivo(f)
+        if cantidad is None or longitud is None:
+            raise ValueError("Trama truncada en archivo de run comprimido")
+        datos = f.read(longitud)
+        if len(datos) != longitud:
+            raise ValueError("Trama truncada en archivo de run comprimido")
+        yield tipo[0], cantidad, datos
+
+
+def _decodificar_trama(tipo, cantidad, datos):
+    """Descomprime y decodifica los valores (o registros) de una trama de datos."""
+    registros = tipo & _BANDERA_REGISTROS
+    pares = tipo & _BANDERA_PARES
+    tipo &= ~(_BANDERA_REGISTROS | _BANDERA_PARES)
+
+    if tipo == _TRAMA_ZLIB:
+        datos = zlib.decompress(datos)
+    elif tipo == _TRAMA_LZMA:
+        datos = lzma.decompress(datos)
+    elif tipo != _TRAMA_DELTA:
+        raise ValueError(f"Tipo de trama desconocido: {tipo}")
+
+    if pares:
+        return decodificar_pares(datos, cantidad, registros)
+    if registros:
+        return decodificar_registros(datos, cantidad)
+    return decodificar_bloque(datos, cantidad)
+
+
+def leer_elementos(ruta, compresion=None):
+    """
+    Genera los valores de un archivo de run y FIN_RUN por cada marcador de fin.
+    Los archivos comprimidos se decodifican de forma perezosa, bloque a bloque.
+    """
+    validar_compresion(compresion)
+
+    if compresion is None:
+        marca = MARCA_FIN_RUN.encode()
+        for fragmento in fragmentos_de_lineas(ruta):
+            for linea in fragmento.split():
+                yield FIN_RUN if linea == marca else int(linea)
+        return
+
+    if compresion == 'binario':
+        yield from leer_binario(ruta)
+        return
+
+    with open(ruta, 'rb') as f:
+        for tipo, cantidad, datos in _iterar_tramas(f):
+            if tipo == _TRAMA_FIN:
+                yield FIN_RUN
+            else:
+                yield from _decodificar_trama(tipo, cantidad, datos)
+
+
+def leer_binario(ruta, valores_por_lectura=65536):
+    """Genera los enteros de un run 'binario', leyendo de a valores_por_lectura."""
+    tamanio = array(TIPO_BINARIO).itemsize
+    with open(ruta, 'rb') as f:
+        while True:
+            datos = f.read(tamanio * valores_por_lectura)
+            if not datos:
+                return
+            if len(datos) % tamanio:
+                raise ValueError("Run binario truncado")
+            valores = array(TIPO_BINARIO)
+            valores.frombytes(datos)
+            yield from valores
+
+
+def _validar_marcas(compresion):
+    """Los runs 'binario' no tienen marcadores: un solo run por archivo."""
+    if compresion == 'binario':
+        raise ValueError("El formato 'binario' no admite varios runs por archivo")
+
+
+def leer_run(ruta, compresion=None):
+    """Genera los valores de un archivo de run, ignorando marcadores de fin."""
+    for valor in leer_elementos(ruta, compresion):
+        if valor is not FIN_RUN:
+            yield valor
+
+
+def leer_primer_run(ruta, compresion=None):
+    """Retorna la lista de valores del primer run de un archivo."""
+    run = []
+    for valor in leer_elementos(ruta, compresion):
+        if valor is FIN_RUN:
+            break
+        run.append(valor)
+    return run
+
+
+def contar_runs(ruta, compresion=None):
+    """Cuenta los marcadores de fin de run sin decodificar los bloques."""
+    validar_compresion(compresion)
+    _validar_marcas(compresion)
+
+    if compresion is None:
+        with open(ruta, 'r') as f:
+            return sum(1 for linea in f if linea.strip() == MARCA_FIN_RUN)
+
+    with open(ruta, 'rb') as f:
+        return sum(1 for tipo, _, _ in _iterar_tramas(f) if tipo == _TRAMA_FIN)
+
+
+def eliminar_primer_run(ruta, compresion=None):
+    """Reescribe el archivo sin su primer run (incluido su marcador de fin)."""
+    validar_compresion(compresion)
+    _validar_marcas(compresion)
+    directorio = os.path.dirname(os.path.abspath(ruta))
+
+    if compresion is None:
+        temp_file = tempfile.NamedTemporaryFile(mode='w', delete=False, dir=directorio)
+        with open(ruta, 'r') as f:
+            for linea in f:
+                if linea.strip() == MARCA_FIN_RUN:
+                    break
+            shutil.copyfileobj(f, temp_file)
+    else:
+        temp_file = tempfile.NamedTemporaryFile(mode='wb', delete=False, dir=directorio)
+        with open(ruta, 'rb') as f:
+            # Saltar tramas sin decodificarlas hasta el primer fin de run
+            for tipo, _, _ in _iterar_tramas(f):
+                if tipo == _TRAMA_FIN:
+                    break
+            shutil.copyfileobj(f, temp_file)
+
+    temp_file.close()
+    os.replace(temp_file.name, ruta)
+
+
+def linea_de_elemento(elemento):
+    """Línea de salida (bytes, sin salto) de un entero o de un registro."""
+    if isinstance(elemento, tuple):
+        return elemento[1]
+    return b"%d" % elemento
+
+
+def escribir_valores(salida, valores):
+    """Escribe enteros o líneas de registros (bytes) por lotes, uno por línea."""
+    valores = iter(valores)
+    while True:
+        lote = list(islice(valores, TAMANIO_LOTE))
+        if not lote:
+            break
+        if isinstance(lote[0], int):
+            salida.write(formatear_enteros(lote))
+        else:
+            salida.write(b"\n".join(lote) + b"\n")
+
+
+def valores_de_salida(elementos, expandir=False):
+    """
+    Genera los valores tal como quedarían en la salida de texto: los enteros sin
+    cambios, los registros como su línea (bytes, sin salto) y los pares agregados
+    como (valor, cantidad), o el valor repetido cantidad veces si expandir=True.
+    """
+    for elemento in elementos:
+        if not isinstance(elemento, tuple):
+            yield elemento
+        elif isinstance(elemento[1], int):
+            valor = elemento[0]
+            if isinstance(valor, tuple):
+                valor = valor[1]
+            if expandir:
+                for _ in range(elemento[1]):
+                    yield valor
+            else:
+                yield (valor, elemento[1])
+        else:
+            yield elemento[1]
+
+
+def decodificar_a_texto(ruta, archivo_salida, compresion=None, expandir=False,
+                        indice=None):
+    """
+    Escribe los valores de un run como texto, un entero por línea.
+    Los registros se escriben tal como venían en la entrada, sin su clave.
+    Los pares agregados se escriben como "elemento<TAB>cantidad", o bien
+    repitiendo el elemento cantidad veces si expandir=True.
+    Con indice (EscritorIndice) registra la posición de cada entero escrito.
+    """
+    if indice is not None:
+        with EscritorRun(archivo_salida, indice=indice) as salida:
+            for valor in leer_run(ruta, compresion):
+                if isinstance(valor, tuple):
+                    if not expandir or isinstance(valor[0], tuple):
+                        raise ValueError("El índice disperso solo admite salidas de enteros")
+                    for _ in range(valor[1]):
+                        salida.escribir(valor[0])
+                else:
+                    salida.escribir(valor)
+        return archivo_salida
+
+    with open(archivo_salida, 'wb') as salida:
+        lote = []
+        for valor in leer_run(ruta, compresion):
+            if not isinstance(valor, tuple):
+                # Enteros: formateo y escritura por lotes
+                lote.append(valor)
+                if len(lote) >= TAMANIO_LOTE:
+                    salida.write(formatear_enteros(lote))
+                    lote = []
+            elif isinstance(valor[1], int):
+                linea = linea_de_elemento(valor[0])
+                if expandir:
+                    salida.write((linea + b"\n") * valor[1])
+                else:
+                    salida.write(linea + b"\t%d\n" % valor[1])
+            else:
+                salida.write(linea_de_elemento(valor) + b"\n")
+        salida.write(formatear_enteros(lote))
+    return archivo_salida
+
+
+def _entero_de_linea(linea):
+    return int(linea.strip())
+
+
+def _par_valor_peso(linea):
+    """Línea "valor [peso]" -> (valor, peso); el peso por defecto es 1."""
+    campos = linea.split()
+    return int(campos[0]), int(campos[1]) if len(campos) > 1 else 1
+
+
+def convertidor_entrada(clave=None, agregado=None):
+    """
+    Retorna la función que convierte una línea (bytes) del archivo a ordenar:
+    en un entero, o en (clave, registro) si hay clave.
+    Con agregado 'conteo' cada elemento se convierte en (elemento, 1); con
+    'suma' cada línea "valor peso" se convierte en (valor, peso).
+    """
+    if agregado == 'suma':
+        return _par_valor_peso
+
+    convertir = _entero_de_linea if clave is None else clave.extraer
+    if agregado == 'conteo':
+        return lambda linea: (convertir(linea), 1)
+    return convertir
+
+
+def leer_entrada(archivo, clave=None, agregado=None, lineas_invalidas=None, usar_mmap=False):
+    """
+    Genera los elementos del archivo a ordenar: un entero por línea, o bien
+    (clave, registro) por línea si se indica una especificación de clave.
+    Con agregado, genera pares (elemento, cantidad) (ver convertidor_entrada).
+
+    El archivo se lee en fragmentos grandes (ver texto_enteros); los enteros
+    simples se convierten por lotes.
+    lineas_invalidas: 'fallar' (por defecto), 'omitir', 'contar' o un
+        LineasInvalidas, para las líneas que no se pueden convertir.
+    usar_mmap: Lee la entrada mapeada en memoria.
+    """
+    if clave is None and agregado is None:
+        yield from leer_enteros(archivo, lineas_invalidas, usar_mmap)
+        return
+
+    politica = politica_lineas(lineas_invalidas)
+    convertir = convertidor_entrada(clave, agregado)
+    numero = 0
+    for fragmento in fragmentos_de_lineas(archivo, usar_mmap):
+        lineas = fragmento.split(b'\n')
+        if not lineas[-1]:
+            lineas.pop()
+        for linea in lineas:
+            numero += 1
+            try:
+                elemento = convertir(linea)
+            except (ValueError, IndexError):
+                politica.registrar(numero, linea)
+                continue
+            yield elemento
@@ -0,0 +1,225 @@
+"""
+Detección de Orden Previo (Presortedness)
+Mide la estructura de runs de la entrada antes de ordenarla: una entrada ya
+ordenada se copia, una invertida se copia al revés y una con pocos runs
+naturales se fusiona a partir de esos runs en lugar de bloques fijos.
+"""
+
+import os
+import tempfile
+from itertools import islice
+
+from codificacion_runs import EscritorRun, convertidor_entrada, leer_entrada, linea_de_elemento
+from texto_enteros import (
+    TAMANIO_LECTURA, TAMANIO_LOTE, formatear_enteros, fragmentos_de_lineas,
+    leer_lotes_enteros, politica_lineas,
+)
+
+
+ORDENADO = 'ordenado'
+INVERTIDO = 'invertido'
+CASI_ORDENADO = 'casi_ordenado'
+DESORDENADO = 'desordenado'
+
+# Runs de tolerancia antes de abandonar la medición en entradas desordenadas
+_RUNS_TOLERADOS = 8
+
+
+def medir_orden(archivo, tamanio_bloque, clave=None, agregado=None):
+    """
+    Clasifica la entrada según sus runs ascendentes (no decrecientes) y
+    descendentes (estrictamente decrecientes):
+        ORDENADO: un solo run ascendente.
+        INVERTIDO: un solo run descendente.
+        CASI_ORDENADO: menos runs ascendentes que bloques de tamanio_bloque.
+        DESORDENADO: cualquier otro caso.
+    La lectura se abandona en cuanto los runs superan a los bloques leídos,
+    así que en entradas desordenadas cuesta unas pocas líneas. Las líneas
+    inválidas se ignoran aquí; su política se aplica al leer la entrada.
+    """
+    total = 0
+    ascendentes = 1
+    descendentes = 1
+    anterior = None
+
+    for elemento in leer_entrada(archivo, clave, agregado, lineas_invalidas='omitir'):
+        if total:
+            if elemento < anterior:
+                ascendentes += 1
+            else:
+                descendentes += 1
+            if descendentes > 1 and ascendentes > _RUNS_TOLERADOS + total // tamanio_bloque:
+                return DESORDENADO
+        anterior = elemento
+        total += 1
+
+    if ascendentes == 1:
+        return ORDENADO
+    if descendentes == 1:
+        return INVERTIDO
+    if ascendentes < -(-total // tamanio_bloque):
+        return CASI_ORDENADO
+    return DESORDENADO
+
+
+def fragmentos_invertidos(archivo, tamanio_lectura=TAMANIO_LECTURA):
+    """
+    Genera los fragmentos de un archivo desde el final hacia el principio, como
+    (posicion, fragmento): líneas completas, en su orden original, que empiezan
+    en el byte posicion.
+    """
+    with open(archivo, 'rb') as f:
+        posicion = f.seek(0, os.SEEK_END)
+        resto = b''
+        while posicion > 0:
+            leer = min(tamanio_lectura, posicion)
+            posicion -= leer
+            f.seek(posicion)
+            bloque = f.read(leer) + resto
+
+            # La primera línea del bloque puede empezar en el bloque anterior
+            corte = bloque.find(b'\n') + 1 if posicion else 0
+            if posicion and corte == 0:
+                resto = bloque
+                continue
+            resto = bloque[:corte]
+            if corte < len(bloque):
+                yield posicion + corte, bloque[corte:]
+
+
+def copiar_ordenado(archivo, archivo_salida, orden, clave=None, lineas_invalidas=None):
+    """
+    Escribe la salida de una entrada ORDENADO (copia secuencial) o INVERTIDO
+    (copia leyendo de atrás hacia adelante), con el mismo formato de línea que
+    los ordenamientos: enteros normalizados o registros sin su clave.
+    Ambos sentidos convierten las líneas igual que leer_entrada (incluida la
+    política de líneas inválidas y su número de línea) y escriben por lotes.
+    Si archivo_salida es el mismo archivo que la entrada, la copia se escribe
+    en un temporal junto a él que lo reemplaza al terminar (abrirlo con 'wb'
+    lo truncaría antes de leerlo).
+    """
+    if orden == ORDENADO:
+        if clave is None:
+            lotes = leer_lotes_enteros(archivo, lineas_invalidas)
+        else:
+            lotes = _en_lotes(leer_entrada(archivo, clave, lineas_invalidas=lineas_invalidas))
+    elif orden == INVERTIDO:
+        lotes = _lotes_invertidos(archivo, clave, politica_lineas(lineas_invalidas))
+    else:
+        raise ValueError(f"Solo se copian entradas ordenadas o invertidas, no {orden!r}")
+
+    if not (os.path.exists(archivo_salida) and os.path.samefile(archivo, archivo_salida)):
+        with open(archivo_salida, 'wb') as salida:
+            _escribir_lotes(salida, lotes)
+        return archivo_salida
+
+    directorio = os.path.dirname(os.path.abspath(archivo_salida))
+    with tempfile.NamedTemporaryFile(dir=directorio, prefix='.copia_', delete=False) as salida:
+        temporal = salida.name
+    try:
+        with open(temporal, 'wb') as salida:
+            _escribir_lotes(salida, lotes)
+        os.replace(temporal, archivo_salida)
+    except BaseException:
+        os.remove(temporal)
+        raise
+    return archivo_salida
+
+
+def _en_lotes(elementos, tamanio_lote=TAMANIO_LOTE):
+    """Agrupa una secuencia de elementos en listas de tamanio_lote."""
+    elementos = iter(elementos)
+    while True:
+        lote = list(islice(elementos, tamanio_lote))
+        if not lote:
+            return
+        yield lote
+
+
+def _escribir_lotes(salida, lotes):
+    """Escribe cada lote de elementos con una sola escritura en el archivo binario salida."""
+    for lote in lotes:
+        if lote and isinstance(lote[0], tuple):
+            salida.write(b"".join([linea_de_elemento(elemento) + b"\n" for elemento in lote]))
+        else:
+            salida.write(formatear_enteros(lote))
+
+
+def _lotes_invertidos(archivo, clave, politica):
+    """
+    Lotes de elementos del archivo desde el último, cada uno ya invertido.
+    Las líneas se convierten como en leer_entrada; el número de una línea
+    inválida se calcula contando las líneas del archivo, solo si aparece alguna.
+    """
+    convertir = int if clave is None else convertidor_entrada(clave)
+    total_lineas = None
+    posteriores = 0
+    for posicion, fragmento in fragmentos_invertidos(archivo):
+        lineas = fragmento.split(b'\n')
+        if not lineas[-1]:
+            lineas.pop()
+
+        try:
+            lote = list(map(convertir, lineas))
+        except (ValueError, IndexError):
+            if total_lineas is None:
+                total_lineas = _contar_lineas(archivo)
+            numero = total_lineas - posteriores - len(lineas)
+            lote = []
+            for numero, linea in enumerate(lineas, numero + 1):
+                try:
+                    lote.append(convertir(linea))
+                except (ValueError, IndexError):
+                    politica.registrar(numero, linea)
+
+        posteriores += len(lineas)
+        lote.reverse()
+        yield lote
+
+
+def _contar_lineas(archivo):
+    """Cantidad de líneas del archivo, con o sin salto en la última."""
+    total = 0
+    ultimo = b'\n'
+    for fragmento in fragmentos_de_lineas(archivo):
+        total += fragmento.count(b'\n')
+        ultimo = fragmento[-1:]
+    return total if ultimo == b'\n' else total + 1
+
+
+def runs_naturales(elementos):
+    """Genera los runs ascendentes (listas) de una secuencia de elementos."""
+    run = []
+    for elemento in elementos:
+        if run and elemento < run[-1]:
+            yield run
+            run = []
+        run.append(elemento)
+    if run:
+        yield run
+
+
+def escribir_runs_naturales(archivo, espacio, compresion=None, clave=None, agregado=None,
+                            colapsar=False, lineas_invalidas=None):
+    """
+    Escribe cada run ascendente de la entrada en su propio archivo temporal,
+    sin cargarlo en memoria. Retorna la lista de archivos.
+    """
+    archivos = []
+    run = None
+    anterior = None
+
+    for elemento in leer_entrada(archivo, clave, agregado, lineas_invalidas):
+        if run is None or elemento < anterior:
+            if run is not None:
+                run.close()
+                archivos.append(run.nombre)
+            run = EscritorRun(compresion=compresion, directorio=espacio.siguiente(),
+                              colapsar=colapsar)
+        run.escribir(elemento)
+        anterior = elemento
+
+    if run is not None:
+        run.close()
+        archivos.append(run.nombre)
+    return archivos
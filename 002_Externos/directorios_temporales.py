@@ -0,0 +1,166 @@
+"""
+Directorios Temporales (Espacio de Desbordamiento)
+Reparte los runs temporales de los ordenamientos externos entre varios discos.
+"""
+
+import os
+import shutil
+import tempfile
+
+
+POLITICAS = ('round_robin', 'espacio_libre')
+
+
+class DirectoriosTemporales:
+    """
+    Conjunto de directorios de desbordamiento, idealmente en discos distintos.
+
+    Usar como context manager: al entrar crea un subdirectorio de trabajo en
+    cada directorio y al salir los elimina con todo su contenido, aunque el
+    ordenamiento termine con una excepción.
+
+    Políticas de ubicación:
+        'round_robin': alterna los directorios en orden.
+        'espacio_libre': elige el directorio con más espacio libre.
+    """
+    def __init__(self, directorios=None, politica='round_robin'):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política no soportada: {politica!r} (use una de {POLITICAS})")
+
+        if directorios is None:
+            directorios = [tempfile.gettempdir()]
+        elif isinstance(directorios, (str, os.PathLike)):
+            directorios = [directorios]
+        if not directorios:
+            raise ValueError("Se necesita al menos un directorio temporal")
+
+        self.directorios = [os.fspath(d) for d in directorios]
+        self.politica = politica
+        self.trabajo = []
+        self.siguiente_indice = 0
+
+    def __enter__(self):
+        try:
+            for directorio in self.directorios:
+                self.trabajo.append(tempfile.mkdtemp(prefix='ordenamiento_', dir=directorio))
+        except BaseException:
+            self.limpiar()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.limpiar()
+
+    def limpiar(self):
+        """Elimina los subdirectorios de trabajo y todos los runs que contengan."""
+        for directorio in self.trabajo:
+            shutil.rmtree(directorio, ignore_errors=True)
+        self.trabajo = []
+
+    def siguiente(self, evitar=()):
+        """
+        Retorna el directorio donde ubicar el próximo run.
+        evitar: archivos cuyos dispositivos conviene no usar (p. ej. las
+        entradas de la fusión que producirá el run), si hay alternativa.
+        """
+        if not self.trabajo:
+            raise RuntimeError("DirectoriosTemporales debe usarse dentro de un bloque with")
+
+        dispositivos_evitados = {dispositivo(archivo) for archivo in evitar}
+        candidatos = [d for d in self.trabajo if dispositivo(d) not in dispositivos_evitados]
+        if not candidatos:
+            candidatos = self.trabajo
+
+        if self.politica == 'espacio_libre':
+            return max(candidatos, key=lambda d: shutil.disk_usage(d).free)
+
+        # Round robin: primer candidato a partir de la posición actual
+        n = len(self.trabajo)
+        for paso in range(n):
+            directorio = self.trabajo[(self.siguiente_indice + paso) % n]
+            if directorio in candidatos:
+                self.siguiente_indice = (self.siguiente_indice + paso + 1) % n
+                return directorio
+        return candidatos[0]
+
+    def agrupar(self, archivos, tamanio_grupo):
+        """
+        Divide los archivos en grupos de tamanio_grupo para una fusión k-vías,
+        intercalando dispositivos para que cada grupo lea de discos distintos.
+        """
+        return agrupar_por_dispositivo(archivos, tamanio_grupo)
+
+
+def dispositivo(ruta):
+    """Identificador del dispositivo que contiene la ruta."""
+    return os.stat(ruta).st_dev
+
+
+def agrupar_por_dispositivo(archivos, tamanio_grupo):
+    """
+    Agrupa archivos de a tamanio_grupo, tomando en cada grupo archivos de
+    dispositivos distintos siempre que sea posible.
+    """
+    # Cola de archivos por dispositivo, conservando el orden original
+    por_dispositivo = {}
+    for archivo in archivos:
+        por_dispositivo.setdefault(dispositivo(archivo), []).append(archivo)
+    colas = list(por_dispositivo.values())
+
+    # Intercalar las colas: un archivo de cada dispositivo por vuelta
+    intercalados = []
+    posicion = 0
+    while len(intercalados) < len(archivos):
+        for cola in colas:
+            if posicion < len(cola):
+                intercalados.append(cola[posicion])
+        posicion += 1
+
+    return [intercalados[i:i + tamanio_grupo]
+            for i in range(0, len(intercalados), tamanio_grupo)]
+
+
+def abrir_directorios(directorios_temp, politica='round_robin'):
+    """
+    Retorna el context manager de desbordamiento para un ordenamiento.
+    Si recibe un DirectoriosTemporales ya abierto lo reutiliza sin limpiarlo
+    al salir, para que varios ordenamientos compartan el mismo espacio.
+    """
+    if isinstance(directorios_temp, DirectoriosTemporales):
+        return _Compartido(directorios_temp)
+    return DirectoriosTemporales(directorios_temp, politica)
+
+
+class _Compartido:
+    """Envuelve un DirectoriosTemporales abierto sin tomar su limpieza."""
+    def __init__(self, espacio):
+        self.espacio = espacio
+
+    def __enter__(self):
+        return self.espacio
+
+    def __exit__(self, *exc):
+        pass
+
+
+def ruta_salida(archivo_entrada, sufijo, directorio_salida=None):
+    """
+    Nombre del archivo ordenado: archivo_entrada con sufijo agregado antes de
+    su extensión, que se conserva (datos.csv -> datos_ordenado.csv); la
+    extensión del sufijo solo se usa si la entrada no tiene. Queda en el mismo
+    directorio de la entrada o en directorio_salida si se indica (por ejemplo,
+    otro disco).
+    """
+    archivo_entrada = os.fspath(archivo_entrada)
+    raiz, extension = os.path.splitext(os.path.basename(archivo_entrada))
+    raiz_sufijo, extension_sufijo = os.path.splitext(sufijo)
+    nombre = raiz + raiz_sufijo + (extension or extension_sufijo)
+    if directorio_salida is None:
+        directorio_salida = os.path.dirname(archivo_entrada)
+    return os.path.join(directorio_salida, nombre)
+
+
+def mover_a_salida(archivo_temp, archivo_salida):
+    """Mueve el run final a su destino, aunque esté en otro dispositivo."""
+    shutil.move(archivo_temp, archivo_salida)
+    return archivo_salida
@@ -0,0 +1,528 @@
+"""
+Dispositivos y Modelo de Costo de E/S (Comparación de Estrategias Externas)
+Cuenta las aperturas de archivos, búsquedas (seeks) y bytes leídos y escritos
+de los ordenamientos externos, y traduce esos conteos a segundos con un modelo
+de costo por tipo de almacenamiento (disco rígido, SSD, sistema de archivos en
+red).
+
+Dos dispositivos con la misma interfaz (contadores y tiempo(modelo)):
+    DispositivoArchivos: el sistema de archivos real. Mientras está montado,
+        open() pasa por una capa que cuenta cada lectura y escritura física
+        (del tamaño de los búferes), así que mide los ordenamientos sin cambiarlos.
+    DispositivoSimulado: no guarda datos; acumula la E/S de un plan, la
+        secuencia de lecturas y escrituras que haría cada estrategia (ver simular).
+        Predice el costo de entradas de cualquier tamaño sin ejecutarlas.
+
+Búsquedas: el dispositivo tiene una sola cabeza; cada acceso que no continúa
+donde terminó el anterior (otro archivo u otra posición) cuenta una búsqueda.
+Fusionar k runs cuesta una búsqueda por fragmento leído (TAMANIO_LECTURA) y
+por lote escrito (valores_por_bloque de EscritorRun); leer un archivo de
+principio a fin, una sola.
+"""
+
+import builtins
+import io
+import math
+from collections import deque
+from contextlib import contextmanager
+
+from texto_enteros import TAMANIO_LECTURA
+
+
+TAMANIO_BUFER = io.DEFAULT_BUFFER_SIZE
+
+# Valores por lote de escritura de EscritorRun
+VALORES_POR_ESCRITURA = 4096
+
+
+class ContadoresES:
+    """
+    E/S de un dispositivo.
+        aperturas: archivos abiertos.
+        busquedas: accesos no contiguos al anterior.
+        bytes_leidos, bytes_escritos: bytes transferidos.
+        lecturas, escrituras: operaciones (llamadas al sistema, o búferes).
+    """
+    def __init__(self):
+        self.aperturas = 0
+        self.busquedas = 0
+        self.bytes_leidos = 0
+        self.bytes_escritos = 0
+        self.lecturas = 0
+        self.escrituras = 0
+
+    def a_dict(self):
+        """Contadores como diccionario (para JSON)."""
+        return {
+            'aperturas': self.aperturas,
+            'busquedas': self.busquedas,
+            'bytes_leidos': self.bytes_leidos,
+            'bytes_escritos': self.bytes_escritos,
+            'lecturas': self.lecturas,
+            'escrituras': self.escrituras,
+        }
+
+    def __repr__(self):
+        campos = ", ".join(f"{nombre}={valor}" for nombre, valor in self.a_dict().items())
+        return f"ContadoresES({campos})"
+
+
+class ModeloCosto:
+    """
+    Costo de E/S de un tipo de almacenamiento:
+        latencia_busqueda: segundos por búsqueda (posicionamiento o ida y vuelta).
+        latencia_apertura: segundos por apertura de archivo (metadatos).
+        lectura, escritura: ancho de banda secuencial en bytes por segundo.
+    No incluye la CPU (ordenar bloques, convertir texto).
+    """
+    def __init__(self, nombre, latencia_busqueda, latencia_apertura, lectura, escritura):
+        self.nombre = nombre
+        self.latencia_busqueda = latencia_busqueda
+        self.latencia_apertura = latencia_apertura
+        self.lectura = lectura
+        self.escritura = escritura
+
+    def tiempo(self, contadores):
+        """Segundos estimados para la E/S de contadores."""
+        return (contadores.aperturas * self.latencia_apertura +
+                contadores.busquedas * self.latencia_busqueda +
+                contadores.bytes_leidos / self.lectura +
+                contadores.bytes_escritos / self.escritura)
+
+    def __repr__(self):
+        return f"ModeloCosto({self.nombre!r})"
+
+
+MODELOS_COSTO = {
+    # Disco rígido de 7200 rpm
+    'hdd': ModeloCosto('hdd', latencia_busqueda=8e-3, latencia_apertura=1e-4,
+                       lectura=150e6, escritura=140e6),
+    # SSD SATA
+    'ssd': ModeloCosto('ssd', latencia_busqueda=1e-4, latencia_apertura=2e-5,
+                       lectura=500e6, escritura=450e6),
+    # Sistema de archivos en red (NFS sobre 1 GbE)
+    'red': ModeloCosto('red', latencia_busqueda=5e-4, latencia_apertura=2e-3,
+                       lectura=110e6, escritura=100e6),
+}
+
+
+def modelo_costo(modelo):
+    """Acepta un ModeloCosto o el nombre de uno de MODELOS_COSTO."""
+    if isinstance(modelo, ModeloCosto):
+        return modelo
+    if modelo not in MODELOS_COSTO:
+        raise ValueError(f"Modelo de costo no soportado: {modelo!r} "
+                         f"(use uno de {tuple(MODELOS_COSTO)})")
+    return MODELOS_COSTO[modelo]
+
+
+class Dispositivo:
+    """Base de los dispositivos: contadores y posición de la cabeza."""
+    def __init__(self):
+        self.contadores = ContadoresES()
+        self._cabeza = None
+
+    def tiempo(self, modelo):
+        """Segundos de E/S según modelo (ModeloCosto o 'hdd', 'ssd', 'red')."""
+        return modelo_costo(modelo).tiempo(self.contadores)
+
+    def acceso(self, archivo, posicion, cantidad, escritura):
+        """Registra cantidad bytes leídos o escritos en archivo desde posicion."""
+        if cantidad <= 0:
+            return
+        if self._cabeza != (archivo, posicion):
+            self.contadores.busquedas += 1
+        self._cabeza = (archivo, posicion + cantidad)
+        if escritura:
+            self.contadores.bytes_escritos += cantidad
+            self.contadores.escrituras += 1
+        else:
+            self.contadores.bytes_leidos += cantidad
+            self.contadores.lecturas += 1
+
+
+class _CrudoContado(io.RawIOBase):
+    """Archivo crudo (FileIO) que informa cada lectura y escritura al dispositivo."""
+    def __init__(self, crudo, dispositivo):
+        super().__init__()
+        self._crudo = crudo
+        self._dispositivo = dispositivo
+
+    @property
+    def name(self):
+        return self._crudo.name
+
+    @name.setter
+    def name(self, nombre):
+        # NamedTemporaryFile renombra el archivo crudo con la ruta completa
+        self._crudo.name = nombre
+
+    @property
+    def mode(self):
+        return self._crudo.mode
+
+    def readable(self):
+        return self._crudo.readable()
+
+    def writable(self):
+        return self._crudo.writable()
+
+    def seekable(self):
+        return self._crudo.seekable()
+
+    def fileno(self):
+        return self._crudo.fileno()
+
+    def isatty(self):
+        return self._crudo.isatty()
+
+    def tell(self):
+        return self._crudo.tell()
+
+    def seek(self, posicion, desde=io.SEEK_SET):
+        return self._crudo.seek(posicion, desde)
+
+    def truncate(self, tamanio=None):
+        return self._crudo.truncate(tamanio)
+
+    def readinto(self, destino):
+        posicion = self._crudo.tell()
+        cantidad = self._crudo.readinto(destino)
+        self._dispositivo.acceso(id(self), posicion, cantidad or 0, escritura=False)
+        return cantidad
+
+    def write(self, datos):
+        posicion = self._crudo.tell()
+        cantidad = self._crudo.write(datos)
+        self._dispositivo.acceso(id(self), posicion, cantidad or 0, escritura=True)
+        return cantidad
+
+    def close(self):
+        if not self.closed:
+            self._crudo.close()
+        super().close()
+
+
+class DispositivoArchivos(Dispositivo):
+    """
+    Sistema de archivos real con E/S contada. Uso:
+        dispositivo = DispositivoArchivos()
+        with dispositivo.montar():
+            straight_merging('datos.txt', 1000)
+        dispositivo.contadores, dispositivo.tiempo('hdd')
+    Cuenta lo que pasa por open() (incluidos los archivos de tempfile); no ve
+    los accesos por mmap (fusion_mmap, usar_mmap) ni los de NumPy (fromfile y
+    tofile usan el descriptor directamente).
+    """
+    def __init__(self, tamanio_bufer=TAMANIO_BUFER):
+        super().__init__()
+        self.tamanio_bufer = tamanio_bufer
+
+    def abrir(self, archivo, mode='r', buffering=-1, encoding=None, errors=None,
+              newline=None, closefd=True, opener=None):
+        """Mismo contrato que open(), con los búferes sobre un archivo crudo contado."""
+        crudo = io.FileIO(archivo, mode.replace('b', '').replace('t', ''),
+                          closefd=closefd, opener=opener)
+        self.contadores.aperturas += 1
+        contado = _CrudoContado(crudo, self)
+        if buffering == 0:
+            return contado
+        tamanio = self.tamanio_bufer if buffering in (-1, 1) else buffering
+        if '+' in mode:
+            intermedio = io.BufferedRandom(contado, tamanio)
+        elif 'r' in mode:
+            intermedio = io.BufferedReader(contado, tamanio)
+        else:
+            intermedio = io.BufferedWriter(contado, tamanio)
+        if 'b' in mode:
+            return intermedio
+        texto = io.TextIOWrapper(intermedio, encoding, errors, newline,
+                                 line_buffering=buffering == 1)
+        texto.mode = mode
+        return texto
+
+    @contextmanager
+    def montar(self):
+        """Dirige open() (y io.open, que usa tempfile) a este dispositivo."""
+        originales = builtins.open, io.open
+        builtins.open = io.open = self.abrir
+        try:
+            yield self
+        finally:
+            builtins.open, io.open = originales
+
+
+class DispositivoSimulado(Dispositivo):
+    """
+    Dispositivo sin datos para planes de E/S. Cada operación describe archivos
+    leídos o escritos por completo:
+        secuencial: cada archivo de principio a fin, sin intercalar con otros.
+        intercalado: varios archivos alternados fragmento a fragmento (una fusión).
+    Las lecturas son de tamanio_lectura bytes y las escrituras de tamanio_escritura.
+    """
+    def __init__(self, tamanio_lectura=TAMANIO_LECTURA, tamanio_escritura=TAMANIO_BUFER):
+        super().__init__()
+        self.tamanio_lectura = tamanio_lectura
+        self.tamanio_escritura = tamanio_escritura
+
+    def _contar(self, cantidad, escritura):
+        if cantidad <= 0:
+            return
+        if escritura:
+            operaciones = math.ceil(cantidad / self.tamanio_escritura)
+            self.contadores.bytes_escritos += cantidad
+            self.contadores.escrituras += operaciones
+        else:
+            self.contadores.bytes_leidos += cantidad
+            self.contadores.lecturas += math.ceil(cantidad / self.tamanio_lectura)
+
+    def secuencial(self, leidos=0, escritos=0, archivos=1, veces=1):
+        """archivos leídos o escritos de corrido (veces operaciones iguales)."""
+        self.contadores.aperturas += archivos * veces
+        self.contadores.busquedas += archivos * veces
+        self._contar(int(leidos * veces), False)
+        self._contar(int(escritos * veces), True)
+
+    def intercalado(self, leidos, escritos, archivos, veces=1):
+        """Una fusión de archivos alternados (veces fusiones iguales)."""
+        # Cada lectura mueve la cabeza, y la escritura siguiente la devuelve
+        lecturas = max(math.ceil(leidos / self.tamanio_lectura), archivos - 1)
+        escrituras = max(math.ceil(escritos / self.tamanio_escritura), 1)
+        busquedas = lecturas + min(lecturas, escrituras)
+        self.contadores.aperturas += archivos * veces
+        self.contadores.busquedas += int(busquedas * veces)
+        self._contar(int(leidos * veces), False)
+        self._contar(int(escritos * veces), True)
+
+    def generacion(self, leidos, escritos, runs, escritura_intercalada=False):
+        """
+        Lectura de la entrada por fragmentos de TAMANIO_LECTURA que alterna con
+        la escritura de runs: una búsqueda por fragmento y por run, o por lote
+        escrito si la salida se intercala con la lectura (selección por reemplazo).
+        """
+        fragmentos = math.ceil(leidos / self.tamanio_lectura)
+        busquedas = fragmentos + runs
+        if escritura_intercalada:
+            busquedas += min(fragmentos, math.ceil(escritos / self.tamanio_escritura))
+        self.contadores.aperturas += runs + 1
+        self.contadores.busquedas += int(busquedas)
+        self._contar(int(leidos), False)
+        self._contar(int(escritos), True)
+
+
+# Planes de E/S (uno por estrategia, como están implementadas en 008-012)
+
+def _medir_orden(dispositivo, tamanio):
+    # En una entrada desordenada, medir_orden abandona en el primer fragmento
+    dispositivo.secuencial(leidos=min(tamanio, TAMANIO_LECTURA))
+
+
+def _fusiones(dispositivo, runs, tamanio, vias):
+    """Pasadas que fusionan grupos de vias runs (de igual tamaño) hasta dejar uno."""
+    while runs > 1:
+        tamanio_run = tamanio / runs
+        grupos = math.ceil(runs / vias)
+        sobrante = runs % vias
+        completos = runs // vias
+        # El último grupo de un solo run pasa a la pasada siguiente sin copiarse
+        dispositivo.intercalado(vias * tamanio_run, vias * tamanio_run, vias + 1,
+                                veces=completos)
+        if sobrante > 1:
+            dispositivo.intercalado(sobrante * tamanio_run, sobrante * tamanio_run,
+                                    sobrante + 1)
+        runs = grupos
+
+
+def _plan_straight(dispositivo, elementos, memoria, bytes_por_elemento, opciones):
+    tamanio = elementos * bytes_por_elemento
+    runs = math.ceil(elementos / memoria)
+    if opciones.get('detectar_orden', True):
+        _medir_orden(dispositivo, tamanio)
+    dispositivo.generacion(tamanio, tamanio, runs)
+    _fusiones(dispositivo, runs, tamanio, 2)
+
+
+def _plan_natural(dispositivo, elementos, memoria, bytes_por_elemento, opciones):
+    # Una entrada al azar tiene runs naturales de longitud media 2
+    tamanio = elementos * bytes_por_elemento
+    runs = math.ceil(elementos / opciones.get('longitud_run_natural', 2))
+    dispositivo.generacion(tamanio, tamanio, runs)
+    _fusiones(dispositivo, runs, tamanio, 2)
+
+
+def _plan_multiway(dispositivo, elementos, memoria, bytes_por_elemento, opciones):
+    tamanio = elementos * bytes_por_elemento
+    runs = math.ceil(elementos / memoria)
+    if opciones.get('detectar_orden', True):
+        _medir_orden(dispositivo, tamanio)
+    dispositivo.generacion(tamanio, tamanio, runs)
+    _fusiones(dispositivo, runs, tamanio, opciones.get('num_vias', 4))
+
+
+def _plan_replacement_selection(dispositivo, elementos, memoria, bytes_por_elemento,
+                                opciones):
+    # La selección por reemplazo genera runs de unas 2 veces la memoria
+    tamanio = elementos * bytes_por_elemento
+    runs = math.ceil(elementos / (2 * memoria))
+    dispositivo.generacion(tamanio, tamanio, runs, escritura_intercalada=True)
+    _fusiones(dispositivo, runs, tamanio, 2)
+
+
+def _plan_polyphase(dispositivo, elementos, memoria, bytes_por_elemento, opciones):
+    """
+    Como 011_polyphase_sort: los runs se reparten en num_archivos - 1 archivos;
+    cada iteración cuenta los runs de todos los archivos (dos lecturas
+    completas), fusiona el primer run de cada entrada al final de la salida y
+    reescribe cada entrada sin su primer run.
+    """
+    tamanio = elementos * bytes_por_elemento
+    num_archivos = opciones.get('num_archivos', 3)
+    runs = math.ceil(elementos / memoria)
+    tamanio_run = tamanio / runs
+    if opciones.get('detectar_orden', True):
+        _medir_orden(dispositivo, tamanio)
+
+    # Fase 1: los runs quedan en memoria; Fase 2: cada run se agrega a su archivo
+    dispositivo.secuencial(leidos=tamanio)
+    dispositivo.secuencial(archivos=num_archivos)
+    dispositivo.secuencial(escritos=tamanio_run, veces=runs)
+    # Runs de cada archivo (tamaños) y bytes totales, para no sumarlos en cada iteración
+    archivos = [deque() for _ in range(num_archivos)]
+    totales = [0] * num_archivos
+    for i in range(runs):
+        archivos[i % (num_archivos - 1)].append(tamanio_run)
+        totales[i % (num_archivos - 1)] += tamanio_run
+
+    while True:
+        # todos_runs_fusionados y fase_fusion_polifasica cuentan los runs
+        con_datos = [i for i, archivo in enumerate(archivos) if archivo]
+        for i in con_datos:
+            dispositivo.secuencial(leidos=totales[i])
+        if len(con_datos) == 1 and len(archivos[con_datos[0]]) == 1:
+            break
+        for i in con_datos:
+            dispositivo.secuencial(leidos=totales[i])
+
+        conteos = [len(archivo) for archivo in archivos]
+        salida = conteos.index(min(conteos))
+        entradas = [i for i in range(num_archivos) if i != salida]
+
+        # Primer run de cada entrada (leído entero a memoria) y su fusión al final
+        fusionado = 0
+        for i in entradas:
+            primero = archivos[i][0] if archivos[i] else 0
+            dispositivo.secuencial(leidos=primero)
+            fusionado += primero
+
+        # Cada entrada se reescribe sin su primer run
+        for i in entradas:
+            primero = archivos[i].popleft() if archivos[i] else 0
+            dispositivo.secuencial(leidos=totales[i], escritos=totales[i] - primero,
+                                   archivos=2)
+            totales[i] -= primero
+
+        if fusionado:
+            dispositivo.secuencial(escritos=fusionado)
+            archivos[salida].append(fusionado)
+            totales[salida] += fusionado
+
+    # Decodificación del archivo final a la salida de texto
+    dispositivo.secuencial(leidos=tamanio, escritos=tamanio, archivos=2)
+
+
+PLANES = {
+    'straight': _plan_straight,
+    'natural': _plan_natural,
+    'multiway': _plan_multiway,
+    'polyphase': _plan_polyphase,
+    'replacement-selection': _plan_replacement_selection,
+}
+
+
+def simular(algoritmo, elementos, memoria, bytes_por_elemento=8, **opciones):
+    """
+    E/S que haría algoritmo sobre una entrada desordenada de elementos líneas
+    (de bytes_por_elemento bytes, con el salto) con memoria elementos por bloque
+    (tamanio_bloque, o tamanio_memoria en replacement-selection).
+    Complejidad: O(log runs) para las fusiones por pasadas; O(runs)
+    iteraciones para polyphase.
+    opciones: num_vias (multiway), num_archivos (polyphase), detectar_orden y
+        longitud_run_natural (natural; 2 en una entrada al azar).
+    Retorna el DispositivoSimulado con los contadores.
+    """
+    if algoritmo not in PLANES:
+        raise ValueError(f"Algoritmo no soportado: {algoritmo!r} (use uno de {tuple(PLANES)})")
+    if elementos <= 0 or memoria <= 0:
+        raise ValueError("elementos y memoria deben ser positivos")
+    dispositivo = DispositivoSimulado(
+        tamanio_escritura=VALORES_POR_ESCRITURA * bytes_por_elemento)
+    PLANES[algoritmo](dispositivo, elementos, memoria, bytes_por_elemento, opciones)
+    return dispositivo
+
+
+def predecir(elementos, memoria, modelo='hdd', algoritmos=tuple(PLANES),
+             bytes_por_elemento=8, **opciones):
+    """
+    Tiempo de E/S estimado de cada algoritmo con el modelo de costo.
+    Retorna una lista de (segundos, algoritmo, contadores), de la más barata a
+    la más cara.
+    """
+    modelo = modelo_costo(modelo)
+    resultados = []
+    for algoritmo in algoritmos:
+        dispositivo = simular(algoritmo, elementos, memoria, bytes_por_elemento,
+                              **opciones)
+        resultados.append((dispositivo.tiempo(modelo), algoritmo, dispositivo.contadores))
+    resultados.sort(key=lambda resultado: resultado[0])
+    return resultados
+
+
+if __name__ == "__main__":
+    import os
+    import random
+    import shutil
+    import tempfile
+
+    print("=" * 70)
+    print("DISPOSITIVOS Y MODELO DE COSTO - Comparación de estrategias externas")
+    print("=" * 70)
+
+    directorio = tempfile.mkdtemp(prefix='dispositivos_')
+    archivo_test = os.path.join(directorio, 'datos_dispositivos.txt')
+    elementos = 20000
+    with open(archivo_test, 'w') as f:
+        for _ in range(elementos):
+            f.write(f"{random.randint(1, 10000000)}\n")
+    bytes_por_elemento = os.path.getsize(archivo_test) / elementos
+
+    from registro_algoritmos import obtener
+
+    print(f"\nMedido vs simulado ({elementos} números, bloques de 1000):")
+    print(f"  {'algoritmo':22} {'aperturas':>17} {'búsquedas':>17} {'MB leídos':>15}")
+    for algoritmo in ('straight', 'multiway', 'polyphase', 'replacement-selection'):
+        registrado = obtener(algoritmo)
+        ordenar = registrado.cargar()
+        real = DispositivoArchivos()
+        with real.montar():
+            salida = ordenar(archivo_test, directorio_salida=directorio,
+                             **{registrado.memoria: 1000})
+        os.remove(salida)
+        simulado = simular(algoritmo, elementos, 1000, bytes_por_elemento).contadores
+        medido = real.contadores
+        print(f"  {algoritmo:22} {medido.aperturas:8} /{simulado.aperturas:7} "
+              f"{medido.busquedas:8} /{simulado.busquedas:7} "
+              f"{medido.bytes_leidos / 1e6:6.2f} /{simulado.bytes_leidos / 1e6:6.2f}")
+
+    # Predicción para 50 GB de enteros con 64 MB de memoria
+    elementos_grandes = 50 * 10**9 // 8
+    memoria_grande = (64 << 20) // 64
+    print(f"\nPredicción para 50 GB con bloques de {memoria_grande} elementos:")
+    for nombre in MODELOS_COSTO:
+        print(f"  {nombre}:")
+        for segundos, algoritmo, _ in predecir(elementos_grandes, memoria_grande, nombre):
+            print(f"    {algoritmo:22} {segundos / 3600:10.2f} h")
+
+    print("\nLimpiando archivos...")
+    shutil.rmtree(directorio)
+
+    print("\n[OK] Demostración completada")
@@ -0,0 +1,52 @@
+"""
+Fusión de Dos Runs (Mezcla por Pares)
+Fusión de dos archivos de run ordenados en uno, compartida por las mezclas que
+fusionan de a pares: Straight Merging, Natural Merging y Distribution of
+Initial Runs.
+"""
+
+from codificacion_runs import EscritorRun, leer_run
+from fusion_mmap import fusionar_runs_binarios
+
+
+def fusionar_dos_archivos(archivo1, archivo2, compresion=None, directorio=None,
+                          colapsar=False, indice=None):
+    """
+    Fusiona dos archivos ordenados en uno solo.
+    Complejidad: O(n1 + n2) con una lectura secuencial de cada archivo.
+    compresion: Codificación de los runs (None para texto); los runs 'binario'
+        se fusionan con mmap, por tramos contiguos.
+    directorio: Directorio del archivo fusionado (por defecto, el temporal).
+    colapsar: Si es True, reduce a una las claves iguales de ambos archivos.
+    indice: EscritorIndice opcional que registra las posiciones del archivo fusionado.
+    Retorna la ruta del archivo fusionado.
+    """
+    if compresion == 'binario' and not colapsar:
+        return fusionar_runs_binarios([archivo1, archivo2], directorio)
+
+    with EscritorRun(compresion=compresion, directorio=directorio,
+                     colapsar=colapsar, indice=indice) as salida:
+        valores1 = leer_run(archivo1, compresion)
+        valores2 = leer_run(archivo2, compresion)
+        num1 = next(valores1, None)
+        num2 = next(valores2, None)
+
+        # Comparar y escribir el menor elemento
+        while num1 is not None and num2 is not None:
+            if num1 <= num2:
+                salida.escribir(num1)
+                num1 = next(valores1, None)
+            else:
+                salida.escribir(num2)
+                num2 = next(valores2, None)
+
+        # Escribir elementos restantes
+        while num1 is not None:
+            salida.escribir(num1)
+            num1 = next(valores1, None)
+
+        while num2 is not None:
+            salida.escribir(num2)
+            num2 = next(valores2, None)
+
+    return salida.nombre
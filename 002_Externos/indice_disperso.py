@@ -0,0 +1,184 @@
+"""
+Índice Disperso (Punteros de Cerca)
+Índice lateral sobre un archivo ordenado de enteros: cada N-ésima clave con su
+posición en bytes, más mínimo, máximo y cantidad. Permite responder búsquedas
+puntuales y por rango leyendo un solo bloque del archivo.
+"""
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+
+
+EXTENSION_INDICE = '.idx'
+
+
+def ruta_indice(archivo):
+    """Ruta del índice lateral de un archivo ordenado."""
+    return archivo + EXTENSION_INDICE
+
+
+class EscritorIndice:
+    """
+    Acumula el índice mientras se escribe el archivo ordenado.
+    Se registra cada valor con la posición en bytes de su línea.
+    """
+    def __init__(self, intervalo=1024):
+        if intervalo <= 0:
+            raise ValueError("El intervalo del índice debe ser positivo")
+        self.intervalo = intervalo
+        self.cantidad = 0
+        self.minimo = None
+        self.maximo = None
+        self.claves = []
+        self.posiciones = []
+
+    def registrar(self, valor, posicion):
+        """Registra el valor escrito en la posición dada (en bytes)."""
+        if self.cantidad % self.intervalo == 0:
+            self.claves.append(valor)
+            self.posiciones.append(posicion)
+        if self.minimo is None:
+            self.minimo = valor
+        self.maximo = valor
+        self.cantidad += 1
+
+    def guardar(self, archivo):
+        """Escribe el índice junto al archivo ordenado y retorna su ruta."""
+        destino = ruta_indice(archivo)
+        datos = {
+            'intervalo': self.intervalo,
+            'cantidad': self.cantidad,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'tamanio': os.path.getsize(archivo),
+            'claves': self.claves,
+            'posiciones': self.posiciones,
+        }
+        temporal = destino + '.tmp'
+        with open(temporal, 'w') as f:
+            json.dump(datos, f)
+        os.replace(temporal, destino)
+        return destino
+
+
+def construir_indice(archivo, intervalo=1024):
+    """Construye el índice de un archivo ordenado ya existente (una lectura)."""
+    indice = EscritorIndice(intervalo)
+    posicion = 0
+    with open(archivo, 'rb') as f:
+        for linea in f:
+            indice.registrar(int(linea), posicion)
+            posicion += len(linea)
+    return indice.guardar(archivo)
+
+
+class SortedFileReader:
+    """
+    Lector de un archivo ordenado de enteros usando su índice disperso.
+    Cada consulta hace una búsqueda binaria en el índice (en memoria) y lee
+    solo el bloque (o los bloques, en rangos) que necesita.
+
+    Los rangos son semiabiertos: [lo, hi).
+    """
+    def __init__(self, archivo, intervalo=1024):
+        self.archivo = archivo
+        destino = ruta_indice(archivo)
+        if not os.path.exists(destino) or self._indice_desactualizado(destino):
+            construir_indice(archivo, intervalo)
+
+        with open(destino, 'r') as f:
+            datos = json.load(f)
+        self.intervalo = datos['intervalo']
+        self.cantidad = datos['cantidad']
+        self.minimo = datos['minimo']
+        self.maximo = datos['maximo']
+        self.claves = datos['claves']
+        self.posiciones = datos['posiciones']
+        self.tamanio = datos['tamanio']
+        self.f = open(archivo, 'rb')
+
+    def _indice_desactualizado(self, destino):
+        return os.path.getmtime(destino) < os.path.getmtime(self.archivo)
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.cantidad
+
+    def _leer_bloque(self, numero):
+        """Valores del bloque numero (entre dos punteros consecutivos del índice)."""
+        inicio = self.posiciones[numero]
+        if numero + 1 < len(self.posiciones):
+            fin = self.posiciones[numero + 1]
+        else:
+            fin = self.tamanio
+        self.f.seek(inicio)
+        return [int(valor) for valor in self.f.read(fin - inicio).split()]
+
+    def _posicion(self, valor, derecha=False):
+        """Cantidad de elementos < valor (o <= valor si derecha=True)."""
+        if self.cantidad == 0:
+            return 0
+        buscar = bisect_right if derecha else bisect_left
+
+        # El primer elemento buscado está en el bloque anterior al primer
+        # puntero que no lo precede, o al inicio de ese puntero
+        numero = buscar(self.claves, valor)
+        if numero == 0:
+            return 0
+        numero -= 1
+        bloque = self._leer_bloque(numero)
+        return numero * self.intervalo + buscar(bloque, valor)
+
+    def lower_bound(self, valor):
+        """Posición (desde 0) del primer elemento >= valor; len() si no hay."""
+        return self._posicion(valor)
+
+    def upper_bound(self, valor):
+        """Posición (desde 0) del primer elemento > valor; len() si no hay."""
+        return self._posicion(valor, derecha=True)
+
+    def __getitem__(self, posicion):
+        """Elemento en la posición dada del archivo ordenado."""
+        if posicion < 0:
+            posicion += self.cantidad
+        if not 0 <= posicion < self.cantidad:
+            raise IndexError("Posición fuera de rango")
+        numero, desplazamiento = divmod(posicion, self.intervalo)
+        return self._leer_bloque(numero)[desplazamiento]
+
+    def contains(self, valor):
+        """Indica si el valor está en el archivo."""
+        if self.cantidad == 0 or not self.minimo <= valor <= self.maximo:
+            return False
+        posicion = self.lower_bound(valor)
+        return posicion < self.cantidad and self[posicion] == valor
+
+    def __contains__(self, valor):
+        return self.contains(valor)
+
+    def count(self, lo, hi):
+        """Cantidad de elementos en [lo, hi)."""
+        if hi <= lo:
+            return 0
+        return self.lower_bound(hi) - self.lower_bound(lo)
+
+    def range(self, lo, hi):
+        """Genera en orden los elementos en [lo, hi), leyendo bloque a bloque."""
+        posicion = self.lower_bound(lo)
+        numero, desplazamiento = divmod(posicion, self.intervalo)
+        while numero < len(self.posiciones):
+            for valor in self._leer_bloque(numero)[desplazamiento:]:
+                if valor >= hi:
+                    return
+                yield valor
+            numero += 1
+            desplazamiento = 0
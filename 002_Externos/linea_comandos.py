@@ -0,0 +1,282 @@
+"""
+Línea de Comandos (Ordenamiento en Tuberías)
+Punto de entrada para ordenar desde la terminal, al estilo de GNU sort:
+
+    python 002_Externos [ARCHIVO|-] [-o SALIDA] [-a ALGORITMO] [-S MEMORIA]
+                        [-T DIR]... [--parallel N] [-k CLAVE] [-u] [-c]
+                        [--telemetry ARCHIVO] [--verify]
+
+Lee de un archivo o de la entrada estándar y escribe en un archivo o en la
+salida estándar. La entrada estándar se lee una sola vez, sin copiarla antes a
+un archivo temporal; multiway y polyphase entregan la fusión final directo a la
+salida, sin escribir el archivo ordenado completo. Con --verify, la salida se
+compara con la entrada (orden y elementos, ver verificacion) antes de publicarla.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from contextlib import closing, redirect_stdout
+
+import codificacion_runs
+from codificacion_runs import (
+    clave_agrupamiento, escribir_valores, leer_entrada, valores_de_salida
+)
+from claves_registros import normalizar_clave
+from memoria import elementos_en_memoria, memoria_en_bytes
+from directorios_temporales import abrir_directorios
+from registro_algoritmos import algoritmos, cargar, importar_modulo, obtener
+from texto_enteros import TAMANIO_LECTURA
+
+
+ALGORITMOS = ('auto',) + algoritmos(externo=True)
+
+MEMORIA_PREDETERMINADA = '64M'
+
+ENTRADA_ESTANDAR = '-'
+
+
+def estimar_lineas(archivo, tamanio_muestra=TAMANIO_LECTURA):
+    """Estima las líneas de un archivo por las de su primer fragmento y su tamaño."""
+    tamanio = os.path.getsize(archivo)
+    with open(archivo, 'rb') as f:
+        muestra = f.read(tamanio_muestra)
+    if len(muestra) == tamanio:
+        return muestra.count(b'\n') + (not muestra.endswith(b'\n') and tamanio > 0)
+    return tamanio * max(1, muestra.count(b'\n')) // len(muestra)
+
+
+def elegir_algoritmo(archivo, memoria):
+    """
+    Algoritmo para 'auto': 'memoria' si la entrada es un archivo cuyas líneas
+    estimadas caben en el presupuesto (ver elementos_en_memoria), y si no
+    'multiway' (detecta entradas ya ordenadas y entrega la fusión final en
+    streaming con iter_sorted, que no usa el backend NumPy).
+    """
+    if (archivo != ENTRADA_ESTANDAR
+            and estimar_lineas(archivo) <= elementos_en_memoria(memoria)):
+        return 'memoria'
+    return 'multiway'
+
+
+def verificar_orden(archivo, clave=None, unico=False, lineas_invalidas=None):
+    """
+    Comprueba que la entrada esté ordenada (con unico=True, sin dos claves
+    iguales seguidas). Retorna None si lo está, o (numero_de_linea, linea) del
+    primer desorden.
+    """
+    clave = normalizar_clave(clave)
+    with closing(leer_entrada(archivo, clave, lineas_invalidas=lineas_invalidas)) as entrada:
+        anterior = None
+        for numero, elemento in enumerate(entrada, 1):
+            if anterior is not None and (elemento < anterior or unico and
+                                         clave_agrupamiento(elemento) ==
+                                         clave_agrupamiento(anterior)):
+                return numero, codificacion_runs.linea_de_elemento(elemento)
+            anterior = elemento
+    return None
+
+
+def ordenar_en_memoria(archivo, clave=None, unico=False, paralelo=1, lineas_invalidas=None):
+    """
+    Ordena una entrada que cabe en memoria. Los enteros sin clave se ordenan
+    con radix_sort_paralelo si se piden varios procesos; el resto con sort().
+    Genera los valores de salida.
+    """
+    with closing(leer_entrada(archivo, clave, lineas_invalidas=lineas_invalidas)) as entrada:
+        elementos = list(entrada)
+
+    if clave is None and paralelo > 1:
+        elementos = importar_modulo('007_radix_sort', '001_Internos').radix_sort_paralelo(
+            elementos, num_procesos=paralelo
+        )
+    else:
+        elementos.sort()
+
+    if unico:
+        elementos = codificacion_runs.colapsar(elementos)
+    return valores_de_salida(elementos)
+
+
+def ordenar_a_archivo(algoritmo, archivo, directorio_salida, opciones):
+    """Ejecuta un ordenamiento que escribe su salida; retorna la ruta escrita."""
+    funcion = cargar(algoritmo)
+    tamanio = opciones.pop('tamanio_bloque')
+    if algoritmo == 'straight':
+        return funcion(archivo, tamanio, directorio_salida=directorio_salida, **opciones)
+    opciones.pop('detectar_orden')
+    if algoritmo == 'natural':
+        return funcion(archivo, directorio_salida=directorio_salida, **opciones)
+    return funcion(archivo, tamanio, directorio_salida=directorio_salida, **opciones)
+
+
+def ordenar(archivo, salida, algoritmo='auto', memoria=None, directorios_temp=None,
+            paralelo=1, clave=None, unico=False, lineas_invalidas=None, telemetria=None):
+    """
+    Ordena archivo (o ENTRADA_ESTANDAR) y escribe el resultado en salida, un
+    archivo binario abierto (por ejemplo sys.stdout.buffer).
+    memoria: Presupuesto en bytes para los bloques en memoria.
+    directorios_temp: Directorios de los runs temporales.
+    paralelo: Procesos para el ordenamiento en memoria de enteros.
+    telemetria: Sumidero de los eventos de los ordenamientos externos (ver telemetria).
+    """
+    if algoritmo not in ALGORITMOS:
+        raise ValueError(f"Algoritmo no soportado: {algoritmo!r} (use uno de {ALGORITMOS})")
+    if memoria is None:
+        memoria = memoria_en_bytes(MEMORIA_PREDETERMINADA)
+    clave = normalizar_clave(clave)
+    estandar = archivo == ENTRADA_ESTANDAR
+    ruta = '/dev/stdin' if estandar else archivo
+
+    if algoritmo == 'auto':
+        algoritmo = elegir_algoritmo(archivo, memoria)
+
+    if algoritmo == 'memoria':
+        escribir_valores(salida, ordenar_en_memoria(ruta, clave, unico, paralelo,
+                                                    lineas_invalidas))
+        return
+
+    # La entrada estándar no se puede releer: sin lectura previa de detección
+    opciones = dict(tamanio_bloque=elementos_en_memoria(memoria),
+                    directorios_temp=directorios_temp, clave=clave, unico=unico,
+                    detectar_orden=not estandar, lineas_invalidas=lineas_invalidas,
+                    telemetria=telemetria)
+
+    if algoritmo in ('multiway', 'polyphase'):
+        # Fusión final en streaming hacia la salida
+        iter_sorted = obtener(algoritmo).cargar_modulo().iter_sorted
+        with closing(iter_sorted(ruta, **opciones)) as valores:
+            escribir_valores(salida, valores)
+        return
+
+    # Los demás escriben un archivo: se genera en un directorio temporal y se copia
+    with abrir_directorios(directorios_temp) as espacio:
+        opciones['directorios_temp'] = espacio
+        directorio = tempfile.mkdtemp(prefix='ordenamiento_salida_', dir=espacio.siguiente())
+        try:
+            resultado = ordenar_a_archivo(algoritmo, ruta, directorio, opciones)
+            if resultado is None:
+                raise RuntimeError(f"{algoritmo} no produjo un archivo de salida")
+            with open(resultado, 'rb') as f:
+                shutil.copyfileobj(f, salida, 1 << 20)
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog='python 002_Externos',
+        description="Ordena un entero (o un registro) por línea, desde un archivo "
+                    "o la entrada estándar."
+    )
+    parser.add_argument('archivo', nargs='?', default=ENTRADA_ESTANDAR,
+                        help="Archivo de entrada ('-' o nada: entrada estándar)")
+    parser.add_argument('-o', '--output', dest='salida',
+                        help="Archivo de salida (por defecto, la salida estándar)")
+    parser.add_argument('-a', '--algorithm', dest='algoritmo', default='auto',
+                        choices=ALGORITMOS, help="Algoritmo (por defecto: auto)")
+    parser.add_argument('-S', '--buffer-size', dest='memoria',
+                        default=MEMORIA_PREDETERMINADA,
+                        help="Presupuesto de memoria, por ejemplo 512K, 64M o 2G")
+    parser.add_argument('-T', '--temporary-directory', dest='directorios_temp',
+                        action='append', metavar='DIR',
+                        help="Directorio para runs temporales (repetible: un disco por opción)")
+    parser.add_argument('--parallel', dest='paralelo', type=int, default=1, metavar='N',
+                        help="Procesos para ordenar en memoria (enteros sin clave)")
+    parser.add_argument('-k', '--key', dest='clave',
+                        help='Clave de registros, por ejemplo "2:int:desc,0"')
+    parser.add_argument('-u', '--unique', dest='unico', action='store_true',
+                        help="Una sola línea por clave distinta")
+    parser.add_argument('-c', '--check', dest='verificar', action='store_true',
+                        help="Solo comprueba que la entrada esté ordenada")
+    parser.add_argument('--invalid-lines', dest='lineas_invalidas', default='fallar',
+                        choices=('fallar', 'omitir'),
+                        help="Qué hacer con las líneas que no se pueden convertir")
+    parser.add_argument('--telemetry', dest='telemetria', metavar='ARCHIVO',
+                        help="Agrega los eventos de runs y pasadas como líneas JSON a ARCHIVO")
+    parser.add_argument('--verify', dest='comprobar_salida', action='store_true',
+                        help="Verifica que la salida sea la entrada ordenada antes de "
+                             "publicarla (requiere -o y un archivo de entrada)")
+    return parser
+
+
+def _umask():
+    """Máscara de permisos del proceso (solo se puede leer cambiándola)."""
+    mascara = os.umask(0)
+    os.umask(mascara)
+    return mascara
+
+
+def main(argumentos=None):
+    """Punto de entrada; retorna el código de salida."""
+    parser = crear_parser()
+    args = parser.parse_args(argumentos)
+    try:
+        memoria = memoria_en_bytes(args.memoria)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.paralelo < 1:
+        parser.error("--parallel debe ser al menos 1")
+    if args.comprobar_salida and (args.salida is None or args.archivo == ENTRADA_ESTANDAR):
+        parser.error("--verify necesita -o y un archivo de entrada (la entrada se relee)")
+
+    salida_estandar = sys.stdout.buffer
+    ruta = '/dev/stdin' if args.archivo == ENTRADA_ESTANDAR else args.archivo
+
+    # Los mensajes de progreso de los algoritmos no deben mezclarse con la salida
+    with redirect_stdout(sys.stderr):
+        try:
+            clave = normalizar_clave(args.clave)
+            if args.verificar:
+                desorden = verificar_orden(ruta, clave, args.unico, args.lineas_invalidas)
+                if desorden is not None:
+                    numero, linea = desorden
+                    print(f"{args.archivo}:{numero}: desorden: {linea.decode(errors='replace')}",
+                          file=sys.stderr)
+                    return 1
+                return 0
+
+            if args.salida is None:
+                ordenar(args.archivo, salida_estandar, args.algoritmo, memoria,
+                        args.directorios_temp, args.paralelo, clave, args.unico,
+                        args.lineas_invalidas, args.telemetria)
+                salida_estandar.flush()
+                return 0
+
+            # Publicación atómica: se escribe al lado del destino y se renombra
+            directorio = os.path.dirname(os.path.abspath(args.salida))
+            with tempfile.NamedTemporaryFile(mode='wb', dir=directorio, delete=False,
+                                             prefix='.ordenamiento_') as f:
+                temporal = f.name
+                try:
+                    ordenar(args.archivo, f, args.algoritmo, memoria, args.directorios_temp,
+                            args.paralelo, clave, args.unico, args.lineas_invalidas,
+                            args.telemetria)
+                except BaseException:
+                    f.close()
+                    os.remove(temporal)
+                    raise
+            if args.comprobar_salida:
+                from verificacion import verificar
+                verificacion = verificar(ruta, temporal, clave, args.unico,
+                                         lineas_invalidas=args.lineas_invalidas)
+                if not verificacion.correcto:
+                    os.remove(temporal)
+                    print(f"error: la salida no es la entrada ordenada: {verificacion}",
+                          file=sys.stderr)
+                    return 2
+            # NamedTemporaryFile crea el archivo con modo 0600: se publica con
+            # los permisos de un archivo nuevo, como lo haría open()
+            os.chmod(temporal, 0o666 & ~_umask())
+            os.replace(temporal, args.salida)
+            return 0
+        except BrokenPipeError:
+            # El consumidor cerró la tubería (por ejemplo, "| head"): se descarta
+            # el resto de la salida para que el cierre del intérprete no falle
+            os.dup2(os.open(os.devnull, os.O_WRONLY), salida_estandar.fileno())
+            return 0
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
@@ -0,0 +1,29 @@
+"""
+Memoria (Presupuesto en Bytes y en Elementos)
+Convierte presupuestos de memoria como "512K", "64M" o "2G" en bytes y los
+bytes en elementos que caben en una lista de Python, para dimensionar los
+bloques de los ordenamientos externos.
+"""
+
+
+# Estimación de memoria por elemento en una lista de Python (objeto + referencia)
+BYTES_POR_ELEMENTO = 64
+
+_SUFIJOS = {'': 1, 'B': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def memoria_en_bytes(texto):
+    """Convierte "512K", "64M", "2G" o un número de bytes en bytes."""
+    texto = texto.strip().upper()
+    sufijo = texto[-1:] if texto[-1:].isalpha() else ''
+    if sufijo not in _SUFIJOS:
+        raise ValueError(f"Sufijo de memoria no soportado: {texto!r}")
+    numero = float(texto[:len(texto) - len(sufijo)])
+    if numero <= 0:
+        raise ValueError(f"La memoria debe ser positiva: {texto!r}")
+    return int(numero * _SUFIJOS[sufijo])
+
+
+def elementos_en_memoria(memoria):
+    """Elementos que caben en memoria bytes (tamaño de bloque de los externos)."""
+    return max(2, memoria // BYTES_POR_ELEMENTO)
@@ -0,0 +1,261 @@
+"""
+Ordenamiento Asíncrono (Muchos Ordenamientos Externos Concurrentes)
+API asyncio para lanzar ordenamientos externos desde un bucle de eventos sin
+bloquearlo. Cada ordenamiento corre completo en un proceso de un
+ProcessPoolExecutor: sus fases alternan CPU (ordenar bloques, fusionar) y
+E/S (leer la entrada, escribir runs) bloque a bloque, así que no se separan.
+Las esperas bloqueantes del lado del bucle (eventos de progreso, borrado de
+salidas de trabajos cancelados) van a un pool de hilos.
+
+Uso:
+    async with OrdenadorAsincrono(max_concurrentes=4) as ordenador:
+        salida = await ordenador.ordenar('multiway', 'datos.txt', progreso=print)
+
+Un semáforo limita los ordenamientos en curso. Cancelar la tarea que espera
+un ordenamiento lo detiene en su siguiente evento de telemetría (fin de la
+generación de runs o de una pasada): los runs temporales se eliminan al salir
+de sus directorios y, si la salida ya se había escrito, también se elimina.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from indice_disperso import ruta_indice
+from registro_algoritmos import algoritmos, cargar
+
+
+# Ordenamientos externos del registro (nombres de linea_comandos)
+ALGORITMOS = algoritmos(externo=True)
+
+# Espera máxima de cada lectura de la cola de eventos (s)
+_ESPERA_EVENTOS = 0.1
+
+
+class OrdenamientoCancelado(Exception):
+    """Se lanza dentro del proceso de un ordenamiento cuando se cancela su tarea."""
+
+
+def _ejecutar(algoritmo, args, kwargs, cola, cancelado):
+    """
+    Cuerpo del proceso: ejecuta el ordenamiento con un sumidero de telemetría
+    que reenvía cada evento a la cola y lanza OrdenamientoCancelado si se pidió
+    cancelar. Si la cancelación llega en el evento 'fin', la salida ya está
+    escrita y se elimina. Al terminar (o fallar) envía None por la cola.
+    """
+    ordenar = cargar(algoritmo)
+    salidas = []
+
+    def sumidero(evento):
+        if evento['evento'] == 'fin' and evento.get('archivo_salida'):
+            salidas.append(evento['archivo_salida'])
+        if cancelado.is_set():
+            raise OrdenamientoCancelado(algoritmo)
+        if cola is not None:
+            cola.put(evento)
+
+    try:
+        return ordenar(*args, telemetria=sumidero, **kwargs)
+    except OrdenamientoCancelado:
+        for salida in salidas:
+            _eliminar(salida)
+        raise
+    finally:
+        if cola is not None:
+            cola.put(None)
+
+
+class OrdenadorAsincrono:
+    """
+    Ejecuta ordenamientos externos concurrentes desde asyncio.
+        max_concurrentes: Ordenamientos en curso a la vez (por defecto, los CPUs).
+        procesos: Procesos del pool (por defecto, max_concurrentes).
+        hilos: Hilos para las esperas bloqueantes del bucle.
+    Se usa con "async with" (o llamando a cerrar()) para liberar los pools.
+    """
+    def __init__(self, max_concurrentes=None, procesos=None, hilos=4):
+        self.max_concurrentes = max_concurrentes or os.cpu_count() or 1
+        self._procesos = ProcessPoolExecutor(procesos or self.max_concurrentes)
+        self._hilos = ThreadPoolExecutor(hilos, thread_name_prefix='ordenamiento_async')
+        # Las colas y eventos de un Manager se pueden enviar a los procesos del pool
+        self._manager = multiprocessing.Manager()
+        self._semaforo = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.cerrar()
+
+    async def cerrar(self):
+        """Espera a los procesos en curso y libera los pools."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._procesos.shutdown)
+        self._hilos.shutdown()
+        self._manager.shutdown()
+
+    def _obtener_semaforo(self):
+        # Se crea dentro del bucle que lo usa
+        if self._semaforo is None:
+            self._semaforo = asyncio.Semaphore(self.max_concurrentes)
+        return self._semaforo
+
+    async def ordenar(self, algoritmo, archivo_entrada, *args, progreso=None, **kwargs):
+        """
+        Ordena archivo_entrada con algoritmo ('straight', 'natural', 'multiway',
+        'polyphase' o 'replacement-selection') y retorna la ruta de la salida.
+        args y kwargs son los del ordenamiento (sin telemetria).
+        progreso: Función que recibe, en el bucle de eventos, cada evento de
+            telemetría del ordenamiento (ver telemetria).
+        Si se cancela, lanza CancelledError después de limpiar runs y salida.
+        """
+        if algoritmo not in ALGORITMOS:
+            raise ValueError(f"Algoritmo no soportado: {algoritmo!r} "
+                             f"(use uno de {ALGORITMOS})")
+        if 'telemetria' in kwargs:
+            raise ValueError("La telemetría se entrega con progreso=")
+
+        loop = asyncio.get_running_loop()
+        async with self._obtener_semaforo():
+            cancelado = self._manager.Event()
+            cola = self._manager.Queue() if progreso is not None else None
+            futuro = self._procesos.submit(_ejecutar, algoritmo,
+                                           (archivo_entrada,) + args, kwargs, cola, cancelado)
+            envuelto = asyncio.wrap_future(futuro, loop=loop)
+
+            reenvio = None
+            if cola is not None:
+                reenvio = asyncio.ensure_future(self._reenviar(cola, futuro, progreso))
+            try:
+                return await asyncio.shield(envuelto)
+            except asyncio.CancelledError:
+                await self._cancelar(futuro, envuelto, cancelado)
+                raise
+            finally:
+                if reenvio is not None:
+                    await reenvio
+
+    async def _reenviar(self, cola, futuro, progreso):
+        """Entrega los eventos de la cola a progreso hasta el None final."""
+        loop = asyncio.get_running_loop()
+        leer = partial(cola.get, timeout=_ESPERA_EVENTOS)
+        while True:
+            try:
+                evento = await loop.run_in_executor(self._hilos, leer)
+            except queue.Empty:
+                # Un trabajo cancelado antes de empezar nunca envía None
+                if futuro.done():
+                    return
+                continue
+            if evento is None:
+                return
+            progreso(evento)
+
+    async def _cancelar(self, futuro, envuelto, cancelado):
+        """Detiene el proceso y elimina la salida si el ordenamiento llegó a terminar."""
+        cancelado.set()
+        if futuro.cancel():
+            return
+        try:
+            salida = await envuelto
+        except (Exception, asyncio.CancelledError):
+            # Detenido por OrdenamientoCancelado (que ya eliminó la salida
+            # escrita, si la había) o fallido
+            return
+        if salida is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._hilos, _eliminar, salida)
+
+
+def _eliminar(ruta):
+    """Elimina una salida y su índice disperso (straight_merging con indice), si existen."""
+    for archivo in (ruta, ruta_indice(ruta)):
+        if os.path.exists(archivo):
+            os.remove(archivo)
+
+
+async def straight_merging_async(archivo_entrada, *args, ordenador=None, progreso=None,
+                                 **kwargs):
+    """
+    Straight Merging sin bloquear el bucle de eventos.
+    Mismos parámetros que straight_merging; ordenador es el OrdenadorAsincrono
+    compartido (si falta, se crea uno solo para esta llamada).
+    """
+    return await _ordenar_con('straight', archivo_entrada, args, kwargs, ordenador, progreso)
+
+
+async def balanced_multiway_merging_async(archivo_entrada, *args, ordenador=None,
+                                          progreso=None, **kwargs):
+    """
+    Balanced Multiway Merging sin bloquear el bucle de eventos.
+    Mismos parámetros que balanced_multiway_merging; ordenador como en
+    straight_merging_async.
+    """
+    return await _ordenar_con('multiway', archivo_entrada, args, kwargs, ordenador, progreso)
+
+
+async def _ordenar_con(algoritmo, archivo_entrada, args, kwargs, ordenador, progreso):
+    if ordenador is not None:
+        return await ordenador.ordenar(algoritmo, archivo_entrada, *args,
+                                       progreso=progreso, **kwargs)
+    async with OrdenadorAsincrono(max_concurrentes=1) as propio:
+        return await propio.ordenar(algoritmo, archivo_entrada, *args,
+                                    progreso=progreso, **kwargs)
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    print("=" * 70)
+    print("ORDENAMIENTO ASÍNCRONO - Varios ordenamientos externos concurrentes")
+    print("=" * 70)
+
+    directorio = tempfile.mkdtemp(prefix='ordenamiento_async_')
+    archivos = []
+    for i in range(4):
+        archivo = os.path.join(directorio, f'datos_async_{i}.txt')
+        with open(archivo, 'w') as f:
+            for _ in range(20000):
+                f.write(f"{random.randint(1, 100000)}\n")
+        archivos.append(archivo)
+    print(f"\nCreados {len(archivos)} archivos de 20000 números en {directorio}")
+
+    def mostrar(nombre):
+        def progreso(evento):
+            if evento['evento'] == 'pasada':
+                print(f"  {nombre}: pasada {evento['numero']} "
+                      f"({evento['runs_entrada']} -> {evento['runs_salida']} runs)")
+        return progreso
+
+    async def demostracion():
+        async with OrdenadorAsincrono(max_concurrentes=2) as ordenador:
+            tareas = [
+                asyncio.ensure_future(ordenador.ordenar(
+                    'multiway' if i % 2 else 'straight', archivo, tamanio_bloque=1000,
+                    directorio_salida=directorio,
+                    progreso=mostrar(os.path.basename(archivo))))
+                for i, archivo in enumerate(archivos)
+            ]
+
+            # La última tarea se cancela mientras espera su turno o se ejecuta
+            await asyncio.sleep(0.05)
+            tareas[-1].cancel()
+
+            for tarea in tareas:
+                try:
+                    print(f"  Salida: {os.path.basename(await tarea)}")
+                except asyncio.CancelledError:
+                    print("  Tarea cancelada (runs y salida eliminados)")
+
+    asyncio.run(demostracion())
+
+    print("\nLimpiando archivos...")
+    for nombre in os.listdir(directorio):
+        os.remove(os.path.join(directorio, nombre))
+    os.rmdir(directorio)
+
+    print("\n[OK] Demostración completada")
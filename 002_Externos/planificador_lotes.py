@@ -0,0 +1,351 @@
+"""
+Planificador de Lotes (Presupuesto Global de Memoria y Archivos)
+Ejecuta una cola de ordenamientos externos repartiendo entre ellos un
+presupuesto global de memoria, de archivos abiertos y de procesos, en lugar de
+que cada uno suponga que tiene tamanio_bloque (o tamanio_memoria) para sí solo.
+
+Uso:
+    planificador = PlanificadorLotes('256M', max_archivos=64, trabajadores=4)
+    for archivo in archivos:
+        planificador.agregar(archivo, 'polyphase', directorio_salida='ordenados')
+    for trabajo in planificador.ejecutar():
+        print(trabajo.archivo, trabajo.salida or trabajo.error)
+
+Reglas:
+    - Un trabajo pequeño (su entrada cabe en la cuota de un proceso) reserva
+      solo lo que ocupa su entrada: un único run, sin fusiones.
+    - Un trabajo grande reserva al menos la cuota de un proceso y, si hay más
+      memoria libre, toda la que no necesiten los trabajos pequeños que esperan.
+    - Los trabajos se admiten en orden, pero uno que no cabe no bloquea a los
+      siguientes que sí caben (los pequeños se acomodan junto a los grandes).
+    - Polyphase Sort guarda todos sus runs en memoria hasta distribuirlos: reserva
+      toda su entrada, y agregar() rechaza los que no caben en el presupuesto.
+    - Un trabajo que no cabría ni con todo el presupuesto libre falla (error)
+      en lugar de esperar para siempre.
+    - Al pasar de la generación de runs a la fusión (evento de telemetría 'runs',
+      o 'distribucion' en Polyphase Sort) la reserva de memoria de un trabajo se
+      reduce a los búferes de sus archivos, y esa memoria pasa a los que esperan.
+    - Las vías de fusión (num_vias, num_archivos) salen de los archivos abiertos
+      libres, sin pasar de max_vias ni de los runs que tendrá el trabajo.
+"""
+
+import io
+import math
+import multiprocessing
+import os
+import queue
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from memoria import BYTES_POR_ELEMENTO, elementos_en_memoria, memoria_en_bytes
+from ordenamiento_asincrono import ALGORITMOS
+from registro_algoritmos import cargar, obtener
+
+
+# Parámetro de tamaño de bloque en memoria de cada algoritmo (None: no tiene)
+PARAMETRO_MEMORIA = {algoritmo: obtener(algoritmo).memoria for algoritmo in ALGORITMOS}
+
+# Parámetro de vías de fusión y archivos abiertos mínimos durante la fusión
+PARAMETRO_VIAS = {'multiway': 'num_vias', 'polyphase': 'num_archivos'}
+ARCHIVOS_MINIMOS = {'multiway': 3, 'polyphase': 4}
+ARCHIVOS_FUSION_BINARIA = 3
+
+# Evento de telemetría desde el cual el trabajo solo fusiona
+EVENTO_FUSION = {'polyphase': 'distribucion'}
+
+# Memoria (en elementos) del búfer de cada archivo abierto durante la fusión
+ELEMENTOS_POR_BUFER = max(1, io.DEFAULT_BUFFER_SIZE // BYTES_POR_ELEMENTO)
+
+# Espera máxima entre revisiones de eventos y trabajos terminados (s)
+_ESPERA = 0.05
+
+PENDIENTE, GENERANDO, FUSIONANDO, TERMINADO, FALLIDO = (
+    'pendiente', 'generando', 'fusionando', 'terminado', 'fallido'
+)
+
+
+def estimar_elementos(archivo, muestra=1 << 16):
+    """Líneas aproximadas del archivo, a partir de los primeros muestra bytes."""
+    tamanio = os.path.getsize(archivo)
+    with open(archivo, 'rb') as f:
+        bloque = f.read(muestra)
+    if not bloque:
+        return 0
+    lineas = bloque.count(b"\n") or 1
+    return max(1, tamanio * lineas // len(bloque))
+
+
+class Trabajo:
+    """
+    Un ordenamiento del lote. Después de ejecutar() tiene salida (ruta del
+    archivo ordenado) o error (la excepción), y lo que el planificador le
+    asignó: bloque (elementos en memoria) y vias.
+    """
+    def __init__(self, archivo, algoritmo, opciones):
+        self.archivo = archivo
+        self.algoritmo = algoritmo
+        self.opciones = opciones
+        self.elementos = estimar_elementos(archivo)
+        self.estado = PENDIENTE
+        self.bloque = None
+        self.vias = None
+        self.memoria = 0
+        self.archivos = 0
+        self.salida = None
+        self.error = None
+
+    def __repr__(self):
+        return (f"Trabajo({self.archivo!r}, {self.algoritmo!r}, estado={self.estado}, "
+                f"bloque={self.bloque}, vias={self.vias})")
+
+
+def _ejecutar_trabajo(indice, algoritmo, archivo, opciones, cola):
+    """Cuerpo del proceso: ordena y envía (indice, evento) por cada evento de telemetría."""
+    ordenar = cargar(algoritmo)
+    return ordenar(archivo, telemetria=lambda evento: cola.put((indice, evento)), **opciones)
+
+
+class PlanificadorLotes:
+    """
+    Cola de ordenamientos externos con presupuesto compartido.
+        memoria: Presupuesto total en bytes (o texto como "256M"; ver linea_comandos).
+        max_archivos: Archivos abiertos a la vez entre todos los trabajos.
+        trabajadores: Procesos (trabajos en curso a la vez; por defecto, los CPUs).
+        max_vias: Vías máximas de fusión de un trabajo.
+    """
+    def __init__(self, memoria, max_archivos=64, trabajadores=None, max_vias=16):
+        if isinstance(memoria, str):
+            memoria = memoria_en_bytes(memoria)
+        if max_archivos < max(ARCHIVOS_MINIMOS.values()):
+            raise ValueError(f"max_archivos debe ser al menos {max(ARCHIVOS_MINIMOS.values())}")
+        self.memoria_total = elementos_en_memoria(memoria)
+        self.max_archivos = max_archivos
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.max_vias = max(2, max_vias)
+        self.trabajos = []
+        self.memoria_libre = self.memoria_total
+        self.archivos_libres = max_archivos
+
+    @property
+    def cuota(self):
+        """Memoria (en elementos) garantizada a cada proceso."""
+        return max(2, self.memoria_total // self.trabajadores)
+
+    def agregar(self, archivo, algoritmo='polyphase', **opciones):
+        """
+        Encola el ordenamiento de archivo con algoritmo ('straight', 'natural',
+        'multiway', 'polyphase' o 'replacement-selection'). opciones son las del
+        ordenamiento, salvo memoria, vías y telemetría, que asigna el planificador.
+        Lanza ValueError si el trabajo nunca cabría en el presupuesto.
+        """
+        if algoritmo not in ALGORITMOS:
+            raise ValueError(f"Algoritmo no soportado: {algoritmo!r} "
+                             f"(use uno de {ALGORITMOS})")
+        reservados = {'telemetria', PARAMETRO_MEMORIA[algoritmo], PARAMETRO_VIAS.get(algoritmo)}
+        for nombre in opciones:
+            if nombre in reservados:
+                raise ValueError(f"{nombre} lo asigna el planificador")
+        trabajo = Trabajo(archivo, algoritmo, opciones)
+        minima = self.memoria_minima(trabajo)
+        if minima > self.memoria_total:
+            raise ValueError(f"{archivo}: {algoritmo} necesita {minima} elementos en memoria "
+                             f"y el presupuesto es de {self.memoria_total}")
+        self.trabajos.append(trabajo)
+        return trabajo
+
+    def memoria_minima(self, trabajo):
+        """
+        Memoria (en elementos) que trabajo reserva aunque reciba el menor bloque:
+        toda la entrada en Polyphase Sort, 2 elementos con bloque, y si no los
+        búferes de una fusión de dos vías.
+        """
+        if trabajo.algoritmo == 'polyphase':
+            return max(2, trabajo.elementos)
+        if PARAMETRO_MEMORIA[trabajo.algoritmo] is not None:
+            return 2
+        return ARCHIVOS_FUSION_BINARIA * ELEMENTOS_POR_BUFER
+
+    def planificar(self, trabajo, pendientes=()):
+        """
+        Recursos para iniciar trabajo con lo que está libre ahora:
+        (memoria, bloque, vias, archivos), o None si no cabe.
+        pendientes: Trabajos que esperan (para dejarles lugar a los pequeños).
+        """
+        algoritmo = trabajo.algoritmo
+        necesidad = max(2, trabajo.elementos)
+
+        # Bloque en memoria durante la generación de runs
+        bloque = None
+        if PARAMETRO_MEMORIA[algoritmo] is not None:
+            minimo = min(necesidad, self.cuota)
+            if self.memoria_libre < minimo:
+                return None
+            pequenios = sum(otro.elementos for otro in pendientes
+                            if otro is not trabajo and otro.elementos <= self.cuota)
+            bloque = min(necesidad, max(minimo, self.memoria_libre - pequenios))
+
+        # Vías según los archivos libres y los runs que se generarán
+        vias = None
+        archivos = ARCHIVOS_MINIMOS.get(algoritmo, ARCHIVOS_FUSION_BINARIA)
+        if algoritmo in PARAMETRO_VIAS:
+            # Multiway abre sus entradas y la salida; Polyphase además cuenta runs
+            extra = 2 if algoritmo == 'polyphase' else 1
+            runs = math.ceil(necesidad / bloque)
+            entradas = min(self.max_vias, max(2, runs), self.archivos_libres - extra)
+            vias = entradas + 1 if algoritmo == 'polyphase' else entradas
+            archivos = max(archivos, entradas + extra)
+        if archivos > self.archivos_libres:
+            return None
+
+        # Polyphase Sort guarda todos sus runs en memoria hasta distribuirlos
+        if algoritmo == 'polyphase':
+            memoria = max(bloque, necesidad)
+        elif bloque is not None:
+            memoria = bloque
+        else:
+            memoria = archivos * ELEMENTOS_POR_BUFER
+        if memoria > self.memoria_libre:
+            return None
+        return memoria, bloque, vias, archivos
+
+    def _iniciar(self, indice, trabajo, plan, pool, cola):
+        trabajo.memoria, trabajo.bloque, trabajo.vias, trabajo.archivos = plan
+        self.memoria_libre -= trabajo.memoria
+        self.archivos_libres -= trabajo.archivos
+        opciones = dict(trabajo.opciones)
+        if trabajo.bloque is not None:
+            opciones[PARAMETRO_MEMORIA[trabajo.algoritmo]] = trabajo.bloque
+        if trabajo.vias is not None:
+            opciones[PARAMETRO_VIAS[trabajo.algoritmo]] = trabajo.vias
+        trabajo.estado = GENERANDO
+        return pool.submit(_ejecutar_trabajo, indice, trabajo.algoritmo, trabajo.archivo,
+                           opciones, cola)
+
+    def _pasar_a_fusion(self, trabajo):
+        """Reduce la reserva de memoria de trabajo a los búferes de sus archivos."""
+        fusion = min(trabajo.memoria, trabajo.archivos * ELEMENTOS_POR_BUFER)
+        self.memoria_libre += trabajo.memoria - fusion
+        trabajo.memoria = fusion
+        trabajo.estado = FUSIONANDO
+
+    def _liberar(self, trabajo):
+        self.memoria_libre += trabajo.memoria
+        self.archivos_libres += trabajo.archivos
+        trabajo.memoria = trabajo.archivos = 0
+
+    def ejecutar(self, informar=None):
+        """
+        Ejecuta los trabajos pendientes y retorna la lista de todos los trabajos.
+        Un trabajo que falla guarda su excepción en error; los demás continúan.
+        informar: Función opcional que recibe cada trabajo al terminar.
+        """
+        pendientes = [trabajo for trabajo in self.trabajos if trabajo.estado == PENDIENTE]
+        en_curso = {}
+        with ProcessPoolExecutor(self.trabajadores) as pool, \
+                multiprocessing.Manager() as manager:
+            cola = manager.Queue()
+            while pendientes or en_curso:
+                # Admitir, en orden, todos los trabajos que caben
+                for trabajo in list(pendientes):
+                    if len(en_curso) == self.trabajadores:
+                        break
+                    plan = self.planificar(trabajo, pendientes)
+                    if plan is None:
+                        continue
+                    pendientes.remove(trabajo)
+                    futuro = self._iniciar(self.trabajos.index(trabajo), trabajo, plan,
+                                           pool, cola)
+                    en_curso[futuro] = trabajo
+
+                # Con todo el presupuesto libre, los que no se admitieron nunca caben
+                if not en_curso:
+                    for trabajo in pendientes:
+                        trabajo.error = ValueError(
+                            f"{trabajo.archivo}: {trabajo.algoritmo} no cabe en el presupuesto "
+                            f"({self.memoria_total} elementos, {self.max_archivos} archivos)")
+                        trabajo.estado = FALLIDO
+                        if informar is not None:
+                            informar(trabajo)
+                    break
+
+                listos, _ = wait(en_curso, timeout=_ESPERA, return_when=FIRST_COMPLETED)
+
+                # Rebalancear la memoria de los trabajos que ya solo fusionan
+                while True:
+                    try:
+                        indice, evento = cola.get_nowait()
+                    except queue.Empty:
+                        break
+                    trabajo = self.trabajos[indice]
+                    if (trabajo.estado == GENERANDO and
+                            evento['evento'] == EVENTO_FUSION.get(trabajo.algoritmo, 'runs')):
+                        self._pasar_a_fusion(trabajo)
+
+                for futuro in listos:
+                    trabajo = en_curso.pop(futuro)
+                    self._liberar(trabajo)
+                    try:
+                        trabajo.salida = futuro.result()
+                        trabajo.estado = TERMINADO
+                    except Exception as e:
+                        trabajo.error = e
+                        trabajo.estado = FALLIDO
+                    if informar is not None:
+                        informar(trabajo)
+        return self.trabajos
+
+
+if __name__ == "__main__":
+    import random
+    import tempfile
+
+    print("=" * 70)
+    print("PLANIFICADOR DE LOTES - Presupuesto global de memoria y archivos")
+    print("=" * 70)
+
+    directorio = tempfile.mkdtemp(prefix='planificador_lotes_')
+    tamanios = [20000, 2000, 2000, 40000, 2000, 2000, 2000, 2000]
+    algoritmos = ['polyphase', 'multiway', 'replacement-selection', 'multiway',
+                  'straight', 'polyphase', 'natural', 'multiway']
+
+    planificador = PlanificadorLotes('2M', max_archivos=16, trabajadores=3)
+    print(f"\nPresupuesto: {planificador.memoria_total} elementos, "
+          f"{planificador.max_archivos} archivos, {planificador.trabajadores} procesos")
+    for i, (tamanio, algoritmo) in enumerate(zip(tamanios, algoritmos)):
+        archivo = os.path.join(directorio, f'datos_lote_{i}.txt')
+        with open(archivo, 'w') as f:
+            for _ in range(tamanio):
+                f.write(f"{random.randint(1, 1000000)}\n")
+        planificador.agregar(archivo, algoritmo, directorio_salida=directorio)
+    print(f"Encolados {len(tamanios)} trabajos ({sum(tamanios)} números)")
+
+    # Polyphase Sort guarda toda su entrada en memoria: este no cabe nunca
+    archivo = os.path.join(directorio, 'datos_lote_grande.txt')
+    with open(archivo, 'w') as f:
+        for _ in range(60000):
+            f.write(f"{random.randint(1, 1000000)}\n")
+    try:
+        planificador.agregar(archivo, 'polyphase', directorio_salida=directorio)
+    except ValueError as e:
+        print(f"Rechazado: {e}")
+
+    def informar(trabajo):
+        print(f"  {os.path.basename(trabajo.archivo):18} {trabajo.algoritmo:22} "
+              f"bloque={trabajo.bloque} vias={trabajo.vias} -> {trabajo.estado}")
+
+    print("\nEjecutando lote...")
+    trabajos = planificador.ejecutar(informar)
+
+    print("\nVerificando salidas...")
+    for trabajo in trabajos:
+        with open(trabajo.salida) as f:
+            valores = [int(linea) for linea in f]
+        ordenado = all(a <= b for a, b in zip(valores, valores[1:]))
+        print(f"  {os.path.basename(trabajo.salida)}: "
+              f"{'[OK]' if ordenado else '[ERROR]'} {len(valores)} elementos")
+
+    print("\nLimpiando archivos...")
+    for nombre in os.listdir(directorio):
+        os.remove(os.path.join(directorio, nombre))
+    os.rmdir(directorio)
+
+    print("\n[OK] Demostración completada")
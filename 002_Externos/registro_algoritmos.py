@@ -0,0 +1,170 @@
+"""
+Registro de Algoritmos (Carga Perezosa)
+Un solo registro de los ordenamientos internos (001_Internos) y externos
+(002_Externos) con sus propiedades: estable, en el lugar, externo, complejidad,
+parámetro de memoria y función de fusión.
+
+Los módulos numerados no se importan al importar el registro: cada uno se
+carga la primera vez que se pide su función (y con él sus dependencias, como
+NumPy). Así la línea de comandos o un proceso trabajador solo cargan el camino
+que usan.
+
+Uso:
+    quick_sort = cargar('quick')
+    [nombre for nombre in algoritmos(externo=True)]
+"""
+
+import importlib
+import os
+import sys
+
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Algoritmo:
+    """
+    Entrada del registro.
+        nombre: Nombre corto (el de la línea de comandos y el benchmark).
+        carpeta, modulo, funcion: Dónde está la implementación.
+        externo: Ordena archivos (True) o listas en memoria (False).
+        estable, en_lugar: Propiedades del ordenamiento.
+        complejidad: Complejidad en tiempo, como en el docstring de la función.
+        memoria: Parámetro del tamaño en memoria de los externos (None si no tiene).
+        fusion: Función del módulo que fusiona runs (None en los internos).
+    """
+    def __init__(self, nombre, carpeta, modulo, funcion, externo, estable, en_lugar,
+                 complejidad, memoria=None, fusion=None):
+        self.nombre = nombre
+        self.carpeta = carpeta
+        self.modulo = modulo
+        self.funcion = funcion
+        self.externo = externo
+        self.estable = estable
+        self.en_lugar = en_lugar
+        self.complejidad = complejidad
+        self.memoria = memoria
+        self.fusion = fusion
+
+    def cargar_modulo(self):
+        """Importa el módulo de la implementación (solo la primera vez)."""
+        return importar_modulo(self.modulo, self.carpeta)
+
+    def cargar(self):
+        """Retorna la función de ordenamiento, importando su módulo si hace falta."""
+        return getattr(self.cargar_modulo(), self.funcion)
+
+    def __repr__(self):
+        return f"Algoritmo({self.nombre!r}, {self.modulo}.{self.funcion})"
+
+
+# Los externos ordenan (clave, línea) completos: las claves iguales salen en el
+# orden de sus líneas, no en el de la entrada, así que no son estables
+REGISTRO = {algoritmo.nombre: algoritmo for algoritmo in [
+    Algoritmo('insertion', '001_Internos', '001_insertion_sort', 'insertion_sort',
+              externo=False, estable=True, en_lugar=True,
+              complejidad="O(n^2) en el peor caso, O(n) si está casi ordenado"),
+    Algoritmo('selection', '001_Internos', '002_selection_sort', 'selection_sort',
+              externo=False, estable=False, en_lugar=True,
+              complejidad="O(n^2) en todos los casos"),
+    Algoritmo('bubble', '001_Internos', '003_bubble_sort', 'bubble_sort',
+              externo=False, estable=True, en_lugar=True,
+              complejidad="O(n^2) en el peor caso, O(n) si está ordenado"),
+    Algoritmo('tree', '001_Internos', '004_tree_sort', 'tree_sort',
+              externo=False, estable=False, en_lugar=False,
+              complejidad="O(n log n) en promedio, O(n^2) en el peor caso"),
+    Algoritmo('quick', '001_Internos', '005_quick_sort', 'quick_sort',
+              externo=False, estable=False, en_lugar=True,
+              complejidad="O(n log n) en promedio, O(n^2) en el peor caso"),
+    Algoritmo('merge', '001_Internos', '006_merge_sort', 'merge_sort',
+              externo=False, estable=True, en_lugar=False,
+              complejidad="O(n log n) en todos los casos"),
+    Algoritmo('radix', '001_Internos', '007_radix_sort', 'radix_sort',
+              externo=False, estable=True, en_lugar=False,
+              complejidad="O(d * (n + k)) donde d es el número de dígitos"),
+    Algoritmo('straight', '002_Externos', '008_straight_merging', 'straight_merging',
+              externo=True, estable=False, en_lugar=False,
+              complejidad="O(n log n) con acceso a disco",
+              memoria='tamanio_bloque', fusion='fusionar_dos_archivos'),
+    Algoritmo('natural', '002_Externos', '009_natural_merging', 'natural_merging',
+              externo=True, estable=False, en_lugar=False,
+              complejidad="O(n log m) donde m es el número de runs naturales",
+              fusion='fusionar_dos_archivos'),
+    Algoritmo('multiway', '002_Externos', '010_multiway_merging', 'balanced_multiway_merging',
+              externo=True, estable=False, en_lugar=False,
+              complejidad="O(n log k) donde k es el número de vías",
+              memoria='tamanio_bloque', fusion='fusionar_multiples_archivos'),
+    Algoritmo('polyphase', '002_Externos', '011_polyphase_sort', 'polyphase_sort',
+              externo=True, estable=False, en_lugar=False,
+              complejidad="O(n log n) con menos operaciones de fusión",
+              memoria='tamanio_bloque', fusion='fusionar_un_run_cada_archivo'),
+    Algoritmo('replacement-selection', '002_Externos', '012_distribution_initial_runs',
+              'distribution_initial_runs', externo=True, estable=False, en_lugar=False,
+              complejidad="O(n log m) donde m es tamaño de memoria",
+              memoria='tamanio_memoria', fusion='fusionar_dos_archivos'),
+]}
+
+
+def importar_modulo(modulo, carpeta='002_Externos'):
+    """
+    Importa un módulo de carpeta (001_Internos o 002_Externos). Dentro del
+    paquete ordenamiento se importa como ordenamiento.<modulo>; fuera de él
+    (scripts y demos) la carpeta se agrega a sys.path para que sus módulos se
+    importen entre sí por nombre simple y para que los procesos de un Pool
+    puedan importarlos.
+    """
+    if __package__:
+        return importlib.import_module(f"{__package__}.{modulo}")
+    directorio = os.path.join(_RAIZ, carpeta)
+    if directorio not in sys.path:
+        sys.path.append(directorio)
+    return importlib.import_module(modulo)
+
+
+def obtener(nombre):
+    """Entrada del registro de nombre; ValueError si no existe."""
+    if nombre not in REGISTRO:
+        raise ValueError(f"Algoritmo no soportado: {nombre!r} (use uno de {tuple(REGISTRO)})")
+    return REGISTRO[nombre]
+
+
+def cargar(nombre):
+    """Función de ordenamiento de nombre (importa su módulo la primera vez)."""
+    return obtener(nombre).cargar()
+
+
+def algoritmos(externo=None, estable=None, en_lugar=None):
+    """Nombres de los algoritmos, filtrados por las propiedades que no sean None."""
+    return tuple(
+        nombre for nombre, algoritmo in REGISTRO.items()
+        if (externo is None or algoritmo.externo == externo) and
+        (estable is None or algoritmo.estable == estable) and
+        (en_lugar is None or algoritmo.en_lugar == en_lugar)
+    )
+
+
+if __name__ == "__main__":
+    import time
+
+    print("=" * 70)
+    print("REGISTRO DE ALGORITMOS - Carga perezosa")
+    print("=" * 70)
+
+    print(f"\n  {'nombre':22} {'externo':8} {'estable':8} {'en lugar':9} complejidad")
+    for algoritmo in REGISTRO.values():
+        print(f"  {algoritmo.nombre:22} {str(algoritmo.externo):8} {str(algoritmo.estable):8} "
+              f"{str(algoritmo.en_lugar):9} {algoritmo.complejidad}")
+
+    print(f"\nEstables en memoria: {algoritmos(externo=False, estable=True)}")
+
+    # Nada se importa hasta el primer uso
+    print(f"\nMódulos numerados cargados: "
+          f"{[m for m in sys.modules if m[:3].isdigit()]}")
+    inicio = time.perf_counter()
+    merge_sort = cargar('merge')
+    print(f"cargar('merge'): {(time.perf_counter() - inicio) * 1000:.2f} ms "
+          f"-> {merge_sort([5, 2, 9, 1])}")
+    print(f"Módulos numerados cargados: "
+          f"{[m for m in sys.modules if m[:3].isdigit()]}")
+
+    print("\n[OK] Demostración completada")
@@ -0,0 +1,174 @@
+"""
+Telemetría (Fases, Pasadas y E/S)
+Eventos estructurados de los ordenamientos externos: generación de runs,
+cada pasada de fusión y el resumen final, con tiempos, bytes leídos y escritos
+y memoria pico. Los eventos son diccionarios que se entregan a un sumidero:
+una función, un logging.Logger o un archivo de líneas JSON (SumideroJSONL).
+
+Eventos (todos con 'evento', 'algoritmo' y 'marca_tiempo'):
+    'orden_previo': orden medido de la entrada (ver deteccion_orden).
+    'runs': cantidad y longitudes (en bytes o elementos) de los runs iniciales.
+    'distribucion': archivos entre los que Polyphase Sort repartió los runs
+        (desde aquí ya no los tiene en memoria).
+    'pasada': numero, fan_in, runs de entrada y de salida, archivos abiertos.
+    'fin': pasadas, ruta y bytes de la salida y memoria pico del proceso.
+    'error': mensaje de un ordenamiento que no pudo terminar.
+'runs', 'pasada' y 'fin' incluyen duracion (s), bytes_leidos y bytes_escritos
+(del proceso, según /proc/self/io; None fuera de Linux).
+"""
+
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def contadores_io():
+    """(bytes leídos, bytes escritos) acumulados del proceso, o (None, None)."""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            campos = dict(linea.split(':') for linea in f)
+        return int(campos['rchar']), int(campos['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def memoria_pico():
+    """RSS pico del proceso en bytes, o None si no se puede medir."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en bytes en macOS y en KB en Linux
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+class SumideroJSONL:
+    """Agrega cada evento como una línea JSON a un archivo (ruta o archivo abierto)."""
+    def __init__(self, destino):
+        self.destino = destino
+
+    def __call__(self, evento):
+        linea = json.dumps(evento, ensure_ascii=False) + "\n"
+        if isinstance(self.destino, (str, os.PathLike)):
+            with open(self.destino, 'a', encoding='utf-8') as f:
+                f.write(linea)
+        else:
+            self.destino.write(linea)
+            self.destino.flush()
+
+
+class SumideroLogging:
+    """Envía cada evento a un logging.Logger como JSON, con el nivel indicado (INFO)."""
+    def __init__(self, logger, nivel=None):
+        import logging
+        self.logger = logger
+        self.nivel = logging.INFO if nivel is None else nivel
+
+    def __call__(self, evento):
+        self.logger.log(self.nivel, json.dumps(evento, ensure_ascii=False))
+
+
+def _adaptar_sumidero(sumidero):
+    """Función que recibe cada evento, a partir de lo que aceptan los ordenamientos."""
+    if sumidero is None:
+        return None
+    # Un Logger solo existe si logging ya se importó: no hace falta importarlo aquí
+    logging = sys.modules.get('logging')
+    if logging is not None and isinstance(sumidero, logging.Logger):
+        return SumideroLogging(sumidero)
+    if isinstance(sumidero, (str, os.PathLike)):
+        return SumideroJSONL(sumidero)
+    if callable(sumidero):
+        return sumidero
+    raise TypeError(f"Sumidero de telemetría no soportado: {sumidero!r}")
+
+
+class Telemetria:
+    """
+    Emisor de eventos de un ordenamiento. Sin sumidero, todos los métodos
+    retornan de inmediato (no se mide nada).
+
+    Uso en un ordenamiento:
+        telemetria = Telemetria(sumidero, 'straight')
+        inicio = telemetria.marca()
+        ...generar runs...
+        telemetria.runs(inicio, archivos)
+        inicio = telemetria.marca()
+        ...una pasada de fusión...
+        telemetria.pasada(inicio, fan_in, entradas, salidas)
+        telemetria.fin(archivo_salida)
+    """
+    def __init__(self, sumidero=None, algoritmo=None):
+        if isinstance(sumidero, Telemetria):
+            sumidero = sumidero.sumidero
+        self.sumidero = _adaptar_sumidero(sumidero)
+        self.algoritmo = algoritmo
+        self.pasadas = 0
+        self.inicio = self.marca()
+
+    @property
+    def activa(self):
+        return self.sumidero is not None
+
+    def emitir(self, evento, **datos):
+        if self.sumidero is None:
+            return
+        registro = {'evento': evento, 'algoritmo': self.algoritmo,
+                    'marca_tiempo': time.time()}
+        registro.update(datos)
+        self.sumidero(registro)
+
+    def marca(self):
+        """Punto de partida (tiempo y E/S) para medir una fase."""
+        if self.sumidero is None:
+            return None
+        return (time.perf_counter(),) + contadores_io()
+
+    def _desde(self, marca):
+        tiempo, leidos, escritos = marca
+        leidos_ahora, escritos_ahora = contadores_io()
+        return {
+            'duracion': time.perf_counter() - tiempo,
+            'bytes_leidos': None if leidos is None else leidos_ahora - leidos,
+            'bytes_escritos': None if escritos is None else escritos_ahora - escritos,
+        }
+
+    def runs(self, marca, archivos=None, longitudes=None):
+        """
+        Evento 'runs' de la generación de runs iniciales: archivos (se informa su
+        tamaño en bytes) o longitudes ya conocidas (en elementos).
+        """
+        if self.sumidero is None:
+            return
+        if archivos is not None:
+            longitudes = [os.path.getsize(archivo) for archivo in archivos]
+            unidad = 'bytes'
+        else:
+            unidad = 'elementos'
+        self.emitir('runs', cantidad=len(longitudes), unidad=unidad,
+                    longitudes=longitudes, **self._desde(marca))
+
+    def pasada(self, marca, fan_in, entradas, salidas):
+        """Evento 'pasada' de una pasada de fusión de entradas runs en salidas runs."""
+        self.pasadas += 1
+        if self.sumidero is None:
+            return
+        self.emitir('pasada', numero=self.pasadas, fan_in=fan_in, runs_entrada=entradas,
+                    runs_salida=salidas, archivos_abiertos=entradas + salidas,
+                    **self._desde(marca))
+
+    def fin(self, archivo_salida=None):
+        """Evento 'fin' con el total de pasadas, la salida y la memoria pico."""
+        if self.sumidero is None:
+            return
+        tamanio = None
+        if archivo_salida is not None and os.path.exists(archivo_salida):
+            tamanio = os.path.getsize(archivo_salida)
+        self.emitir('fin', pasadas=self.pasadas, archivo_salida=archivo_salida,
+                    bytes_salida=tamanio,
+                    memoria_pico=memoria_pico(), **self._desde(self.inicio))
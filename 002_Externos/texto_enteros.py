@@ -0,0 +1,146 @@
+"""
+Texto de Enteros (Conversión por Lotes)
+Lee y escribe archivos de un entero por línea en fragmentos grandes: la entrada
+se corta en límites de línea y se convierte con map(int, ...), y la salida se
+formatea por lotes con b"%d" en pocas escrituras grandes.
+"""
+
+import mmap
+from itertools import islice
+
+
+TAMANIO_LECTURA = 1 << 20
+
+TAMANIO_LOTE = 65536
+
+POLITICAS_LINEAS = ('fallar', 'omitir', 'contar')
+
+# Líneas inválidas que se guardan como ejemplo con la política 'contar'
+_MAX_EJEMPLOS = 10
+
+
+class LineasInvalidas:
+    """
+    Política para las líneas que no se pueden convertir:
+        'fallar': lanza ValueError con el número de línea.
+        'omitir': las descarta.
+        'contar': las descarta y lleva la cuenta (cantidad) y algunos ejemplos
+            (numero_linea, linea); pasar una instancia para consultarlos.
+    """
+    def __init__(self, politica='fallar'):
+        if politica not in POLITICAS_LINEAS:
+            raise ValueError(f"Política de líneas no soportada: {politica!r} "
+                             f"(use una de {POLITICAS_LINEAS})")
+        self.politica = politica
+        self.cantidad = 0
+        self.ejemplos = []
+
+    def registrar(self, numero, linea):
+        """Aplica la política a la línea inválida numero (desde 1)."""
+        if self.politica == 'fallar':
+            raise ValueError(f"Línea {numero} inválida: {linea!r}")
+        self.cantidad += 1
+        if self.politica == 'contar' and len(self.ejemplos) < _MAX_EJEMPLOS:
+            self.ejemplos.append((numero, linea))
+
+    def __repr__(self):
+        return f"LineasInvalidas({self.politica!r}, cantidad={self.cantidad})"
+
+
+def politica_lineas(lineas_invalidas):
+    """Acepta None ('fallar'), el nombre de una política o un LineasInvalidas."""
+    if isinstance(lineas_invalidas, LineasInvalidas):
+        return lineas_invalidas
+    return LineasInvalidas(lineas_invalidas or 'fallar')
+
+
+def fragmentos_de_lineas(archivo, usar_mmap=False, tamanio_lectura=TAMANIO_LECTURA):
+    """
+    Genera fragmentos (bytes) de unos tamanio_lectura bytes que terminan en un
+    límite de línea; la línea cortada al final de una lectura pasa a la siguiente.
+    Con usar_mmap=True lee el archivo mapeado en memoria en lugar de con read().
+    """
+    with open(archivo, 'rb') as f:
+        if not usar_mmap:
+            yield from _cortar_en_lineas(f, tamanio_lectura)
+            return
+
+        # mmap no admite archivos vacíos
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            yield from _cortar_en_lineas(mapa, tamanio_lectura)
+
+
+def _cortar_en_lineas(fuente, tamanio_lectura):
+    resto = b''
+    while True:
+        bloque = fuente.read(tamanio_lectura)
+        if not bloque:
+            break
+        corte = bloque.rfind(b'\n') + 1
+        if corte == 0:
+            resto += bloque
+            continue
+        yield resto + bloque[:corte]
+        resto = bloque[corte:]
+    if resto:
+        yield resto
+
+
+def enteros_de_fragmento(fragmento, politica, primera_linea=1):
+    """
+    Convierte un fragmento de líneas en una lista de enteros.
+    Camino rápido: map(int, ...) sobre todas las líneas; si alguna falla, se
+    recorren una a una aplicando la política de líneas inválidas.
+    """
+    lineas = fragmento.split(b'\n')
+    if not lineas[-1]:
+        lineas.pop()
+
+    try:
+        return list(map(int, lineas))
+    except ValueError:
+        pass
+
+    valores = []
+    for numero, linea in enumerate(lineas, primera_linea):
+        try:
+            valores.append(int(linea))
+        except ValueError:
+            politica.registrar(numero, linea)
+    return valores
+
+
+def leer_lotes_enteros(archivo, lineas_invalidas=None, usar_mmap=False,
+                       tamanio_lectura=TAMANIO_LECTURA):
+    """Genera listas de enteros, una por fragmento leído del archivo."""
+    politica = politica_lineas(lineas_invalidas)
+    primera_linea = 1
+    for fragmento in fragmentos_de_lineas(archivo, usar_mmap, tamanio_lectura):
+        yield enteros_de_fragmento(fragmento, politica, primera_linea)
+        primera_linea += fragmento.count(b'\n')
+
+
+def leer_enteros(archivo, lineas_invalidas=None, usar_mmap=False,
+                 tamanio_lectura=TAMANIO_LECTURA):
+    """Genera los enteros de un archivo de un entero por línea."""
+    for lote in leer_lotes_enteros(archivo, lineas_invalidas, usar_mmap, tamanio_lectura):
+        yield from lote
+
+
+def formatear_enteros(valores):
+    """Líneas de texto (bytes) de una lista de enteros, con salto final."""
+    if not valores:
+        return b''
+    return b"\n".join(map(b"%d".__mod__, valores)) + b"\n"
+
+
+def escribir_enteros(salida, valores, tamanio_lote=TAMANIO_LOTE):
+    """Escribe enteros en un archivo binario, tamanio_lote líneas por escritura."""
+    valores = iter(valores)
+    while True:
+        lote = list(islice(valores, tamanio_lote))
+        if not lote:
+            break
+        salida.write(formatear_enteros(lote))
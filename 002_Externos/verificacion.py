@@ -0,0 +1,281 @@
+"""
+Verificación de Salidas (Orden y Multiconjunto en Paralelo)
+Comprueba que un archivo de salida sea la entrada ordenada: que esté en orden
+y que tenga los mismos elementos, sin pérdidas ni duplicados.
+
+Ambos archivos se cortan en rangos de bytes alineados a líneas que se procesan
+en paralelo, en una sola lectura. Cada rango informa su cantidad de elementos,
+una huella de multiconjunto (suma módulo 2**64 de un hash de cada elemento,
+independiente del orden) y, en la salida, su primer y último elemento y el
+primer desorden interno. Al unir los resultados se comprueban los bordes entre
+rangos consecutivos.
+
+Uso:
+    resultado = verificar('datos.txt', 'datos_ordenados.txt')
+    if not resultado.correcto:
+        raise ValueError(resultado)
+"""
+
+import hashlib
+import operator
+import os
+from itertools import islice
+from multiprocessing import Pool
+
+from claves_registros import normalizar_clave
+from codificacion_runs import clave_agrupamiento, linea_de_elemento
+from texto_enteros import LineasInvalidas, enteros_de_fragmento, politica_lineas
+
+
+TAMANIO_FRAGMENTO = 8 << 20
+
+_MASCARA = (1 << 64) - 1
+
+
+class Verificacion:
+    """
+    Resultado de verificar una salida.
+        ordenado: la salida está en orden (estricto si unico=True).
+        desorden: (numero_de_elemento, linea) del primer desorden, o None.
+        elementos_entrada, elementos_salida: elementos válidos de cada archivo.
+        huella_entrada, huella_salida: huellas de multiconjunto (None si unico=True).
+        invalidas_salida: líneas de la salida que no se pudieron convertir.
+    """
+    def __init__(self, ordenado, desorden, elementos_entrada, elementos_salida,
+                 huella_entrada, huella_salida, invalidas_salida):
+        self.ordenado = ordenado
+        self.desorden = desorden
+        self.elementos_entrada = elementos_entrada
+        self.elementos_salida = elementos_salida
+        self.huella_entrada = huella_entrada
+        self.huella_salida = huella_salida
+        self.invalidas_salida = invalidas_salida
+
+    @property
+    def mismos_elementos(self):
+        """La salida tiene el mismo multiconjunto de elementos que la entrada."""
+        if self.huella_entrada is None:
+            # Con unico la salida solo puede perder elementos repetidos
+            return self.elementos_salida <= self.elementos_entrada
+        return (self.elementos_entrada == self.elementos_salida and
+                self.huella_entrada == self.huella_salida)
+
+    @property
+    def correcto(self):
+        return self.ordenado and self.mismos_elementos and not self.invalidas_salida
+
+    def __repr__(self):
+        return (f"Verificacion(ordenado={self.ordenado}, "
+                f"mismos_elementos={self.mismos_elementos}, "
+                f"elementos={self.elementos_entrada}->{self.elementos_salida}, "
+                f"desorden={self.desorden!r}, invalidas_salida={self.invalidas_salida})")
+
+
+def mezclar(valor):
+    """
+    Hash de 64 bits de un entero (finalizador de SplitMix64): elementos
+    cercanos dan hashes sin relación, así que las sumas no se compensan.
+    """
+    valor &= _MASCARA
+    valor = (valor ^ (valor >> 30)) * 0xBF58476D1CE4E5B9 & _MASCARA
+    valor = (valor ^ (valor >> 27)) * 0x94D049BB133111EB & _MASCARA
+    return valor ^ (valor >> 31)
+
+
+def hash_registro(registro):
+    """Hash de 64 bits de la línea (bytes) de un registro."""
+    return int.from_bytes(hashlib.blake2b(registro, digest_size=8).digest(), 'little')
+
+
+def leer_rango(archivo, inicio, fin):
+    """Bytes de las líneas de archivo que empiezan en [inicio, fin)."""
+    with open(archivo, 'rb') as f:
+        if inicio > 0:
+            # La línea que cruza inicio pertenece al rango anterior
+            f.seek(inicio - 1)
+            f.readline()
+        posicion = f.tell()
+        if posicion >= fin:
+            return b''
+        datos = f.read(fin - posicion)
+        if datos and not datos.endswith(b'\n'):
+            datos += f.readline()
+    return datos
+
+
+def rangos_de_archivo(archivo, tamanio_fragmento=TAMANIO_FRAGMENTO):
+    """Lista de (inicio, fin) que cubre archivo en rangos de tamanio_fragmento bytes."""
+    tamanio = os.path.getsize(archivo)
+    return [(inicio, min(inicio + tamanio_fragmento, tamanio))
+            for inicio in range(0, tamanio, tamanio_fragmento)]
+
+
+def verificar(archivo_entrada, archivo_salida, clave=None, unico=False, procesos=None,
+              lineas_invalidas=None, tamanio_fragmento=TAMANIO_FRAGMENTO):
+    """
+    Verifica que archivo_salida sea archivo_entrada ordenado.
+    Complejidad: O(N) con una lectura de cada archivo, repartida en procesos;
+    memoria de un rango de tamanio_fragmento bytes por proceso.
+    Uso: Comprobar cada ordenamiento en producción (orden y sin pérdidas).
+    clave: Especificación de clave de los registros (ver claves_registros); la
+        salida se compara por la clave y las huellas por la línea completa.
+    unico: Exige orden estricto; la salida ya no tiene el multiconjunto de la
+        entrada, así que solo se comprueba que no tenga más elementos.
+    procesos: Procesos del pool (por defecto, los CPUs; 1 verifica sin pool).
+    lineas_invalidas: Política de la entrada, la misma del ordenamiento; en la
+        salida toda línea inválida es un error.
+    Retorna un Verificacion.
+    """
+    clave = normalizar_clave(clave)
+    politica = politica_lineas(lineas_invalidas)
+
+    tareas = [(archivo_entrada, inicio, fin, clave, False, unico)
+              for inicio, fin in rangos_de_archivo(archivo_entrada, tamanio_fragmento)]
+    cantidad_entrada = len(tareas)
+    tareas += [(archivo_salida, inicio, fin, clave, True, unico)
+               for inicio, fin in rangos_de_archivo(archivo_salida, tamanio_fragmento)]
+
+    # Fase 1: Cada rango de ambos archivos en paralelo
+    if procesos != 1 and len(tareas) > 2:
+        with Pool(min(procesos or os.cpu_count() or 1, len(tareas))) as pool:
+            resultados = pool.map(_verificar_rango, tareas, chunksize=1)
+    else:
+        resultados = list(map(_verificar_rango, tareas))
+
+    # Fase 2: Líneas inválidas de la entrada, numeradas en todo el archivo
+    lineas = 0
+    for _, _, _, _, _, (cantidad, ejemplos), lineas_rango in resultados[:cantidad_entrada]:
+        for numero, linea in ejemplos:
+            politica.registrar(lineas + numero, linea)
+        politica.cantidad += cantidad - len(ejemplos)
+        lineas += lineas_rango
+
+    elementos_entrada = sum(resultado[0] for resultado in resultados[:cantidad_entrada])
+    huella_entrada = sum(resultado[1] for resultado in resultados[:cantidad_entrada]) & _MASCARA
+
+    # Fase 3: Orden dentro de cada rango de la salida y en los bordes entre rangos
+    elementos_salida = huella_salida = invalidas_salida = 0
+    desorden = None
+    anterior = None
+    for elementos, huella, primero, ultimo, desorden_rango, (cantidad, _), _ in \
+            resultados[cantidad_entrada:]:
+        if desorden is None and anterior is not None and primero is not None and \
+                (primero[0] < anterior[0] or unico and primero[0] == anterior[0]):
+            desorden = (elementos_salida + 1, primero[1])
+        if desorden is None and desorden_rango is not None:
+            desorden = (elementos_salida + desorden_rango[0], desorden_rango[1])
+        if ultimo is not None:
+            anterior = ultimo
+        elementos_salida += elementos
+        huella_salida += huella
+        invalidas_salida += cantidad
+
+    return Verificacion(
+        ordenado=desorden is None,
+        desorden=desorden,
+        elementos_entrada=elementos_entrada,
+        elementos_salida=elementos_salida,
+        huella_entrada=None if unico else huella_entrada,
+        huella_salida=None if unico else huella_salida & _MASCARA,
+        invalidas_salida=invalidas_salida,
+    )
+
+
+def _verificar_rango(tarea):
+    """
+    Cuerpo de cada proceso. Retorna (elementos, huella, primero, ultimo,
+    desorden, (invalidas, ejemplos), lineas): primero y ultimo son
+    (clave, linea), y desorden (numero_de_elemento, linea) dentro del rango.
+    """
+    archivo, inicio, fin, clave, es_salida, unico = tarea
+    fragmento = leer_rango(archivo, inicio, fin)
+    lineas = fragmento.count(b'\n') + (1 if fragmento and not fragmento.endswith(b'\n') else 0)
+    invalidas = LineasInvalidas('contar')
+
+    if clave is None:
+        elementos = enteros_de_fragmento(fragmento, invalidas)
+        huella = sum(map(mezclar, elementos))
+    else:
+        elementos = []
+        for numero, linea in enumerate(fragmento.split(b'\n')[:lineas], 1):
+            try:
+                elementos.append(clave.extraer(linea))
+            except (ValueError, IndexError):
+                invalidas.registrar(numero, linea)
+        huella = sum(hash_registro(registro) for _, registro in elementos)
+    invalidas_rango = (invalidas.cantidad, invalidas.ejemplos)
+
+    if not es_salida or not elementos:
+        return len(elementos), huella, None, None, None, invalidas_rango, lineas
+
+    claves = elementos if clave is None else [clave_agrupamiento(e) for e in elementos]
+    en_orden = operator.lt if unico else operator.le
+    desorden = None
+    # Camino rápido: la comparación de pares en C; el desorden se busca solo si falla
+    if not all(map(en_orden, claves, islice(claves, 1, None))):
+        for numero, (actual, siguiente) in enumerate(zip(claves, claves[1:]), 2):
+            if not en_orden(actual, siguiente):
+                desorden = (numero, linea_de_elemento(elementos[numero - 1]))
+                break
+
+    def extremo(indice):
+        return claves[indice], linea_de_elemento(elementos[indice])
+
+    return len(elementos), huella, extremo(0), extremo(-1), desorden, invalidas_rango, lineas
+
+
+if __name__ == "__main__":
+    import random
+    import shutil
+    import tempfile
+    import time
+
+    print("=" * 70)
+    print("VERIFICACIÓN DE SALIDAS - Orden y multiconjunto en paralelo")
+    print("=" * 70)
+
+    directorio = tempfile.mkdtemp(prefix='verificacion_')
+    entrada = os.path.join(directorio, 'datos_verificacion.txt')
+    # Valores distintos: intercambiar dos vecinos siempre desordena
+    valores = random.sample(range(10000000), 1000000)
+    with open(entrada, 'w') as f:
+        f.writelines(f"{valor}\n" for valor in valores)
+    print(f"\nArchivo de prueba con {len(valores)} números: {entrada}")
+
+    def escribir_salida(nombre, salida):
+        ruta = os.path.join(directorio, nombre)
+        with open(ruta, 'w') as f:
+            f.writelines(f"{valor}\n" for valor in salida)
+        return ruta
+
+    ordenados = sorted(valores)
+    casos = [
+        ("Salida correcta", ordenados),
+        ("Un elemento perdido", ordenados[1:]),
+        ("Un elemento duplicado", [ordenados[0]] * 2 + ordenados[2:]),
+        ("Dos elementos intercambiados", ordenados[:500000] + [ordenados[500001],
+                                                              ordenados[500000]] +
+                                          ordenados[500002:]),
+    ]
+    print("\nCasos (1 MB por rango):")
+    for nombre, salida in casos:
+        ruta = escribir_salida('datos_verificacion_salida.txt', salida)
+        resultado = verificar(entrada, ruta, tamanio_fragmento=1 << 20)
+        estado = "[OK]" if resultado.correcto else "[ERROR]"
+        print(f"  {nombre:30} {estado:7} ordenado={resultado.ordenado}, "
+              f"mismos_elementos={resultado.mismos_elementos}")
+        if resultado.desorden:
+            print(f"    Primer desorden: elemento {resultado.desorden[0]} "
+                  f"({resultado.desorden[1].decode()})")
+
+    ruta = escribir_salida('datos_verificacion_salida.txt', ordenados)
+    print("\nTiempo de verificación:")
+    for procesos in (1, None):
+        inicio = time.perf_counter()
+        verificar(entrada, ruta, procesos=procesos, tamanio_fragmento=1 << 20)
+        print(f"  procesos={procesos or os.cpu_count()}: {time.perf_counter() - inicio:.4f} s")
+
+    print("\nLimpiando archivos...")
+    shutil.rmtree(directorio)
+
+    print("\n[OK] Demostración completada")
@@ -0,0 +1,399 @@
+"""
+Benchmark (Matriz de Algoritmos, Tamaños y Distribuciones)
+Mide todos los ordenamientos de 001_Internos y 002_Externos sobre datos
+generados con semilla fija. Cada caso corre en un proceso nuevo, para que la
+memoria pico y la E/S de un caso no se mezclen con las de otro.
+
+Uso:
+    python 003_Benchmarks/benchmark.py --tamanios 1000,100000 --salida resultados.json
+    python 003_Benchmarks/benchmark.py --base base.json --tolerancia 0.2
+
+Métricas por caso: tiempo de pared, CPU (proceso e hijos), RSS pico, bytes
+leídos y escritos (Linux, /proc/self/io), fusiones realizadas y pasadas de
+fusión informadas por la telemetría (externos; ver 002_Externos/telemetria.py).
+Con --contadores, los internos se ejecutan una vez más instrumentados (fuera
+de la medición de tiempo) para agregar comparaciones, movimientos, llamadas y
+profundidad de recursión (ver 001_Internos/contadores.py).
+Con --base, compara contra resultados guardados y termina con código 1 si
+algún caso es más lento que la base más la tolerancia.
+"""
+
+import argparse
+import bisect
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from itertools import accumulate, tee
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _carpeta in ('001_Internos', '002_Externos'):
+    _ruta = os.path.join(_RAIZ, _carpeta)
+    if _ruta not in sys.path:
+        sys.path.append(_ruta)
+
+from contadores import Contadores
+from registro_algoritmos import REGISTRO
+from telemetria import contadores_io, memoria_pico
+from texto_enteros import escribir_enteros, leer_enteros
+
+
+# Tamaño máximo de los algoritmos cuadráticos (los demás no tienen). El resto
+# de los datos de cada algoritmo (módulo, externo, función de fusión a contar,
+# parámetro de memoria) está en el registro
+TAMANIO_MAXIMO = {'insertion': 20000, 'selection': 20000, 'bubble': 20000}
+
+NOMBRES_ALGORITMOS = list(REGISTRO)
+
+DISTRIBUCIONES = ('uniforme', 'pocos_unicos', 'ordenada', 'invertida', 'organo',
+                  'casi_ordenada', 'zipf')
+
+TAMANIOS_PREDETERMINADOS = (1000, 10000, 100000)
+
+# Memoria de los ordenamientos externos (elementos por bloque)
+TAMANIO_BLOQUE = 10000
+
+
+# Generación de datos
+
+def generar_datos(distribucion, n, semilla=0):
+    """Lista de n enteros no negativos con la distribución pedida (reproducible)."""
+    return list(iterar_datos(distribucion, n, semilla))
+
+
+def iterar_datos(distribucion, n, semilla=0):
+    """
+    Genera los mismos enteros que generar_datos. Solo las distribuciones que
+    ordenan (ordenada, invertida, casi_ordenada) arman la lista completa.
+    """
+    if distribucion not in DISTRIBUCIONES:
+        raise ValueError(f"Distribución no soportada: {distribucion!r} "
+                         f"(use una de {DISTRIBUCIONES})")
+    generador = random.Random(f"{semilla}:{distribucion}:{n}")
+    maximo = max(n, 1) * 10
+
+    if distribucion == 'uniforme':
+        for _ in range(n):
+            yield generador.randrange(maximo)
+    elif distribucion == 'pocos_unicos':
+        for _ in range(n):
+            yield generador.randrange(16)
+    elif distribucion == 'ordenada':
+        yield from sorted(generador.randrange(maximo) for _ in range(n))
+    elif distribucion == 'invertida':
+        yield from sorted((generador.randrange(maximo) for _ in range(n)), reverse=True)
+    elif distribucion == 'organo':
+        # Sube hasta la mitad y baja después
+        mitad = n // 2
+        yield from range(mitad)
+        yield from range(n - mitad - 1, -1, -1)
+    elif distribucion == 'casi_ordenada':
+        # Ordenada con un 1% de intercambios al azar
+        datos = sorted(generador.randrange(maximo) for _ in range(n))
+        for _ in range(n // 100):
+            i, j = generador.randrange(n), generador.randrange(n)
+            datos[i], datos[j] = datos[j], datos[i]
+        yield from datos
+    else:
+        # zipf: frecuencia del valor k proporcional a 1/k (exponente 1)
+        valores = max(n // 10, 10)
+        acumulados = list(accumulate(1 / k for k in range(1, valores + 1)))
+        total = acumulados[-1]
+        for _ in range(n):
+            yield bisect.bisect_left(acumulados, generador.random() * total)
+
+
+def escribir_datos(archivo, distribucion, n, semilla=0):
+    """Escribe los datos de un caso en archivo, un entero por línea, por lotes."""
+    with open(archivo, 'wb') as f:
+        escribir_enteros(f, iterar_datos(distribucion, n, semilla))
+
+
+# Medición
+
+def _cpu_total():
+    """Tiempo de CPU del proceso más el de sus hijos terminados."""
+    if resource is None:
+        return time.process_time()
+    propio = resource.getrusage(resource.RUSAGE_SELF)
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return propio.ru_utime + propio.ru_stime + hijos.ru_utime + hijos.ru_stime
+
+
+def _es_ordenado(valores):
+    """Comprueba el orden de cualquier iterable, sin copiarlo."""
+    anteriores, siguientes = tee(valores)
+    next(siguientes, None)
+    return all(a <= b for a, b in zip(anteriores, siguientes))
+
+
+def _archivo_ordenado(ruta):
+    return _es_ordenado(leer_enteros(ruta))
+
+
+def medir_caso(caso, archivo_datos=None):
+    """
+    Ejecuta un caso (algoritmo, distribución, tamaño) y retorna sus métricas.
+    Pensado para correr en un proceso propio (ver ejecutar_caso).
+    archivo_datos: Datos de un externo ya escritos (ver escribir_datos), para
+        que el proceso medido solo ordene; si falta, se escriben aquí.
+    """
+    algoritmo = REGISTRO[caso['algoritmo']]
+    externo, fusion, memoria = algoritmo.externo, algoritmo.fusion, algoritmo.memoria
+    modulo = algoritmo.cargar_modulo()
+    ordenar = getattr(modulo, algoritmo.funcion)
+    if not externo:
+        datos = generar_datos(caso['distribucion'], caso['tamanio'], caso['semilla'])
+
+    # Contar las fusiones reemplazando la función de fusión del módulo
+    fusiones = [0]
+    if fusion is not None:
+        original = getattr(modulo, fusion)
+
+        def contar_fusion(*args, **kwargs):
+            fusiones[0] += 1
+            return original(*args, **kwargs)
+        setattr(modulo, fusion, contar_fusion)
+
+    # Contar las pasadas con los eventos de telemetría de los externos
+    pasadas = [0]
+
+    def contar_pasada(evento):
+        if evento['evento'] == 'pasada':
+            pasadas[0] += 1
+
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as directorio:
+        archivo = archivo_datos
+        if externo and archivo is None:
+            archivo = os.path.join(directorio, 'datos.txt')
+            escribir_datos(archivo, caso['distribucion'], caso['tamanio'], caso['semilla'])
+
+        leidos_antes, escritos_antes = contadores_io()
+        cpu_antes = _cpu_total()
+        inicio = time.perf_counter()
+        error = None
+        try:
+            with open(os.devnull, 'w') as nulo, redirect_stdout(nulo):
+                if externo:
+                    opciones = {memoria: caso['tamanio_bloque']} if memoria else {}
+                    resultado = ordenar(archivo, directorios_temp=[directorio],
+                                        directorio_salida=directorio,
+                                        telemetria=contar_pasada, **opciones)
+                else:
+                    resultado = ordenar(datos)
+        except (RecursionError, MemoryError, ValueError, RuntimeError) as e:
+            error = f"{type(e).__name__}: {e}"
+        if error is None and externo and resultado is None:
+            error = "Sin archivo de salida"
+        tiempo = time.perf_counter() - inicio
+        cpu = _cpu_total() - cpu_antes
+        leidos, escritos = contadores_io()
+
+        correcto = None
+        if error is None and caso['verificar']:
+            correcto = _archivo_ordenado(resultado) if externo else _es_ordenado(resultado)
+
+    # Segunda ejecución instrumentada, para no mezclar su costo con el tiempo
+    operaciones = None
+    if caso.get('contadores') and not externo and error is None:
+        contadores = Contadores()
+        ordenar(generar_datos(caso['distribucion'], caso['tamanio'], caso['semilla']),
+                contadores)
+        operaciones = contadores.a_dict()
+
+    metricas = {
+        'tiempo': tiempo,
+        'cpu': cpu,
+        'rss_pico': memoria_pico(),
+        'bytes_leidos': None if leidos is None else leidos - leidos_antes,
+        'bytes_escritos': None if escritos is None else escritos - escritos_antes,
+        'fusiones': fusiones[0] if fusion is not None else None,
+        'pasadas': pasadas[0] if externo else None,
+        'correcto': correcto,
+    }
+    if operaciones is not None:
+        metricas['operaciones'] = operaciones
+    if error is not None:
+        metricas['error'] = error
+    return dict(caso, **metricas)
+
+
+def ejecutar_caso(caso):
+    """
+    Corre medir_caso en un proceso nuevo (spawn), sin memoria heredada. Los
+    datos de los externos se escriben antes, en este proceso, para que la
+    memoria pico medida sea solo la del ordenamiento.
+    """
+    contexto = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory(prefix='benchmark_datos_') as directorio:
+        archivo_datos = None
+        if REGISTRO[caso['algoritmo']].externo:
+            archivo_datos = os.path.join(directorio, 'datos.txt')
+            escribir_datos(archivo_datos, caso['distribucion'], caso['tamanio'],
+                           caso['semilla'])
+        with contexto.Pool(1) as pool:
+            return pool.apply(medir_caso, (caso, archivo_datos))
+
+
+def generar_casos(algoritmos, distribuciones, tamanios, semilla=0,
+                  tamanio_bloque=TAMANIO_BLOQUE, verificar=True, contadores=False):
+    """Casos de la matriz; omite los algoritmos cuadráticos sobre su tamaño máximo."""
+    casos = []
+    for nombre in NOMBRES_ALGORITMOS:
+        if nombre not in algoritmos:
+            continue
+        limite = TAMANIO_MAXIMO.get(nombre)
+        for distribucion in distribuciones:
+            for tamanio in tamanios:
+                if limite is not None and tamanio > limite:
+                    continue
+                casos.append({'algoritmo': nombre, 'distribucion': distribucion,
+                              'tamanio': tamanio, 'semilla': semilla,
+                              'tamanio_bloque': tamanio_bloque, 'verificar': verificar,
+                              'contadores': contadores})
+    return casos
+
+
+def ejecutar_matriz(casos, repeticiones=1, informar=None):
+    """
+    Ejecuta cada caso repeticiones veces y se queda con la de menor tiempo.
+    informar: Función opcional que recibe cada resultado al terminar.
+    """
+    resultados = []
+    for caso in casos:
+        medidas = [ejecutar_caso(caso) for _ in range(repeticiones)]
+        mejor = min(medidas, key=lambda medida: medida['tiempo'])
+        resultados.append(mejor)
+        if informar is not None:
+            informar(mejor)
+    return resultados
+
+
+def entorno():
+    """Descripción de la máquina y el intérprete, para comparar resultados."""
+    return {
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementacion': platform.python_implementation(),
+        'sistema': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+# Comparación con una base
+
+def _clave_caso(resultado):
+    return (resultado['algoritmo'], resultado['distribucion'], resultado['tamanio'])
+
+
+def comparar(resultados, base, tolerancia=0.2, minimo=0.01):
+    """
+    Casos más lentos que la base: tiempo > tiempo_base * (1 + tolerancia) y
+    al menos minimo segundos de diferencia (para ignorar el ruido de los casos
+    muy cortos). Retorna una lista de (resultado, tiempo_base).
+    """
+    tiempos_base = {_clave_caso(resultado): resultado['tiempo']
+                    for resultado in base['resultados'] if 'error' not in resultado}
+    regresiones = []
+    for resultado in resultados:
+        anterior = tiempos_base.get(_clave_caso(resultado))
+        if anterior is None or 'error' in resultado:
+            continue
+        if (resultado['tiempo'] > anterior * (1 + tolerancia)
+                and resultado['tiempo'] - anterior >= minimo):
+            regresiones.append((resultado, anterior))
+    return regresiones
+
+
+def _lista(texto, convertir=str):
+    return [convertir(parte) for parte in texto.split(',') if parte]
+
+
+def _tamanio(texto):
+    """Acepta 1000, 1e6 o 10^8."""
+    if '^' in texto:
+        base, exponente = texto.split('^')
+        return int(base) ** int(exponente)
+    return int(float(texto))
+
+
+def _informar(resultado):
+    estado = resultado.get('error') or ('[OK]' if resultado['correcto'] is not False
+                                        else '[ERROR]')
+    print(f"  {resultado['algoritmo']:<22} {resultado['distribucion']:<14} "
+          f"{resultado['tamanio']:>10}  {resultado['tiempo']:9.4f}s  {estado}",
+          file=sys.stderr)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark de los algoritmos de ordenamiento.")
+    parser.add_argument('--algoritmos', type=_lista, default=NOMBRES_ALGORITMOS,
+                        help="Lista separada por comas (por defecto, todos)")
+    parser.add_argument('--distribuciones', type=_lista, default=list(DISTRIBUCIONES),
+                        help="Lista separada por comas (por defecto, todas)")
+    parser.add_argument('--tamanios', type=lambda texto: _lista(texto, _tamanio),
+                        default=list(TAMANIOS_PREDETERMINADOS),
+                        help="Lista separada por comas, por ejemplo 1000,1e6,10^8")
+    parser.add_argument('--repeticiones', type=int, default=1)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--tamanio-bloque', type=int, default=TAMANIO_BLOQUE,
+                        help="Elementos por bloque de los ordenamientos externos")
+    parser.add_argument('--sin-verificar', action='store_true',
+                        help="No comprobar que cada salida esté ordenada")
+    parser.add_argument('--contadores', action='store_true',
+                        help="Agregar conteos de operaciones de los ordenamientos internos")
+    parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto, stdout)")
+    parser.add_argument('--base', help="JSON de resultados anterior para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="Lentitud relativa aceptada frente a la base (0.2 = 20%%)")
+    args = parser.parse_args(argumentos)
+
+    for nombre in args.algoritmos:
+        if nombre not in NOMBRES_ALGORITMOS:
+            parser.error(f"Algoritmo desconocido: {nombre!r} (use {NOMBRES_ALGORITMOS})")
+    for distribucion in args.distribuciones:
+        if distribucion not in DISTRIBUCIONES:
+            parser.error(f"Distribución desconocida: {distribucion!r} (use {DISTRIBUCIONES})")
+
+    casos = generar_casos(args.algoritmos, args.distribuciones, args.tamanios, args.semilla,
+                          args.tamanio_bloque, not args.sin_verificar, args.contadores)
+    print(f"Ejecutando {len(casos)} casos...", file=sys.stderr)
+    resultados = ejecutar_matriz(casos, args.repeticiones, _informar)
+
+    informe = {'entorno': entorno(), 'resultados': resultados}
+    texto = json.dumps(informe, indent=2)
+    if args.salida:
+        with open(args.salida, 'w') as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.base:
+        with open(args.base, 'r') as f:
+            base = json.load(f)
+        regresiones = comparar(resultados, base, args.tolerancia)
+        for resultado, anterior in regresiones:
+            print(f"REGRESIÓN: {resultado['algoritmo']} {resultado['distribucion']} "
+                  f"{resultado['tamanio']}: {resultado['tiempo']:.4f}s "
+                  f"(base {anterior:.4f}s)", file=sys.stderr)
+        if regresiones:
+            return 1
+        print("Sin regresiones frente a la base", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
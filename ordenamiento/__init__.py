@@ -0,0 +1,106 @@
+"""
+Ordenamiento (Paquete de los Algoritmos)
+Los módulos de 001_Internos y 002_Externos tienen prefijos numéricos
+(005_quick_sort.py, 011_polyphase_sort.py) y no se pueden importar con import.
+Este paquete expone el registro de algoritmos (ver
+002_Externos/registro_algoritmos.py) y cada función de ordenamiento por su
+nombre; el módulo de una función se importa la primera vez que se usa.
+
+Los módulos de las carpetas se cargan como ordenamiento.<modulo>
+(ordenamiento.codificacion_runs, ordenamiento.010_multiway_merging) sin tocar
+sys.path: sus imports de módulos hermanos por nombre simple se resuelven
+dentro del paquete, así que nombres como telemetria o memoria no quedan
+expuestos como módulos de primer nivel.
+
+Uso:
+    import ordenamiento
+    ordenamiento.quick_sort([3, 1, 2])          # importa solo 005_quick_sort
+    ordenamiento.cargar('multiway')('datos.txt', tamanio_bloque=5000)
+    ordenamiento.algoritmos(externo=False, estable=True)
+
+    python -m ordenamiento [opciones]           (línea de comandos; ver linea_comandos)
+"""
+
+import builtins
+import importlib
+import importlib.machinery
+import importlib.util
+import os
+import sys
+
+
+_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CARPETAS = ('002_Externos', '001_Internos')
+
+
+def _modulos_de_carpetas():
+    """Nombre de módulo -> ruta, de los .py de las carpetas de algoritmos."""
+    modulos = {}
+    for carpeta in _CARPETAS:
+        with os.scandir(os.path.join(_RAIZ, carpeta)) as entradas:
+            for entrada in entradas:
+                nombre, extension = os.path.splitext(entrada.name)
+                if extension == '.py' and not nombre.startswith('__'):
+                    modulos.setdefault(nombre, entrada.path)
+    return modulos
+
+
+_MODULOS = _modulos_de_carpetas()
+
+
+def _importar(nombre, globales=None, locales=None, lista_from=(), nivel=0):
+    """__import__ de los módulos del paquete: los hermanos se buscan en el paquete."""
+    if nivel == 0 and nombre in _MODULOS:
+        return importlib.import_module(f"{__name__}.{nombre}")
+    return builtins.__import__(nombre, globales, locales, lista_from, nivel)
+
+
+_BUILTINS = dict(vars(builtins), __import__=_importar)
+
+
+class _Cargador(importlib.machinery.SourceFileLoader):
+    """Ejecuta un módulo de las carpetas con el __import__ del paquete."""
+    def exec_module(self, modulo):
+        modulo.__builtins__ = _BUILTINS
+        super().exec_module(modulo)
+
+
+class _Buscador:
+    """Encuentra ordenamiento.<modulo> en las carpetas de algoritmos."""
+    @staticmethod
+    def find_spec(nombre_completo, ruta=None, objetivo=None):
+        paquete, _, nombre = nombre_completo.rpartition('.')
+        if paquete != __name__ or nombre not in _MODULOS:
+            return None
+        ruta_modulo = _MODULOS[nombre]
+        return importlib.util.spec_from_file_location(
+            nombre_completo, ruta_modulo, loader=_Cargador(nombre_completo, ruta_modulo)
+        )
+
+
+if not any(isinstance(buscador, _Buscador) for buscador in sys.meta_path):
+    sys.meta_path.insert(0, _Buscador())
+
+from .registro_algoritmos import (  # noqa: E402
+    REGISTRO, Algoritmo, algoritmos, cargar, importar_modulo, obtener
+)
+
+
+# Nombre de función -> entrada del registro (quick_sort -> 'quick')
+_FUNCIONES = {algoritmo.funcion: algoritmo for algoritmo in REGISTRO.values()}
+
+__all__ = ['REGISTRO', 'Algoritmo', 'algoritmos', 'cargar', 'importar_modulo',
+           'obtener'] + list(_FUNCIONES)
+
+
+def __getattr__(nombre):
+    # Solo se llama para los nombres que todavía no son atributos del paquete
+    if nombre not in _FUNCIONES:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    funcion = _FUNCIONES[nombre].cargar()
+    globals()[nombre] = funcion
+    return funcion
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_FUNCIONES))
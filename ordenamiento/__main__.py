@@ -0,0 +1,14 @@
+"""
+Ejecuta la línea de comandos de ordenamiento:
+
+    python -m ordenamiento [opciones]        (desde la raíz del repositorio)
+
+Ver linea_comandos.
+"""
+
+import sys
+
+from ordenamiento.linea_comandos import main
+
+
+sys.exit(main())